@@ -0,0 +1,79 @@
+"""
+One IPC stream per batch vs one continuous IPC stream per result.
+
+Per-batch mode is what ArrowWrapper(batch) did for every frame: schema
+message + record batch + end-of-stream marker. Continuous mode sends the
+schema once, then record batch messages, then one end marker
+(_ArrowResultStream). Decode re-parses the schema for every frame in
+per-batch mode; in continuous mode the schema frame is read once and each
+batch frame is decoded against it, as a grid appending batches would.
+
+    python bench/bench_arrow_continuous.py --columns 3 300 --rows 100000 --batch-rows 500 5000
+"""
+import os
+import sys
+import time
+import argparse
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+def make_table(rows, columns):
+    data = {}
+    for i in range(columns):
+        if i % 3 == 0:
+            data[f"kolon_{i:03d}_kod"] = pa.array([f"K{(r * 7 + i) % 50}" for r in range(rows)])
+        elif i % 3 == 1:
+            data[f"kolon_{i:03d}_tutar"] = pa.array([r * 0.5 + i for r in range(rows)], pa.float64())
+        else:
+            data[f"kolon_{i:03d}_adet"] = pa.array([r % 97 for r in range(rows)], pa.int32())
+    return pa.table(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--columns", type=int, nargs="+", default=[3, 300])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-rows", type=int, nargs="+", default=[500, 5000])
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    frames = []
+    ns["_ds_publish"] = lambda data, table=None, payload=None: frames.append(bytes(payload))
+
+    print(f"{'columns':>7} {'batch':>6} {'mode':<11} {'frames':>6} {'MB':>8} {'encode ms':>10} {'decode ms':>10}")
+    for columns in args.columns:
+        table = make_table(args.rows if columns < 100 else args.rows // 10, columns)
+        for batch_rows in args.batch_rows:
+            batches = table.to_batches(batch_rows)
+
+            start = time.perf_counter()
+            per_batch = [ns["ArrowWrapper"](b)._ipc_buffer().to_pybytes() for b in batches]
+            encode = time.perf_counter() - start
+            start = time.perf_counter()
+            for frame in per_batch:
+                pa.ipc.open_stream(frame).read_all()
+            decode = time.perf_counter() - start
+            print(f"{columns:>7} {batch_rows:>6} {'per-batch':<11} {len(per_batch):>6} "
+                  f"{sum(map(len, per_batch)) / 2**20:>8.2f} {encode * 1000:>10.1f} {decode * 1000:>10.1f}")
+
+            frames.clear()
+            start = time.perf_counter()
+            out = ns["_ArrowResultStream"]()
+            for b in batches:
+                out.write(b)
+            out.close()
+            encode = time.perf_counter() - start
+            start = time.perf_counter()
+            schema = pa.ipc.read_schema(pa.py_buffer(frames[0]))
+            for frame in frames[1:-1]:
+                pa.ipc.read_record_batch(pa.py_buffer(frame), schema)
+            decode = time.perf_counter() - start
+            print(f"{columns:>7} {batch_rows:>6} {'continuous':<11} {len(frames):>6} "
+                  f"{sum(map(len, frames)) / 2**20:>8.2f} {encode * 1000:>10.1f} {decode * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Arrow IPC size and encode/decode cost: plain vs dictionary-encoded
+low-cardinality strings vs LZ4/ZSTD body compression.
+
+The data imitates a retail sales extract: store codes, regions,
+categories, product names, segments and channels (repetitive strings)
+next to numeric measures, dates and a unique receipt number. Batches are
+written through the kernel's ArrowWrapper with the negotiated features
+set, exactly as stream() publishes them. Decode is pyarrow reading the
+stream back (the UI uses apache-arrow JS; relative costs are similar).
+
+    python bench/bench_arrow_ipc.py --rows 1000000 --batch-rows 50000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import datetime
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+MODES = [
+    ("plain", {}),
+    ("dictionary", {"dictionary": True}),
+    ("lz4", {"compression": ["lz4"]}),
+    ("zstd", {"compression": ["zstd"]}),
+    ("dictionary+lz4", {"compression": ["lz4"], "dictionary": True}),
+    ("dictionary+zstd", {"compression": ["zstd"], "dictionary": True}),
+]
+
+
+def retail_table(rows, seed=7):
+    rnd = random.Random(seed)
+    stores = [f"MGZ-{i:04d}" for i in range(400)]
+    regions = ["Marmara", "Ege", "Akdeniz", "İç Anadolu", "Karadeniz", "Doğu Anadolu", "Güneydoğu", "Trakya"]
+    categories = [f"Kategori {i:02d}" for i in range(35)]
+    subcategories = [f"Alt Kategori {i:03d}" for i in range(250)]
+    products = [f"Ürün {i:05d} {rnd.choice(['500 g', '1 kg', '1 L', '330 ml', 'Paket'])}" for i in range(15000)]
+    segments = ["Bireysel", "Kurumsal", "Sadakat", "Online", "Toptan"]
+    channels = ["Mağaza", "Web", "Mobil"]
+    base = datetime.date(2024, 1, 1)
+    product_idx = [rnd.randrange(len(products)) for _ in range(rows)]
+    return pa.table({
+        "receipt_no": [f"R{i:010d}" for i in range(rows)],
+        "sale_date": pa.array([base + datetime.timedelta(days=rnd.randrange(365)) for _ in range(rows)], pa.date32()),
+        "store_code": [rnd.choice(stores) for _ in range(rows)],
+        "region": [rnd.choice(regions) for _ in range(rows)],
+        "category": [categories[p % len(categories)] for p in product_idx],
+        "subcategory": [subcategories[p % len(subcategories)] for p in product_idx],
+        "product_name": [products[p] for p in product_idx],
+        "sku": pa.array([1_000_000 + p for p in product_idx], pa.int64()),
+        "segment": [rnd.choice(segments) for _ in range(rows)],
+        "channel": [rnd.choice(channels) for _ in range(rows)],
+        "quantity": pa.array([rnd.randint(1, 12) for _ in range(rows)], pa.int32()),
+        "unit_price": pa.array([round(5 + (p % 400) * 1.25, 2) for p in product_idx], pa.float64()),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    batches = retail_table(args.rows).to_batches(args.batch_rows)
+    print(f"{len(batches)} batches x {args.batch_rows:,} rows, {sum(b.nbytes for b in batches) / 2**20:.1f} MB in memory")
+    print(f"{'mode':<16} {'MB':>8} {'ratio':>6} {'encode ms':>10} {'decode ms':>10}")
+    plain = None
+    for label, features in MODES:
+        ns["_ds_options"] = lambda features=features: {"arrow": features} if features else {}
+        start = time.perf_counter()
+        payloads = [ns["ArrowWrapper"](b)._ipc_buffer() for b in batches]
+        encode = time.perf_counter() - start
+        start = time.perf_counter()
+        for payload in payloads:
+            pa.ipc.open_stream(payload).read_all()
+        decode = time.perf_counter() - start
+        size = sum(p.size for p in payloads)
+        plain = plain or size
+        print(f"{label:<16} {size / 2**20:>8.1f} {plain / size:>6.1f} {encode * 1000:>10.0f} {decode * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Arrow transport benchmark: base64 display_data vs. binary comm buffers.
+
+Replays what happens to every stream() batch between the kernel and the UI
+websocket, without a live Jupyter server:
+
+  display: IPC -> bytes, base64 in a JSON display_data message (Jupyter),
+           json.loads + b64decode in the bridge
+  comm:    IPC -> buffer, binary websocket frame (Jupyter), offset parsing
+           and a memoryview slice in the bridge
+
+    python bench/bench_arrow_transport.py --rows 3000000 --batch-size 5000
+"""
+import os
+import sys
+import json
+import time
+import base64
+import struct
+import argparse
+
+import numpy as np
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jupyter_channels import parse_binary_message
+
+
+def make_table(rows):
+    rng = np.random.default_rng(0)
+    return pa.table({
+        "id": np.arange(rows),
+        "price": rng.random(rows) * 1000,
+        "qty": rng.integers(0, 100, rows, dtype=np.int32),
+        "store": pa.array(rng.choice(["M001", "M002", "K113", "S045", "A900"], rows)),
+    })
+
+
+def ipc_buffer(batch):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue()
+
+
+def jupyter_message(msg_type, content):
+    return {
+        "header": {"msg_id": "x", "msg_type": msg_type}, "parent_header": {"msg_id": "p"},
+        "metadata": {}, "msg_type": msg_type, "content": content, "channel": "iopub",
+    }
+
+
+def serialize_binary_message(msg, buffers):
+    # Same layout as jupyter_server.services.kernels.connection.base.serialize_binary_message
+    parts = [json.dumps(msg).encode("utf8"), *buffers]
+    offsets = [4 * (len(parts) + 1)]
+    for part in parts[:-1]:
+        offsets.append(offsets[-1] + len(part))
+    return struct.pack("!" + "I" * (len(parts) + 1), len(parts), *offsets) + b"".join(parts)
+
+
+def run_display(batches):
+    wire = 0
+    for batch in batches:
+        # kernel: _repr_mimebundle_ -> bytes, Jupyter serialises them as base64 JSON
+        payload = ipc_buffer(batch).to_pybytes()
+        frame = json.dumps(jupyter_message("display_data", {
+            "data": {"application/vnd.apache.arrow.stream": base64.b64encode(payload).decode("ascii")},
+            "metadata": {},
+        }))
+        wire += len(frame)
+        # bridge: listen_jupyter
+        msg = json.loads(frame)
+        out = base64.b64decode(msg["content"]["data"]["application/vnd.apache.arrow.stream"])
+        assert len(out) == len(payload)
+    return wire
+
+
+def run_comm(batches):
+    wire = 0
+    for batch in batches:
+        payload = ipc_buffer(batch)
+        frame = serialize_binary_message(
+            jupyter_message("comm_msg", {"comm_id": "c", "data": {"kind": "arrow"}}), [memoryview(payload)]
+        )
+        wire += len(frame)
+        msg, buffers = parse_binary_message(frame)
+        assert len(buffers[0]) == payload.size
+    return wire
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    batches = make_table(args.rows).to_batches(args.batch_size)
+    arrow_bytes = sum(ipc_buffer(b).size for b in batches)
+    print(f"{args.rows:,} rows, {len(batches)} batches, {arrow_bytes / 1e6:.1f} MB Arrow IPC")
+    print(f"{'path':<8} {'wire MB':>9} {'inflation':>10} {'best s':>8} {'rows/s':>12} {'MB/s':>8}")
+    for name, fn in (("display", run_display), ("comm", run_comm)):
+        best, wire = float("inf"), 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            wire = fn(batches)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<8} {wire / 1e6:>9.1f} {wire / arrow_bytes:>9.2f}x {best:>8.2f} "
+              f"{args.rows / best:>12,.0f} {arrow_bytes / 1e6 / best:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
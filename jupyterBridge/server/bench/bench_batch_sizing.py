@@ -0,0 +1,76 @@
+"""
+Fixed vs adaptive batch sizing in stream().
+
+Streams a wide (300 column) and a narrow (3 column) table through the
+DuckDB native reader and a sqlite3 DB-API cursor, once with the old fixed
+batch_size=5000 and once with adaptive sizing (batch_size=None). Every
+displayed batch is serialized to Arrow IPC like ArrowWrapper does, and the
+IPC sizes are recorded.
+
+    python bench/bench_batch_sizing.py --wide-rows 50000 --narrow-rows 2000000
+"""
+import io
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import statistics
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+def make_tables(ns, wide_rows, narrow_rows):
+    con = ns["con"]
+    wide_cols = ", ".join(f"(range * {i} + 0.5)::DOUBLE AS c{i}" if i % 2 else f"'v' || (range % 97) AS c{i}" for i in range(300))
+    con.execute(f"CREATE TABLE wide AS SELECT {wide_cols} FROM range({wide_rows})")
+    con.execute(f"CREATE TABLE narrow AS SELECT range AS id, (range * 0.5)::DOUBLE AS amount, 'n' || (range % 1000) AS label "
+                f"FROM range({narrow_rows})")
+    lite = sqlite3.connect(":memory:")
+    for table in ("wide", "narrow"):
+        arrow = ns["_arrow_table"](con.sql(f"SELECT * FROM {table}"))
+        cols = ", ".join(arrow.column_names)
+        lite.execute(f"CREATE TABLE {table} ({cols})")
+        marks = ", ".join("?" * arrow.num_columns)
+        for batch in arrow.to_batches(50_000):
+            lite.executemany(f"INSERT INTO {table} VALUES ({marks})", zip(*(c.to_pylist() for c in batch.columns)))
+    return lite
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wide-rows", type=int, default=50_000)
+    parser.add_argument("--narrow-rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    frames = []
+
+    def display(obj):
+        frames.append(len(obj._ipc_buffer()))
+
+    ns["display"] = display
+    lite = make_tables(ns, args.wide_rows, args.narrow_rows)
+
+    print(f"{'source':<16} {'batch_size':>10} {'frames':>7} {'median MB':>10} {'max MB':>8} {'seconds':>8}  sizes")
+    for table in ("wide", "narrow"):
+        for source in ("duckdb", "sqlite3"):
+            for batch_size in (5000, None):
+                obj = ns["con"].sql(f"SELECT * FROM {table}") if source == "duckdb" else lite.execute(f"SELECT * FROM {table}")
+                frames.clear()
+                captured = []
+                ns["_ds_stats"] = lambda op, **fields: captured.append(fields)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ns["stream"](obj, batch_size=batch_size)
+                elapsed = time.perf_counter() - start
+                sizes = captured[-1]["batch_rows"]
+                print(f"{source + ' ' + table:<16} {str(batch_size or 'auto'):>10} {len(frames):>7} "
+                      f"{statistics.median(frames) / 2**20:>10.2f} {max(frames) / 2**20:>8.2f} {elapsed:>8.2f}  "
+                      f"{sizes['first']}->{sizes['last']} (min {sizes['min']}, max {sizes['max']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Concurrent session benchmark for the Jupyter channel client.
+
+Starts a stand-in kernel channel server (answers every execute_request with a
+stream message and an idle status) and opens N sessions, either through
+JupyterChannel (asyncio) or through the old websocket-client +
+asyncio.to_thread approach. Like open editors in the UI, most sessions sit
+idle in recv(); a fixed number of them run execute round trips and their
+latency is measured.
+
+    python bench/bench_channels.py --sessions 50 100 200 400 800 --mode asyncio threads
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+from jupyter_channels import JupyterChannel, create_jupyter_message
+
+
+async def fake_kernel(conn):
+    try:
+        await _answer_executes(conn)
+    except ConnectionClosed:
+        pass
+
+
+async def _answer_executes(conn):
+    async for raw in conn:
+        msg = json.loads(raw)
+        parent = msg["header"]
+        for msg_type, content in (
+            ("status", {"execution_state": "busy"}),
+            ("stream", {"name": "stdout", "text": "ok\n"}),
+            ("status", {"execution_state": "idle"}),
+        ):
+            await conn.send(json.dumps({
+                "header": {"msg_id": parent["msg_id"] + msg_type, "msg_type": msg_type},
+                "parent_header": parent,
+                "msg_type": msg_type,
+                "content": content,
+                "channel": "iopub",
+            }))
+
+
+class ThreadedChannel:
+    """The pre-JupyterChannel approach: blocking websocket-client, every call in a worker thread."""
+
+    def __init__(self, ws):
+        self.ws = ws
+
+    @classmethod
+    async def connect(cls, url):
+        import websocket
+        return cls(await asyncio.to_thread(websocket.create_connection, url))
+
+    async def send_json(self, msg):
+        await asyncio.to_thread(self.ws.send, json.dumps(msg))
+
+    async def recv_json(self):
+        return json.loads(await asyncio.to_thread(self.ws.recv))
+
+    async def close(self):
+        # No worker thread here: the pool may be exhausted by parked recv() calls
+        self.ws.shutdown()
+
+
+async def run_session(channel_cls, url, rounds, latencies):
+    channel = await channel_cls.connect(url)
+    try:
+        for _ in range(rounds):
+            msg = create_jupyter_message("bench", "execute_request", {"code": "pass"})
+            start = time.perf_counter()
+            await channel.send_json(msg)
+            while True:
+                reply = await channel.recv_json()
+                if reply["msg_type"] == "status" and reply["content"]["execution_state"] == "idle":
+                    break
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await channel.close()
+
+
+async def idle_session(channel_cls, url, opened):
+    channel = await channel_cls.connect(url)
+    opened.append(channel)
+    await channel.recv_json()  # parked like listen_jupyter() on an idle editor
+
+
+async def run(mode, sessions, active, rounds, url, timeout):
+    channel_cls = JupyterChannel if mode == "asyncio" else ThreadedChannel
+    latencies = []
+    opened = []
+    peak_threads = threading.active_count()
+
+    async def watch_threads():
+        nonlocal peak_threads
+        while True:
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.05)
+
+    watcher = asyncio.create_task(watch_threads())
+    idle = [asyncio.create_task(idle_session(channel_cls, url, opened)) for _ in range(sessions - active)]
+
+    async def all_opened():
+        while len(opened) < len(idle):
+            await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(all_opened(), timeout)
+        start = time.perf_counter()
+        await asyncio.wait_for(
+            asyncio.gather(*(run_session(channel_cls, url, rounds, latencies) for _ in range(active))),
+            timeout,
+        )
+        status = "ok"
+    except asyncio.TimeoutError:
+        status = "timeout"
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+
+    # Closing the sockets releases threads parked in recv()
+    await asyncio.gather(*(c.close() for c in opened), return_exceptions=True)
+    for task in idle:
+        task.cancel()
+    await asyncio.gather(*idle, return_exceptions=True)
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000 if latencies else float("nan")
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan")
+    return {
+        "mode": mode, "sessions": sessions, "status": status,
+        "round_trips_per_sec": len(latencies) / elapsed,
+        "p50_ms": p50, "p99_ms": p99, "peak_threads": peak_threads,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[50, 100, 200, 400, 800])
+    parser.add_argument("--active", type=int, default=20, help="sessions that execute, the rest stay idle")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--mode", nargs="+", default=["asyncio", "threads"], choices=["asyncio", "threads"])
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    async with serve(fake_kernel, "127.0.0.1", 0, max_size=None, compression=None, ping_interval=None) as server:
+        port = server.sockets[0].getsockname()[1]
+        url = f"ws://127.0.0.1:{port}/api/kernels/bench/channels"
+
+        print(f"{'mode':<8} {'sessions':>8} {'status':>8} {'rt/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'threads':>8}")
+        for mode in args.mode:
+            for sessions in args.sessions:
+                r = await run(mode, sessions, min(args.active, sessions), args.rounds, url, args.timeout)
+                print(f"{r['mode']:<8} {r['sessions']:>8} {r['status']:>8} {r['round_trips_per_sec']:>10.0f} "
+                      f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['peak_threads']:>8}")
+                if r["status"] != "ok":
+                    break
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+DB-API cursor -> Arrow conversion benchmark for stream().
+
+Compares the old per-batch `pa.array(c) for c in zip(*rows)` conversion with
+CursorArrowConverter on a local sqlite3 cursor: once with sqlite's empty type
+codes (schema inferred from the first batch) and once through a wrapper that
+reports pyodbc-style Python type codes. The `note` column is NULL in the
+first batches, which is where per-batch inference lets the schema drift.
+The DuckDB rows show the native columnar reader against the row path.
+
+    python bench/bench_cursor_arrow.py --rows 500000 --batch-size 5000
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import datetime
+import pyarrow as pa
+import duckdb
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+class TypedCursor:
+    """sqlite3 cursor with the description pyodbc/mssql_python would report."""
+
+    TYPES = [int, float, str, datetime.datetime, bool, str]
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.description = [(d[0], t, None, None, None, None, True) for d, t in zip(cursor.description, self.TYPES)]
+
+    def fetchmany(self, size):
+        return self.cursor.fetchmany(size)
+
+
+def make_sqlite(rows):
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.execute("CREATE TABLE t (id INTEGER, amount REAL, name TEXT, created TIMESTAMP, flag BOOLEAN, note TEXT)")
+    base = datetime.datetime(2024, 1, 1)
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?, ?, ?, ?)", (
+        (i, i * 0.25, f"customer-{i % 5000}", base + datetime.timedelta(seconds=i), i % 3 == 0,
+         None if i < rows // 2 else f"note {i}")
+        for i in range(rows)
+    ))
+    return conn
+
+
+def rows_old(cursor, batch_size):
+    names = [d[0] for d in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield pa.RecordBatch.from_arrays([pa.array(c) for c in zip(*rows)], names=names)
+
+
+def rows_converter(ns):
+    def run(cursor, batch_size):
+        converter = ns["CursorArrowConverter"](cursor.description)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from converter.convert(rows)
+        yield from converter.flush()
+    return run
+
+
+def measure(label, make_cursor, convert, batch_size):
+    cursor = make_cursor()
+    start = time.perf_counter()
+    total, schemas = 0, set()
+    for batch in convert(cursor, batch_size):
+        total += batch.num_rows
+        schemas.add(batch.schema)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {total / elapsed:>12,.0f} {len(schemas):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    conn = make_sqlite(args.rows)
+    sql = "SELECT id, amount, name, created, flag, note FROM t"
+
+    duck = duckdb.connect()
+    duck.register("src", pa.Table.from_batches(list(rows_converter(ns)(TypedCursor(conn.execute(sql)), 100_000))))
+    duck.execute("CREATE TABLE t AS SELECT * FROM src")
+
+    print(f"{'path':<28} {'rows/sec':>12} {'schemas':>8}")
+    measure("sqlite3 rows (old)", lambda: conn.execute(sql), rows_old, args.batch_size)
+    measure("sqlite3 converter", lambda: conn.execute(sql), rows_converter(ns), args.batch_size)
+    measure("sqlite3 typed converter", lambda: TypedCursor(conn.execute(sql)), rows_converter(ns), args.batch_size)
+    measure("duckdb rows (old)", lambda: duck.execute(sql), rows_old, args.batch_size)
+    measure("duckdb native reader", lambda: duck.execute(sql), ns["_arrow_batches"], args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
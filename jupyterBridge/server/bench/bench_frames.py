@@ -0,0 +1,89 @@
+"""
+DataFrame / Arrow input benchmark for stream().
+
+Before, a DataFrame or Arrow table went to the UI as one IPC message of
+the whole object (pandas had to be converted to Arrow first). Now it is
+sliced into adaptive batches without copying. For each input this
+compares:
+
+- one-shot: convert to Arrow and serialize the whole table as one
+  message (the old path)
+- stream(): time until the first frame is published, total time, number
+  of frames and the largest frame
+
+    python bench/bench_frames.py --rows 3000000
+"""
+import os
+import sys
+import time
+import argparse
+import pyarrow as pa
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+def make_inputs(rows):
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "amount": np.random.default_rng(0).random(rows) * 1000,
+        "store": pd.array([f"store {i % 400}" for i in range(rows)], dtype="string[pyarrow]"),
+        "created": pd.date_range("2024-01-01", periods=rows, freq="s"),
+    })
+    inputs = [("pandas (numpy + arrow str)", df),
+              ("pandas (object str)", df.astype({"store": object}))]
+    try:
+        import polars as pl
+        inputs.append(("polars", pl.from_pandas(df)))
+    except ImportError:
+        pass
+    inputs.append(("arrow table", pa.Table.from_pandas(df, preserve_index=False)))
+    return inputs
+
+
+def one_shot(obj):
+    start = time.perf_counter()
+    if isinstance(obj, pd.DataFrame):
+        table = pa.Table.from_pandas(obj, preserve_index=False)
+    elif isinstance(obj, pa.Table):
+        table = obj
+    else:
+        table = obj.to_arrow()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return time.perf_counter() - start, sink.getvalue().size
+
+
+def streamed(ns, obj):
+    frames = []
+    start = time.perf_counter()
+
+    def publish(wrapper):
+        frames.append((time.perf_counter() - start, wrapper._ipc_buffer().size))
+
+    ns["display"] = publish
+    import io, contextlib
+    with contextlib.redirect_stdout(io.StringIO()):
+        ns["stream"](obj)
+    return frames[0][0], time.perf_counter() - start, len(frames), max(size for _, size in frames)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    print(f"{'input':<28} {'one-shot s':>10} {'MB':>7} | {'first s':>8} {'total s':>8} {'frames':>7} {'max MB':>7}")
+    for label, obj in make_inputs(args.rows):
+        shot_seconds, shot_bytes = one_shot(obj)
+        first, total, frames, largest = streamed(ns, obj)
+        print(f"{label:<28} {shot_seconds:>10.3f} {shot_bytes / 1048576:>7.1f} | "
+              f"{first:>8.3f} {total:>8.3f} {frames:>7} {largest / 1048576:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
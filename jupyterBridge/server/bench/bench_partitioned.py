@@ -0,0 +1,106 @@
+"""
+Parallel partitioned extraction benchmark: stream() vs stream_partitioned().
+
+The source is a SQLite file opened once per partition. Each connection's
+cursor is wrapped so every fetchmany() sleeps for --latency-ms, imitating a
+SQL Server round trip (the sleep releases the GIL like a driver waiting on a
+socket). The rows land in a DuckDB table (name=...), as a workspace
+script pulling a large table would do.
+
+    python bench/bench_partitioned.py --rows 500000 --latency-ms 10 --partitions 1 2 4 8
+"""
+import io
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+class LatencyCursor:
+    """sqlite3 cursor with a fixed per-fetchmany() latency and pyodbc-style type codes."""
+
+    TYPES = [int, float, str, str]
+
+    def __init__(self, cursor, latency):
+        self.cursor = cursor
+        self.latency = latency
+
+    @property
+    def description(self):
+        return [(d[0], t, None, None, None, None, True) for d, t in zip(self.cursor.description, self.TYPES)]
+
+    def execute(self, sql, *params):
+        self.cursor.execute(sql, *params)
+        return self
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size):
+        time.sleep(self.latency)
+        return self.cursor.fetchmany(size)
+
+    def close(self):
+        self.cursor.close()
+
+
+class LatencyConnection:
+    def __init__(self, path, latency):
+        self.conn = sqlite3.connect(path)
+        self.latency = latency
+
+    def cursor(self):
+        return LatencyCursor(self.conn.cursor(), self.latency)
+
+    def close(self):
+        self.conn.close()
+
+
+def make_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tb_urun (id INTEGER PRIMARY KEY, price REAL, name TEXT, category TEXT)")
+    conn.executemany("INSERT INTO tb_urun VALUES (?, ?, ?, ?)",
+                     ((i, i * 0.25, f"urun {i}", f"kategori {i % 40}") for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=10)
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    latency = args.latency_ms / 1000
+    query = "SELECT id, price, name, category FROM tb_urun"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "source.db")
+        make_db(path, args.rows)
+        connect = lambda: LatencyConnection(path, latency)
+
+        print(f"{'path':<24} {'seconds':>9} {'rows/sec':>12} {'rows':>10}")
+        runs = [("stream()", lambda: ns["stream"](connect().cursor().execute(query), name="t",
+                                                  batch_size=args.batch_size, silent=True))]
+        runs += [(f"partitioned x{n}", lambda n=n: ns["stream_partitioned"](
+            connect, query, "id", partitions=n, name="t", batch_size=args.batch_size, silent=True))
+            for n in args.partitions]
+        for label, run in runs:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                run()
+            elapsed = time.perf_counter() - start
+            rows = ns["con"].execute("SELECT count(*) FROM t").fetchone()[0]
+            print(f"{label:<24} {elapsed:>9.2f} {rows / elapsed:>12,.0f} {rows:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Connection pool benchmark: a fresh driver connection per cell vs pooled_connect().
+
+The driver is SQLite behind a connect() that sleeps for --handshake-ms,
+standing in for the TLS + login round trips of pyodbc/mssql_python against
+SQL Server. Each "cell" connects, runs a small query, and closes, the way
+workspace scripts do on every run.
+
+    python bench/bench_pool.py --cells 20 --handshake-ms 250
+"""
+import io
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cells", type=int, default=20)
+    parser.add_argument("--handshake-ms", type=float, default=250)
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    ns["_ds_publish"] = lambda data, table=None, payload=None: None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "source.db")
+        with contextlib.closing(sqlite3.connect(path)) as conn:
+            conn.execute("CREATE TABLE users (id INTEGER, first_name TEXT)")
+            conn.executemany("INSERT INTO users VALUES (?, ?)", ((i, f"user {i}") for i in range(1000)))
+            conn.commit()
+
+        def driver_connect(conn_str, **kwargs):
+            time.sleep(args.handshake_ms / 1000)
+            return sqlite3.connect(conn_str, check_same_thread=False)
+
+        def cell(connect):
+            conn = connect()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE id < 10")
+            cursor.fetchall()
+            conn.close()
+
+        runs = [
+            ("driver connect", lambda: driver_connect(path)),
+            ("pooled_connect", lambda: ns["pooled_connect"](path, driver=driver_connect)),
+        ]
+        print(f"{'path':<16} {'total s':>9} {'first ms':>9} {'rest avg ms':>12}")
+        for label, connect in runs:
+            times = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(args.cells):
+                    start = time.perf_counter()
+                    cell(connect)
+                    times.append(time.perf_counter() - start)
+            rest = sum(times[1:]) / max(1, len(times) - 1)
+            print(f"{label:<16} {sum(times):>9.2f} {times[0] * 1000:>9.1f} {rest * 1000:>12.2f}")
+        ns["close_pools"]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Pipelined prefetch benchmark for stream().
+
+A DB-API cursor whose fetchmany() sleeps to imitate network/driver latency
+(the sleep releases the GIL like a real driver waiting on a socket) is
+streamed with prefetch=0 (sequential fetch -> convert -> publish) and with
+increasing prefetch depths. Publishing serializes each batch to Arrow IPC
+the way ArrowWrapper does for the UI.
+
+    python bench/bench_prefetch.py --rows 200000 --batch-size 5000 --latency-ms 20 --depth 0 1 2 4
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+class SlowCursor:
+    """In-memory rows behind a fetchmany() with a fixed per-call latency."""
+
+    description = [("id", int, None, None, None, None, True), ("amount", float, None, None, None, None, True),
+                   ("name", str, None, None, None, None, True)]
+
+    def __init__(self, rows, latency):
+        self.rows = rows
+        self.latency = latency
+        self.pos = 0
+
+    def fetchmany(self, size):
+        time.sleep(self.latency)
+        chunk = self.rows[self.pos:self.pos + size]
+        self.pos += size
+        return chunk
+
+
+def publish(obj):
+    table = obj.table
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--depth", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    ns["display"] = publish
+    rows = [(i, i * 0.25, f"customer-{i % 5000}") for i in range(args.rows)]
+
+    print(f"{'prefetch':>8} {'seconds':>9} {'rows/sec':>12}")
+    for depth in args.depth:
+        cursor = SlowCursor(rows, args.latency_ms / 1000)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ns["stream"](cursor, batch_size=args.batch_size, prefetch=depth)
+        elapsed = time.perf_counter() - start
+        print(f"{depth:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+execute_sql_query() on a large result: full materialization vs preview mode.
+
+Each run happens in a fresh subprocess (ru_maxrss is per process). The
+source table is built first, so the baseline RSS is reported separately
+and the delta is what the query itself cost.
+
+- full: the whole result becomes an Arrow table and is displayed (the
+  previous behaviour)
+- preview: only the first --preview rows are read; the result stays a
+  lazy DuckDB view behind a handle
+- preview + profile: the same plus profile_result() on a reservoir sample
+- SUMMARIZE full: DuckDB SUMMARIZE over the whole result, for comparison
+  with the sampled profile
+
+    python bench/bench_preview_profile.py --rows 5000000 --preview 1000
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+QUERY = "SELECT * FROM t WHERE id % 2 = 0"
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, rows, preview):
+    from kernel_namespace import load_kernel_namespace
+    ns = load_kernel_namespace()
+    published = []
+    ns["display"] = lambda obj: None
+    ns["_ds_publish"] = lambda data, table=None, payload=None: published.append(data)
+    ns["_ds_options"] = lambda: {}
+    con = ns["con"]
+    con.execute(f"""
+        CREATE TABLE t AS SELECT range AS id, (range % 1000) * 1.5 AS amount, 'store ' || (range % 37) AS store,
+            CASE WHEN range % 10 = 0 THEN NULL ELSE range % 7 END AS qty,
+            DATE '2024-01-01' + (range % 365)::INT AS day, md5(range::VARCHAR) AS note
+        FROM range({rows})""")
+    base = rss_mb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "full":
+            ns["execute_sql_query"](QUERY)
+        elif mode == "preview":
+            ns["execute_sql_query"](QUERY, preview=preview)
+        elif mode == "preview + profile":
+            ns["execute_sql_query"](QUERY, preview=preview, profile=True)
+        else:
+            con.execute(f"SUMMARIZE {QUERY}").fetchall()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "base": base, "peak": rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--preview", type=int, default=1000)
+    parser.add_argument("--mode")
+    args = parser.parse_args()
+    if args.mode:
+        child(args.mode, args.rows, args.preview)
+        return
+
+    print(f"{'mode':<20} {'seconds':>9} {'base MB':>9} {'peak MB':>9} {'delta MB':>9}")
+    for mode in ("full", "preview", "preview + profile", "SUMMARIZE full"):
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, "--rows", str(args.rows),
+                              "--preview", str(args.preview)], capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:<20} {r['seconds']:>9.3f} {r['base']:>9.0f} {r['peak']:>9.0f} {r['peak'] - r['base']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Peak kernel memory of stream(cursor, name=...) by storage mode.
+
+Each run happens in a fresh subprocess (ru_maxrss is per process). The
+cursor generates wide rows lazily, so the source itself holds one batch at
+a time, like a driver reading from SQL Server.
+
+- view: batches collected in a Python list, then con.register() of one
+  Arrow table (the previous behaviour)
+- table: each batch INSERTed into a DuckDB table as it arrives
+- table + limit: same with DATASTUDIO_DUCKDB_MEMORY_LIMIT set, so DuckDB
+  spills to its temp directory
+
+    python bench/bench_register_memory.py --rows 1000000 --columns 12 --limit 256MB
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class WideCursor:
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.pos = 0
+        self.description = [(f"c{i}", str if i % 3 == 2 else (float if i % 3 == 1 else int), None, None, None, None, True)
+                            for i in range(columns)]
+
+    def fetchmany(self, size):
+        end = min(self.rows, self.pos + size)
+        kinds = [d[1] for d in self.description]
+        chunk = [tuple(f"value {r} {i}" if k is str else (r * 0.5 if k is float else r) for i, k in enumerate(kinds))
+                 for r in range(self.pos, end)]
+        self.pos = end
+        return chunk
+
+
+def child(args):
+    from kernel_namespace import load_kernel_namespace
+    ns = load_kernel_namespace()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ns["stream"](WideCursor(args.rows, args.columns), name="wide", silent=True, storage=args.storage)
+    elapsed = time.perf_counter() - start
+    count = ns["con"].execute("SELECT count(*) FROM wide").fetchone()[0]
+    spilled = ns["con"].execute("SELECT coalesce(sum(temporary_storage_bytes), 0) FROM duckdb_memory()").fetchone()[0]
+    print(json.dumps({"rows": count, "seconds": elapsed, "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                      "baseline_mb": baseline / 1024, "spilled_mb": spilled / 2**20}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--limit", default="256MB", help="DuckDB memory_limit for the spilling run")
+    parser.add_argument("--storage", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.storage:
+        return child(args)
+
+    print(f"{'mode':<14} {'rows':>10} {'seconds':>8} {'peak MB':>8} {'base MB':>8} {'spill MB':>9}")
+    for label, storage, limit in (("view", "view", None), ("table", "table", None), ("table+limit", "table", args.limit)):
+        env = dict(os.environ)
+        env.pop("DATASTUDIO_DUCKDB_MEMORY_LIMIT", None)
+        if limit:
+            env["DATASTUDIO_DUCKDB_MEMORY_LIMIT"] = limit
+        out = subprocess.run([sys.executable, __file__, "--rows", str(args.rows), "--columns", str(args.columns),
+                              "--storage", storage], env=env, capture_output=True, text=True, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{label:<14} {r['rows']:>10,} {r['seconds']:>8.2f} {r['peak_mb']:>8.0f} {r['baseline_mb']:>8.0f} "
+              f"{r['spilled_mb']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
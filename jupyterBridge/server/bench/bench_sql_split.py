@@ -0,0 +1,77 @@
+"""
+Statement splitting for large generated SQL scripts: the old ';' split with
+line-by-line comment filtering vs DuckDB's extract_statements().
+
+The script is --statements INSERT/SELECT statements; every --quoted-th one
+has a ';' inside a string literal or a block comment, as generated SQL
+(ETL templates, exports) often does. For each splitter the bench reports
+the split time and how many statements it produced (the correct number is
+--statements). It then runs the whole script through execute_sql_query()
+and reports per-statement overhead.
+
+    python bench/bench_sql_split.py --statements 5000 --quoted 10
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from kernel_namespace import load_kernel_namespace
+
+
+def old_split(query):
+    # execute_sql_query()'s previous splitter
+    def is_real_code(s):
+        for l in s.split('\n'):
+            l = l.strip()
+            if l and not l.startswith('--') and not l.startswith('#') and not (l.startswith('/*') and l.endswith('*/')):
+                return True
+        return False
+    return [s for s in (s.strip() for s in query.split(';') if s.strip()) if is_real_code(s)]
+
+
+def make_script(statements, quoted):
+    lines = ["-- generated; do not edit", "CREATE OR REPLACE TABLE events (id INTEGER, note VARCHAR);"]
+    for i in range(statements - 1):
+        if i % 2:
+            lines.append(f"SELECT count(*) FROM events WHERE id < {i};")
+        elif quoted and i % quoted == 0:
+            lines.append(f"INSERT INTO events VALUES ({i}, 'a;b;{i}'); /* step {i}; ok */")
+        else:
+            lines.append(f"INSERT INTO events VALUES ({i}, 'row {i}');")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statements", type=int, default=5000)
+    parser.add_argument("--quoted", type=int, default=10)
+    args = parser.parse_args()
+
+    ns = load_kernel_namespace()
+    ns["_ds_publish"] = lambda data, table=None, payload=None: None
+    ns["_ds_options"] = lambda: {}
+    ns["display"] = lambda obj: None
+    con = ns["con"]
+    script = make_script(args.statements, args.quoted)
+
+    print(f"{'splitter':<22} {'seconds':>9} {'statements':>11}")
+    for label, split in (("';' split", old_split), ("extract_statements", con.extract_statements)):
+        start = time.perf_counter()
+        parts = split(script)
+        print(f"{label:<22} {time.perf_counter() - start:>9.3f} {len(parts):>11,}")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ns["execute_sql_query"](script)
+    elapsed = time.perf_counter() - start
+    rows = con.execute("SELECT count(*) FROM events").fetchone()[0]
+    print(f"\nexecute_sql_query: {elapsed:.2f} s, {elapsed / args.statements * 1000:.2f} ms/statement, "
+          f"{rows:,} rows inserted (previously +100 ms/statement of sleep alone)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+execute_sql_query() on a multi-statement script over a large table.
+
+Each run happens in a fresh subprocess (ru_maxrss is per process); the
+source table is built first so the query's own cost is the RSS delta.
+
+- materialize: the previous behaviour, replayed statement by statement:
+  every SELECT becomes an Arrow table, the last one is displayed whole,
+  with the old 100 ms pause after each statement
+- stream: intermediate SELECTs are only bound, the final result flows to
+  the UI batch by batch
+- stream + intermediate: every SELECT is streamed as its own result
+  (intermediate=True)
+
+"first batch" is the time until the first display()/IPC frame, i.e. when
+the grid could start drawing.
+
+    python bench/bench_sql_streaming.py --rows 5000000
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import contextlib
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+CREATE OR REPLACE TEMP VIEW recent AS SELECT * FROM t WHERE day >= DATE '2024-07-01';
+SELECT * FROM recent WHERE qty IS NOT NULL;
+SELECT store, count(*) AS n, sum(amount) AS total FROM recent GROUP BY store;
+SELECT * FROM t WHERE id % 3 = 0
+"""
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, rows):
+    from kernel_namespace import load_kernel_namespace
+    ns = load_kernel_namespace()
+    first = []
+    start = None
+
+    def shown(*args, **kwargs):
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    ns["display"] = shown
+    ns["_ds_publish"] = lambda data, table=None, payload=None: shown() if table is not None or payload else None
+    ns["_ds_options"] = lambda: {}
+    con = ns["con"]
+    con.execute(f"""
+        CREATE TABLE t AS SELECT range AS id, (range % 1000) * 1.5 AS amount, 'store ' || (range % 37) AS store,
+            CASE WHEN range % 10 = 0 THEN NULL ELSE range % 7 END AS qty,
+            DATE '2024-01-01' + (range % 365)::INT AS day, md5(range::VARCHAR) AS note
+        FROM range({rows})""")
+    base = rss_mb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "materialize":
+            last = None
+            for stmt in (s.strip() for s in SCRIPT.split(";") if s.strip()):
+                rel = con.sql(stmt)
+                if rel is not None:
+                    last = ns["_arrow_table"](rel)
+                time.sleep(0.1)
+            shown(ns["ArrowWrapper"](last))
+        else:
+            ns["execute_sql_query"](SCRIPT, intermediate=mode == "stream + intermediate")
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"seconds": elapsed, "first": first[0] if first else None, "base": base, "peak": rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--mode")
+    args = parser.parse_args()
+    if args.mode:
+        child(args.mode, args.rows)
+        return
+
+    print(f"{'mode':<24} {'seconds':>9} {'first batch':>12} {'base MB':>9} {'peak MB':>9} {'delta MB':>9}")
+    for mode in ("materialize", "stream", "stream + intermediate"):
+        out = subprocess.run([sys.executable, __file__, "--mode", mode, "--rows", str(args.rows)],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:<24} {r['seconds']:>9.3f} {r['first']:>12.3f} {r['base']:>9.0f} {r['peak']:>9.0f} "
+              f"{r['peak'] - r['base']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Stand-in Jupyter server for offline bridge benchmarks.
+
+Implements just enough of the Jupyter REST and websocket API for the bridge:
+/api/kernels (create, list, delete, interrupt), kernel channels and
+terminals. Kernels answer every execute_request with status/execute_reply
+messages; a first line of the form
+
+    # fake: frames=200 rows=5000 stdout=50 transport=display
+
+turns the request into a flood of `frames` Arrow batches of `rows` rows
+(display_data with base64 IPC, or binary comm_msg buffers with
+transport=comm) interleaved with `stdout` stream messages. Each stdout line
+carries the send time ("ts=<epoch>") so clients can measure forwarding
+latency. Terminals echo stdin back as stdout.
+
+    python bench/fake_jupyter.py --port 8899
+"""
+import json
+import time
+import uuid
+import base64
+import struct
+import asyncio
+import argparse
+import pyarrow as pa
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response
+
+app = FastAPI(title="Fake Jupyter")
+kernels = {}
+terminals = set()
+_payloads = {}
+
+
+def arrow_payload(rows):
+    if rows not in _payloads:
+        table = pa.table({
+            "id": pa.array(range(rows), pa.int64()),
+            "value": pa.array([i * 0.5 for i in range(rows)], pa.float64()),
+            "label": pa.array([f"row-{i % 1000}" for i in range(rows)]),
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        payload = sink.getvalue().to_pybytes()
+        _payloads[rows] = (payload, base64.b64encode(payload).decode("ascii"))
+    return _payloads[rows]
+
+
+def serialize_binary_message(msg, buffers):
+    # Same layout as jupyter_server.services.kernels.connection.base.serialize_binary_message
+    parts = [json.dumps(msg).encode("utf8"), *buffers]
+    offsets = [4 * (len(parts) + 1)]
+    for part in parts[:-1]:
+        offsets.append(offsets[-1] + len(part))
+    return struct.pack("!" + "I" * (len(parts) + 1), len(parts), *offsets) + b"".join(parts)
+
+
+def reply(parent, msg_type, content, channel="iopub"):
+    msg_id = uuid.uuid4().hex
+    return {
+        "header": {"msg_id": msg_id, "msg_type": msg_type, "session": parent.get("session", ""),
+                   "username": "fake", "version": "5.3", "date": ""},
+        "msg_id": msg_id,
+        "msg_type": msg_type,
+        "parent_header": parent,
+        "metadata": {},
+        "content": content,
+        "buffers": [],
+        "channel": channel,
+    }
+
+
+def parse_directives(code):
+    first = code.lstrip().split("\n", 1)[0]
+    if not first.startswith("# fake:"):
+        return None
+    opts = dict(token.split("=", 1) for token in first[len("# fake:"):].split() if "=" in token)
+    return {
+        "frames": int(opts.get("frames", 0)),
+        "rows": int(opts.get("rows", 1000)),
+        "stdout": int(opts.get("stdout", 0)),
+        "transport": opts.get("transport", "display"),
+    }
+
+
+@app.post("/api/kernels", status_code=201)
+async def create_kernel(body: dict = None):
+    kernel_id = str(uuid.uuid4())
+    kernels[kernel_id] = {"id": kernel_id, "name": (body or {}).get("name", "python3"), "execution_state": "idle"}
+    return kernels[kernel_id]
+
+
+@app.get("/api/kernels")
+async def list_kernels():
+    return list(kernels.values())
+
+
+@app.delete("/api/kernels/{kernel_id}")
+async def delete_kernel(kernel_id: str):
+    kernels.pop(kernel_id, None)
+    return Response(status_code=204)
+
+
+@app.post("/api/kernels/{kernel_id}/interrupt")
+async def interrupt_kernel(kernel_id: str):
+    return Response(status_code=204)
+
+
+@app.websocket("/api/kernels/{kernel_id}/channels")
+async def kernel_channels(websocket: WebSocket, kernel_id: str):
+    await websocket.accept()
+    try:
+        while True:
+            msg = json.loads(await websocket.receive_text())
+            if msg.get("header", {}).get("msg_type") != "execute_request":
+                continue
+            await execute(websocket, msg["header"], msg.get("content", {}).get("code", ""))
+    except WebSocketDisconnect:
+        pass
+
+
+async def execute(websocket, parent, code):
+    await websocket.send_text(json.dumps(reply(parent, "status", {"execution_state": "busy"})))
+    opts = parse_directives(code)
+    if opts is None:
+        await websocket.send_text(json.dumps(reply(parent, "stream", {"name": "stdout", "text": "ok\n"})))
+    else:
+        payload, encoded = arrow_payload(opts["rows"])
+        frames, lines = opts["frames"], opts["stdout"]
+        every = max(1, frames // lines) if lines and frames else 1
+        sent_lines = 0
+        for i in range(max(frames, lines)):
+            if i < frames:
+                if opts["transport"] == "comm":
+                    msg = reply(parent, "comm_msg", {"comm_id": "bench", "data": {"kind": "arrow"}})
+                    await websocket.send_bytes(serialize_binary_message(msg, [payload]))
+                else:
+                    await websocket.send_text(json.dumps(reply(parent, "display_data", {
+                        "data": {"application/vnd.apache.arrow.stream": encoded}, "metadata": {}})))
+            if sent_lines < lines and (i % every == 0 or i >= frames):
+                sent_lines += 1
+                text = f"ts={time.time():.6f}\n"
+                await websocket.send_text(json.dumps(reply(parent, "stream", {"name": "stdout", "text": text})))
+            if i % 16 == 15:
+                await asyncio.sleep(0)  # let other kernels' sockets make progress
+    await websocket.send_text(json.dumps(reply(parent, "execute_reply", {"status": "ok"}, channel="shell")))
+    await websocket.send_text(json.dumps(reply(parent, "status", {"execution_state": "idle"})))
+
+
+@app.post("/api/terminals")
+async def create_terminal():
+    name = uuid.uuid4().hex[:8]
+    terminals.add(name)
+    return {"name": name}
+
+
+@app.patch("/api/terminals/{name}/size")
+async def resize_terminal(name: str):
+    return {}
+
+
+@app.delete("/api/terminals/{name}")
+async def delete_terminal(name: str):
+    terminals.discard(name)
+    return Response(status_code=204)
+
+
+@app.websocket("/terminals/websocket/{name}")
+async def terminal_socket(websocket: WebSocket, name: str):
+    await websocket.accept()
+    try:
+        while True:
+            msg = json.loads(await websocket.receive_text())
+            if msg[0] == "stdin":
+                await websocket.send_text(json.dumps(["stdout", msg[1]]))
+    except WebSocketDisconnect:
+        pass
+
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
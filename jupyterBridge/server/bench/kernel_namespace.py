@@ -0,0 +1,19 @@
+"""Load kernel_bootstrap.py into a plain namespace so benchmarks can call stream() & co. without Jupyter."""
+import io
+import os
+import json
+import contextlib
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_kernel_namespace():
+    with open(os.path.join(SERVER_DIR, "kernel_bootstrap.py"), encoding="utf-8") as f:
+        code = f.read()
+    code = code.replace("{{REQUIRED_PACKAGES}}", json.dumps([]))
+    for placeholder in ("{{KERNEL_ID}}", "{{SESSION_ID}}", "{{JUPYTER_URL}}", "{{SESSION_LINK}}"):
+        code = code.replace(placeholder, "bench")
+    namespace = {"__name__": "__kernel__"}
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec(compile(code, "kernel_bootstrap.py", "exec"), namespace)
+    return namespace
@@ -0,0 +1,179 @@
+"""
+Offline load test for the bridge.
+
+Starts bench/fake_jupyter.py and the FastAPI app (uvicorn main:app) pointed
+at it, then runs N concurrent /ws/execute clients, each executing one flood
+request (Arrow frames + timestamped stdout lines), plus M /ws/terminal
+clients doing echo round trips. No live Jupyter server is needed.
+
+Reported per scenario:
+- connect p50/p99: websocket open until the "ready" status (kernel acquired)
+- frames/s, MB/s: Arrow frames and bytes received by all execute clients
+- fwd p50/p99: fake kernel send -> client receive latency of stdout lines
+- term p99: terminal input -> echo round trip
+- rss MB: peak resident memory of the bridge process
+
+    python bench/load_test.py --clients 10 50 100 --terminals 10 --transport display comm
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+import psutil
+import websockets
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(SERVER_DIR, "bench")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"port {port} did not open")
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Stats:
+    def __init__(self):
+        self.connect = []
+        self.forward = []
+        self.terminal = []
+        self.arrow_frames = 0
+        self.arrow_bytes = 0
+        self.errors = 0
+
+
+async def execute_client(url, code, stats):
+    start = time.perf_counter()
+    async with websockets.connect(url, max_size=None, compression=None) as ws:
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg.get("type") == "status" and msg.get("execution_state") == "ready":
+                break
+            if msg.get("type") == "error":
+                stats.errors += 1
+                return
+        stats.connect.append(time.perf_counter() - start)
+
+        await ws.send(json.dumps({"action": "execute", "request_id": "load", "code": code, "mode": "python"}))
+        while True:
+            frame = await ws.recv()
+            if isinstance(frame, bytes):
+                stats.arrow_frames += 1
+                stats.arrow_bytes += len(frame)
+                continue
+            msg = json.loads(frame)
+            if msg.get("type") == "stdout":
+                now = time.time()
+                for line in msg["text"].splitlines():
+                    if line.startswith("ts="):
+                        stats.forward.append(now - float(line[3:]))
+            elif msg.get("type") == "done":
+                break
+        await ws.send(json.dumps({"action": "close"}))
+
+
+async def terminal_client(url, rounds, stats):
+    async with websockets.connect(url, max_size=None, compression=None) as ws:
+        for _ in range(rounds):
+            sent = time.time()
+            await ws.send(json.dumps({"type": "input", "data": f"ts={sent:.6f}\n"}))
+            echo = await ws.recv()
+            if not echo.startswith("ts="):
+                stats.errors += 1
+                continue
+            stats.terminal.append(time.time() - sent)
+
+
+async def sample_rss(pid, peak):
+    proc = psutil.Process(pid)
+    while True:
+        peak[0] = max(peak[0], proc.memory_info().rss)
+        await asyncio.sleep(0.05)
+
+
+async def run_scenario(bridge, port, clients, terminals, code, rounds):
+    stats = Stats()
+    peak = [0]
+    sampler = asyncio.create_task(sample_rss(bridge.pid, peak))
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(execute_client(f"ws://127.0.0.1:{port}/ws/execute", code, stats) for _ in range(clients)),
+        *(terminal_client(f"ws://127.0.0.1:{port}/ws/terminal", rounds, stats) for _ in range(terminals)),
+        return_exceptions=False,
+    )
+    elapsed = time.perf_counter() - start
+    sampler.cancel()
+    return stats, elapsed, peak[0]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--terminals", type=int, default=10)
+    parser.add_argument("--terminal-rounds", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=100, help="Arrow frames per execute client")
+    parser.add_argument("--rows", type=int, default=5000, help="rows per Arrow frame")
+    parser.add_argument("--stdout", type=int, default=50, help="timestamped stdout lines per execute client")
+    parser.add_argument("--transport", nargs="+", default=["display", "comm"], choices=["display", "comm"])
+    parser.add_argument("--pool-min", type=int, default=1)
+    args = parser.parse_args()
+
+    fake_port, bridge_port = free_port(), free_port()
+    env = dict(os.environ, JUPYTER_URL=f"http://127.0.0.1:{fake_port}", JUPYTER_TOKEN="bench",
+               KERNEL_POOL_MIN=str(args.pool_min))
+    fake = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_jupyter.py"), "--port", str(fake_port)])
+    bridge = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(bridge_port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_port(fake_port)
+        await wait_for_port(bridge_port)
+        baseline = psutil.Process(bridge.pid).memory_info().rss
+        print(f"bridge baseline rss: {baseline / 2**20:.1f} MB")
+        print(f"{'transport':<9} {'clients':>7} {'conn p50':>9} {'conn p99':>9} {'frames/s':>9} {'MB/s':>8} "
+              f"{'fwd p50':>8} {'fwd p99':>8} {'term p99':>9} {'rss MB':>7} {'errors':>6}")
+        for transport in args.transport:
+            code = f"# fake: frames={args.frames} rows={args.rows} stdout={args.stdout} transport={transport}"
+            for clients in args.clients:
+                stats, elapsed, rss = await run_scenario(bridge, bridge_port, clients, args.terminals, code,
+                                                         args.terminal_rounds)
+                ms = lambda values, pct: percentile(values, pct) * 1000
+                print(f"{transport:<9} {clients:>7} {ms(stats.connect, 50):>9.1f} {ms(stats.connect, 99):>9.1f} "
+                      f"{stats.arrow_frames / elapsed:>9.0f} {stats.arrow_bytes / elapsed / 2**20:>8.1f} "
+                      f"{ms(stats.forward, 50):>8.1f} {ms(stats.forward, 99):>8.1f} {ms(stats.terminal, 99):>9.1f} "
+                      f"{rss / 2**20:>7.1f} {stats.errors:>6}")
+    finally:
+        for proc in (bridge, fake):
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
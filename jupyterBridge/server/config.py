@@ -12,6 +12,26 @@ load_dotenv(os.path.join(BASE_DIR, ".env"))
 JUPYTER_URL = os.getenv("JUPYTER_URL", "http://localhost:8888")
 JUPYTER_TOKEN = os.getenv("JUPYTER_TOKEN", "your_token_here")
 HEADERS = {"Authorization": f"Token {JUPYTER_TOKEN}"}
+JUPYTER_HTTP_TIMEOUT = float(os.getenv("JUPYTER_HTTP_TIMEOUT", "10"))
+JUPYTER_HTTP_RETRIES = int(os.getenv("JUPYTER_HTTP_RETRIES", "2"))
+
+# Warm kernel pool (per ws_<workspace> kernelspec)
+KERNEL_POOL_MIN = int(os.getenv("KERNEL_POOL_MIN", "1"))
+KERNEL_POOL_MAX = int(os.getenv("KERNEL_POOL_MAX", "4"))
+KERNEL_POOL_IDLE_TTL = float(os.getenv("KERNEL_POOL_IDLE_TTL", "600"))
+KERNEL_POOL_PREWARM = [w.strip() for w in os.getenv("KERNEL_POOL_PREWARM", "").split(",") if w.strip()]
+KERNEL_BOOTSTRAP_TIMEOUT = float(os.getenv("KERNEL_BOOTSTRAP_TIMEOUT", "300"))
+
+# Detached sessions: kernels outlive the browser websocket for a grace period
+SESSION_GRACE_SECONDS = float(os.getenv("SESSION_GRACE_SECONDS", "300"))
+SESSION_BUFFER_MAX_BYTES = int(os.getenv("SESSION_BUFFER_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# stdout/stderr chunks are merged into one frame within this time/size window (0 disables)
+OUTPUT_COALESCE_MS = float(os.getenv("OUTPUT_COALESCE_MS", "50"))
+OUTPUT_COALESCE_BYTES = int(os.getenv("OUTPUT_COALESCE_BYTES", str(64 * 1024)))
+
+# Compiled Jinja templates kept by the execute loop (LRU, keyed by source hash)
+JINJA_CACHE_SIZE = int(os.getenv("JINJA_CACHE_SIZE", "256"))
 
 # Workspaces are now in ../workspaces
 WORKSPACES_DIR = os.path.join(PROJECT_ROOT, "workspaces")
@@ -0,0 +1,105 @@
+import json
+import uuid
+import struct
+import datetime
+from websockets.asyncio.client import connect
+from websockets.protocol import State
+from config import JUPYTER_URL, JUPYTER_TOKEN
+
+
+def create_jupyter_message(session_id, msg_type, content):
+    return {
+        "header": {
+            "msg_id": uuid.uuid4().hex,
+            "username": "datastudio_bridge",
+            "session": session_id,
+            "msg_type": msg_type,
+            "version": "5.3",
+            "date": datetime.datetime.now().isoformat()
+        },
+        "parent_header": {},
+        "metadata": {},
+        "content": content
+    }
+
+
+def parse_binary_message(data):
+    """
+    Split a binary Jupyter websocket frame into (msg, buffers).
+
+    Frame layout (jupyter_server serialize_binary_message): uint32 nbufs, nbufs
+    uint32 offsets, the JSON message, then the raw buffers. Only the JSON part is
+    decoded; buffers are returned as memoryview slices of the frame.
+    """
+    view = memoryview(data)
+    nbufs = struct.unpack_from("!I", view, 0)[0]
+    offsets = struct.unpack_from(f"!{nbufs}I", view, 4)
+    ends = offsets[1:] + (len(view),)
+    msg = json.loads(bytes(view[offsets[0]:ends[0]]))
+    buffers = [view[start:end] for start, end in zip(offsets[1:], ends[1:])]
+    return msg, buffers
+
+
+class JupyterChannel:
+    """
+    asyncio WebSocket connection to a Jupyter kernel or terminal channel.
+
+    All connections are multiplexed on the event loop, so an open editor or
+    terminal costs a socket and a coroutine instead of a parked worker thread.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    @classmethod
+    async def connect(cls, url, origin=JUPYTER_URL):
+        conn = await connect(
+            url,
+            origin=origin,
+            max_size=None,      # Arrow frames can be arbitrarily large
+            compression=None,   # Bridge and Jupyter are co-located, deflate only burns CPU
+            ping_interval=None,
+        )
+        return cls(conn)
+
+    @property
+    def connected(self):
+        return self._conn.state is State.OPEN
+
+    async def send(self, data):
+        await self._conn.send(data)
+
+    async def send_json(self, msg):
+        await self._conn.send(json.dumps(msg))
+
+    async def recv(self):
+        return await self._conn.recv()
+
+    async def recv_json(self):
+        return json.loads(await self._conn.recv())
+
+    async def recv_message(self):
+        """Receive a kernel message as (msg, buffers); buffers is empty for text frames."""
+        raw = await self._conn.recv()
+        if isinstance(raw, str):
+            return json.loads(raw), []
+        return parse_binary_message(raw)
+
+    def __aiter__(self):
+        return self._conn.__aiter__()
+
+    async def close(self):
+        try: await self._conn.close()
+        except: pass
+
+
+def _ws_base():
+    return f"ws://{JUPYTER_URL.split('//')[1]}"
+
+
+async def open_kernel_channel(kernel_id):
+    return await JupyterChannel.connect(f"{_ws_base()}/api/kernels/{kernel_id}/channels?token={JUPYTER_TOKEN}")
+
+
+async def open_terminal_channel(terminal_name):
+    return await JupyterChannel.connect(f"{_ws_base()}/terminals/websocket/{terminal_name}?token={JUPYTER_TOKEN}")
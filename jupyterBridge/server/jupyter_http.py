@@ -0,0 +1,84 @@
+import time
+import asyncio
+import httpx
+from config import JUPYTER_URL, HEADERS, JUPYTER_HTTP_TIMEOUT, JUPYTER_HTTP_RETRIES
+from metrics import JUPYTER_HTTP_SECONDS
+
+IDEMPOTENT_METHODS = {"GET", "DELETE", "PATCH", "PUT"}
+RETRY_STATUS = {502, 503, 504}
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+
+
+class JupyterHTTP:
+    """
+    Pooled async client for the Jupyter REST API (kernels, terminals).
+
+    One instance is shared by all routes and owned by the app lifecycle in
+    main.py, so REST calls reuse keep-alive connections and never block the
+    event loop.
+    """
+
+    def __init__(self, base_url=JUPYTER_URL, headers=HEADERS, timeout=JUPYTER_HTTP_TIMEOUT, retries=JUPYTER_HTTP_RETRIES):
+        self.base_url = base_url
+        self.headers = headers
+        self.timeout = timeout
+        self.retries = retries
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                # Connection failures are retried by the transport for every method. Pool limits go to the
+                # transport too: AsyncClient ignores limits= when a transport is given.
+                transport=httpx.AsyncHTTPTransport(limits=POOL_LIMITS, retries=self.retries),
+            )
+        return self._client
+
+    async def start(self):
+        return self.client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method, path, retry=None, **kwargs):
+        """Send a request; idempotent calls are also retried on timeouts and 502/503/504."""
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = self.retries + 1 if retry else 1
+
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            started = time.perf_counter()
+            try:
+                resp = await self.client.request(method, path, **kwargs)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                JUPYTER_HTTP_SECONDS.labels(method, "error").observe(time.perf_counter() - started)
+                if last:
+                    raise
+            else:
+                JUPYTER_HTTP_SECONDS.labels(method, str(resp.status_code)).observe(time.perf_counter() - started)
+                if resp.status_code not in RETRY_STATUS or last:
+                    return resp
+            await asyncio.sleep(0.2 * 2 ** attempt)
+
+    async def get(self, path, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def patch(self, path, **kwargs):
+        return await self.request("PATCH", path, **kwargs)
+
+    async def delete(self, path, **kwargs):
+        return await self.request("DELETE", path, **kwargs)
+
+
+jupyter_http = JupyterHTTP()
@@ -7,19 +7,86 @@ import json
 import time
 import platform
 import psutil
+import hashlib
+import importlib.metadata
+import importlib.util
+import threading
+import queue
+import shutil
+import atexit
+import tempfile
+import weakref
+import re
 from datetime import datetime
 
 # --- 1. KÜTÜPHANE YÜKLEYİCİ ---
 # Bu kısım main.py tarafından {{REQUIRED_PACKAGES}} ile doldurulacak
 required_packages = {{REQUIRED_PACKAGES}}
+
+# Paket listesi + yorumlayıcı parmak izi venv içinde saklanır; değişmediyse pip hiç çalıştırılmaz
+_REQ_STAMP = os.path.join(sys.prefix, ".datastudio-requirements")
+
+def _requirements_fingerprint(packages):
+    normalized = sorted({" ".join(p.split()).lower() for p in packages if p.strip()})
+    payload = json.dumps({"python": sys.executable, "version": sys.version, "requirements": normalized})
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _requirements_satisfied(packages, check_versions=True):
+    # Kurulu paket metadata'sı ile süreç içinde kontrol (pip/subprocess yok)
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        Requirement = None
+    for spec in packages:
+        try:
+            if Requirement is not None:
+                req = Requirement(spec)
+                if req.marker is not None and not req.marker.evaluate():
+                    continue
+                name, specifier = req.name, req.specifier
+            else:
+                name, specifier = spec.split(";")[0].split("[")[0], None
+                for sep in "<>=!~ @":
+                    name = name.split(sep)[0]
+            version = importlib.metadata.version(name.strip())
+            if check_versions and specifier and not specifier.contains(version, prereleases=True):
+                return False
+        except importlib.metadata.PackageNotFoundError:
+            return False
+        except Exception:
+            # Doğrulanamayan satır (-r, URL vb.): yalnızca parmak izi eşleşirse kabul edilir
+            if check_versions:
+                return False
+    return True
+
 if required_packages:
     try:
-        # Pip'i sessiz modda çalıştır
-        subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", "-q", "--disable-pip-version-check", *required_packages],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.STDOUT
-        )
+        fingerprint = _requirements_fingerprint(required_packages)
+        try:
+            with open(_REQ_STAMP, "r") as f:
+                stamp = f.read().strip()
+        except OSError:
+            stamp = None
+
+        if stamp == fingerprint:
+            # Liste değişmedi; yalnızca paketlerin venv'den silinmediğini doğrula
+            needs_install = not _requirements_satisfied(required_packages, check_versions=False)
+        else:
+            needs_install = not _requirements_satisfied(required_packages)
+
+        if needs_install:
+            # Pip'i sessiz modda çalıştır
+            subprocess.check_call(
+                [sys.executable, "-m", "pip", "install", "-q", "--disable-pip-version-check", *required_packages],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.STDOUT
+            )
+        if needs_install or stamp != fingerprint:
+            try:
+                with open(_REQ_STAMP, "w") as f:
+                    f.write(fingerprint)
+            except OSError:
+                pass
     except Exception:
         pass
 
@@ -29,6 +96,7 @@ try:
     import pyarrow as pa
     from IPython import get_ipython
     from IPython.display import display
+    from IPython.core.error import StdinNotImplementedError
     
     # Rich Konfigürasyonu
     try:
@@ -45,7 +113,66 @@ try:
         pass
 
     # DuckDB Bağlantısı
-    con = duckdb.connect(':memory:')
+    # Bellek sınırı aşıldığında DuckDB tabloları temp dizinine taşar (spill); büyük stream(name=...) OOM olmaz
+    DUCKDB_TEMP_DIR = os.environ.get("DATASTUDIO_DUCKDB_TEMP_DIR") or \
+        os.path.join(tempfile.gettempdir(), f"datastudio-duckdb-{os.getpid()}")
+    DUCKDB_MEMORY_LIMIT = os.environ.get("DATASTUDIO_DUCKDB_MEMORY_LIMIT")  # örn. "4GB"; boşsa DuckDB varsayılanı
+    _duckdb_config = {"temp_directory": DUCKDB_TEMP_DIR}
+    if DUCKDB_MEMORY_LIMIT:
+        _duckdb_config["memory_limit"] = DUCKDB_MEMORY_LIMIT
+    con = duckdb.connect(':memory:', config=_duckdb_config)
+    if not os.environ.get("DATASTUDIO_DUCKDB_TEMP_DIR"):
+        atexit.register(shutil.rmtree, DUCKDB_TEMP_DIR, True)
+
+    # UI Veri Kanalı (comm): Arrow IPC baytları JSON/base64'e çevrilmeden
+    # Jupyter binary buffer olarak köprüye gider. Comm yoksa display yoluna düşülür.
+    # "comm": binary buffer, "display": eski application/vnd.apache.arrow.stream (base64) yolu
+    ARROW_TRANSPORT = "comm"
+    _DS_COMM = None
+
+    def _datastudio_comm():
+        global _DS_COMM
+        if ARROW_TRANSPORT != "comm" or not getattr(get_ipython(), "kernel", None):
+            return None
+        if _DS_COMM is None:
+            try:
+                try:
+                    from comm import create_comm
+                    _DS_COMM = create_comm(target_name="datastudio")
+                except ImportError:
+                    from ipykernel.comm import Comm
+                    _DS_COMM = Comm(target_name="datastudio")
+            except Exception:
+                _DS_COMM = False
+        return _DS_COMM or None
+
+    # IPC Sıkıştırma ve Sözlük Kodlaması: UI çözebildiği özellikleri istek seçeneklerinde bildirir
+    # ("arrow": {"compression": ["zstd", "lz4"], "dictionary": true}); bildirmezse IPC eskisi gibi yazılır.
+    ARROW_DICTIONARY_MAX_RATIO = 0.5         # farklı değer / satır oranı bunun altındaki string sütunlar sözlükle kodlanır
+    ARROW_DICTIONARY_MIN_ROWS = 64
+    ARROW_COMPRESSION_MIN_BYTES = 16 * 1024  # daha küçük gövdelerde sıkıştırma kazandırmaz
+
+    def _arrow_ipc_features():
+        opts = _ds_options().get("arrow") or {}
+        # UI'ın tercih sırasındaki ilk, bu pyarrow'da da bulunan codec
+        codec = next((c for c in opts.get("compression") or [] if c in ("zstd", "lz4") and pa.Codec.is_available(c)), None)
+        return codec, bool(opts.get("dictionary"))
+
+    def _dictionary_encode(table):
+        if table.num_rows < ARROW_DICTIONARY_MIN_ROWS:
+            return table
+        for i, field in enumerate(table.schema):
+            if not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+                continue
+            encoded = table.column(i).dictionary_encode()
+            distinct = max((len(chunk.dictionary) for chunk in encoded.chunks), default=0)
+            if distinct > ARROW_DICTIONARY_MAX_RATIO * table.num_rows:
+                continue
+            # İndeks genişliği sözlüğe göre: 127'ye kadar değer 1 bayt, 32767'ye kadar 2 bayt
+            index_type = pa.int8() if distinct <= 127 else pa.int16() if distinct <= 32767 else pa.int32()
+            encoded = encoded.cast(pa.dictionary(index_type, field.type))
+            table = table.set_column(i, field.with_type(encoded.type), encoded)
+        return table
 
     class ArrowWrapper:
         def __init__(self, obj):
@@ -56,25 +183,1007 @@ try:
             else:
                 self.table = obj
 
+        def _ipc_buffer(self):
+            table, options = self.table, None
+            codec, dictionary = _arrow_ipc_features()
+            if codec or dictionary:
+                if dictionary:
+                    table = _dictionary_encode(table)
+                if table.nbytes < ARROW_COMPRESSION_MIN_BYTES:
+                    codec = None
+                options = pa.ipc.IpcWriteOptions(compression=codec, unify_dictionaries=dictionary)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            return sink.getvalue()
+
         def _repr_mimebundle_(self, include=None, exclude=None):
-            sink = io.BytesIO()
-            with pa.ipc.new_stream(sink, self.table.schema) as writer:
-                writer.write_table(self.table)
-            return {'application/vnd.apache.arrow.stream': sink.getvalue()}
+            return {'application/vnd.apache.arrow.stream': self._ipc_buffer().to_pybytes()}
 
         def _ipython_display_(self):
+            comm = _datastudio_comm()
+            if comm is not None:
+                comm.send(data={"kind": "arrow"}, buffers=[memoryview(self._ipc_buffer())])
+                return
             ip = get_ipython()
             if ip:
                 ip.display_pub.publish(data=self._repr_mimebundle_())
 
+    # İstek seçenekleri: köprü bunları execute_request metadata'sına ("datastudio") koyar
+    def _ds_options():
+        try:
+            kernel = get_ipython().kernel
+            parent = kernel.get_parent("shell") if hasattr(kernel, "get_parent") else kernel._parent_header
+            return ((parent or {}).get("metadata") or {}).get("datastudio") or {}
+        except Exception:
+            return {}
+
+    # Akış Kontrolü: UI'ın verdiği krediler (batch / bayt) bitince stream() veri çekmeyi durdurur.
+    # Krediler stdin kanalından istenir (input_request), böylece hücre çalışırken de yanıt alınabilir.
+    class FlowControl:
+        PROMPT = "__DS_CREDIT__"
+
+        def __init__(self):
+            self.enabled = bool(_ds_options().get("flow_control"))
+            # None: UI bu krediyi hiç vermedi, o bütçe sınırsızdır (yalnızca bayt veren UI batch'te beklemez).
+            # İkisi de None iken ilk batch için kredi istenir.
+            self.batches = None
+            self.bytes = None
+
+        def _blocked(self):
+            if self.batches is None and self.bytes is None:
+                return True
+            return (self.batches is not None and self.batches <= 0) or (self.bytes is not None and self.bytes <= 0)
+
+        def acquire(self, nbytes=0):
+            if not self.enabled:
+                return
+            while self._blocked():
+                try:
+                    grant = json.loads(get_ipython().kernel.raw_input(self.PROMPT) or "{}")
+                except StdinNotImplementedError:
+                    self.enabled = False
+                    return
+                if grant.get("batches") is not None:
+                    self.batches = (self.batches or 0) + int(grant["batches"])
+                if grant.get("bytes") is not None:
+                    self.bytes = (self.bytes or 0) + int(grant["bytes"])
+            # Bayt kredisi bir batch kadar eksiye düşebilir; büyük bir batch akışı kilitlemez
+            if self.batches is not None:
+                self.batches -= 1
+            if self.bytes is not None:
+                self.bytes -= nbytes
+
+    # DuckDB sürüm uyumu: fetch_arrow_table yeni sürümlerde to_arrow_table oldu
+    def _arrow_table(rel):
+        if hasattr(rel, 'to_arrow_table'):
+            return rel.to_arrow_table()
+        return rel.fetch_arrow_table()
+
+    # UI'a yapılandırılmış mesaj (sonuç tanımı, pencere) gönderir; comm yoksa display_data kullanılır.
+    # payload: hazır Arrow IPC baytları (sürekli akış parçaları), table yerine doğrudan gönderilir
+    def _ds_publish(data, table=None, payload=None):
+        if table is not None:
+            payload = ArrowWrapper(table)._ipc_buffer()
+        comm = _datastudio_comm()
+        if comm is not None:
+            comm.send(data=data, buffers=[memoryview(payload)] if payload is not None else None)
+            return
+        ip = get_ipython()
+        if ip:
+            bundle = {"application/vnd.datastudio+json": data}
+            if payload is not None:
+                bundle['application/vnd.apache.arrow.stream'] = bytes(payload)
+            ip.display_pub.publish(data=bundle)
+
+    # Sürekli Arrow Akışı: UI "continuous" bildirirse bir sonucun tüm batch'leri tek IPC akışı olarak gider.
+    # Şema bir kez (part "schema"), ardından yalnızca record batch mesajları ("batch"), en sonda bitiş
+    # işareti ("end"). Çerçeveler result_id ve seq taşır; sırayla birleştirilince geçerli tek bir IPC akışıdır.
+    _STREAM_SEQ = [0]
+
+    def _continuous_arrow():
+        return bool((_ds_options().get("arrow") or {}).get("continuous"))
+
+    class _ArrowResultStream:
+        def __init__(self):
+            _STREAM_SEQ[0] += 1
+            self.result_id = f"_ds_stream_{_STREAM_SEQ[0]}"
+            self.seq = 0
+            self.rows = 0
+            self.batches = 0
+            self.codec, self.dictionary = _arrow_ipc_features()
+            self.sink = io.BytesIO()
+            self.writer = None
+            self.schema = None
+            self.prefix = b""
+
+        def _open(self, table):
+            if self.dictionary:
+                # Sözlük sütunları ilk batch'e göre seçilir; sonraki batch'lerde sözlük büyüyebileceği için indeks int32
+                table = _dictionary_encode(table)
+                fields = [f.with_type(pa.dictionary(pa.int32(), f.type.value_type)) if pa.types.is_dictionary(f.type) else f
+                          for f in table.schema]
+                self.schema = pa.schema(fields, metadata=table.schema.metadata)
+            else:
+                self.schema = table.schema
+            self.dictionary_columns = [i for i, f in enumerate(self.schema) if pa.types.is_dictionary(f.type)]
+            # Sıkıştırma yoksa yazıcı thread'leri küçük batch'lerde kazançtan çok yük getirir
+            options = pa.ipc.IpcWriteOptions(compression=self.codec, unify_dictionaries=self.dictionary,
+                                             use_threads=self.codec is not None)
+            self.writer = pa.ipc.new_stream(self.sink, self.schema, options=options)
+            # Yazıcı şemayı ilk batch'le birlikte yazar; aynı baytlar ayrı "schema" çerçevesi olarak önden gider
+            self.prefix = self.schema.serialize().to_pybytes()
+            self._send("schema", self.prefix)
+
+        def _conform(self, table):
+            for i in self.dictionary_columns:
+                column = table.column(i)
+                if not pa.types.is_dictionary(column.type):
+                    table = table.set_column(i, self.schema.field(i), column.dictionary_encode())
+            return table if table.schema == self.schema else table.cast(self.schema)
+
+        def _drain(self):
+            data = self.sink.getvalue()
+            self.sink.seek(0)
+            self.sink.truncate()
+            if self.prefix and data.startswith(self.prefix):
+                data = data[len(self.prefix):]
+                self.prefix = b""
+            return data
+
+        def _send(self, part, payload, **fields):
+            _ds_publish({"kind": "arrow_stream", "result_id": self.result_id, "seq": self.seq, "part": part, **fields},
+                        payload=payload)
+            self.seq += 1
+
+        def write(self, batch):
+            table = ArrowWrapper(batch).table
+            if self.writer is None:
+                self._open(table)
+            if table.num_rows == 0:
+                return
+            self.writer.write_table(self._conform(table))
+            self.rows += table.num_rows
+            self.batches += 1
+            self._send("batch", self._drain(), rows=table.num_rows)
+
+        def close(self):
+            if self.writer is None:
+                return
+            self.writer.close()
+            self.writer = None
+            self._send("end", self._drain(), rows=self.rows, batches=self.batches)
+
+    # Yapılandırılmış ölçümler (satır sayısı, süre): köprü bunları /metrics'e ve UI'a iletir
+    def _ds_stats(op, **fields):
+        try:
+            _ds_publish({"kind": "stats", "op": op, **fields})
+        except Exception:
+            pass
+
+    # Sunucu Taraflı Sonuçlar: büyük sonuçlar çekirdekte adlandırılmış handle olarak tutulur,
+    # DataGrid yalnızca görünen satırları fetch_window() ile ister (sıralama/filtre DuckDB'de yapılır)
+    _RESULTS = {}
+    _RESULT_SEQ = [0]
+
+    def _qi(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def _next_result_name():
+        _RESULT_SEQ[0] += 1
+        return f"_ds_result_{_RESULT_SEQ[0]}"
+
+    class _StoredTable:
+        '''DuckDB tablosuna yazılmış sonuç: satırlar Python belleğinde tutulmaz, pencereler tablodan okunur.'''
+        def __init__(self, name):
+            self.name = name
+            self.num_rows = con.execute(f"SELECT count(*) FROM {_qi(name)}").fetchone()[0]
+            self.schema = _arrow_table(con.sql(f"SELECT * FROM {_qi(name)} LIMIT 0")).schema
+
+    class _LazyResult:
+        '''Görünüm (view) olarak tutulan sonuç: sorgu yalnızca pencere/profil/dışa aktarma istendiğinde çalışır.
+        Satır sayısı bilinmiyorsa ilk ihtiyaçta bir kez sayılır.'''
+        def __init__(self, name, known_rows=None):
+            self.name = name
+            self.known_rows = known_rows
+            self.schema = _arrow_table(con.sql(f"SELECT * FROM {_qi(name)} LIMIT 0")).schema
+
+        @property
+        def num_rows(self):
+            if self.known_rows is None:
+                self.known_rows = con.execute(f"SELECT count(*) FROM {_qi(self.name)}").fetchone()[0]
+            return self.known_rows
+
+    def keep_lazy(rel, name=None, known_rows=None):
+        '''
+        DuckDB relation'ı materyalize etmeden geçici (TEMP) görünüm olarak saklar ve handle adını döner.
+        Görünüm olarak yazılamayan relation'lar (SHOW/DESCRIBE, CALL/EXPLAIN sonucu) geçici tabloya alınır.
+        '''
+        if name is None:
+            name = _next_result_name()
+        try:
+            con.execute(f"CREATE OR REPLACE TEMP VIEW {_qi(name)} AS {rel.sql_query()}")
+        except duckdb.Error:
+            _ds_source = rel
+            con.execute(f"CREATE OR REPLACE TEMP TABLE {_qi(name)} AS SELECT * FROM _ds_source")
+            _RESULTS[name] = _StoredTable(name)
+            return name
+        _RESULTS[name] = _LazyResult(name, known_rows)
+        return name
+
+    def snapshot_result(handle):
+        '''
+        Tembel (görünüm) handle'ı o anki içeriğiyle geçici tabloya çevirir; sonraki yazmalar sonucu değiştirmez.
+        '''
+        entry = _RESULTS.get(handle)
+        if not isinstance(entry, _LazyResult):
+            return
+        stage = f"_ds_snapshot_{handle}"
+        con.execute(f"CREATE OR REPLACE TEMP TABLE {_qi(stage)} AS SELECT * FROM {_qi(handle)}")
+        con.execute(f"DROP VIEW IF EXISTS {_qi(handle)}")
+        con.execute(f"ALTER TABLE {_qi(stage)} RENAME TO {_qi(handle)}")
+        _RESULTS[handle] = _StoredTable(handle)
+
+    def keep_result(obj, name=None):
+        '''
+        Sonucu (Arrow Table/RecordBatch veya DuckDB relation) handle olarak saklar ve handle adını döner.
+        '''
+        if name is None:
+            name = _next_result_name()
+        if isinstance(obj, duckdb.DuckDBPyRelation):
+            obj = _arrow_table(obj)
+        table = ArrowWrapper(obj).table
+        if not isinstance(table, pa.Table):
+            table = pa.table(table)
+        con.register(name, table)
+        _RESULTS[name] = table
+        return name
+
+    def release_result(handle):
+        entry = _RESULTS.pop(handle, None)
+        if isinstance(entry, _StoredTable):
+            try: con.execute(f"DROP TABLE IF EXISTS {_qi(handle)}")
+            except Exception: pass
+        elif isinstance(entry, _LazyResult):
+            try: con.unregister(handle)
+            except Exception: pass
+            try: con.execute(f"DROP VIEW IF EXISTS {_qi(handle)}")
+            except Exception: pass
+        elif entry is not None:
+            try: con.unregister(handle)
+            except Exception: pass
+
+    def _result_descriptor(handle, shown_rows):
+        table = _RESULTS[handle]
+        descriptor = {
+            "kind": "result",
+            "handle": handle,
+            # Tembel sonuçta sayım sorguyu yeniden çalıştırır; bilinmiyorsa None gider, ilk pencere bildirir
+            "total_rows": table.known_rows if isinstance(table, _LazyResult) else table.num_rows,
+            "shown_rows": shown_rows,
+            "columns": [{"name": f.name, "type": str(f.type)} for f in table.schema],
+        }
+        if isinstance(table, _LazyResult):
+            descriptor["lazy"] = True
+        return descriptor
+
+    _WINDOW_OPS = {"=": "=", "!=": "<>", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+    def _window_filter(filters):
+        clauses, params = [], []
+        for f in filters or []:
+            col, op = _qi(f["column"]), f.get("op", "=")
+            if op in _WINDOW_OPS:
+                clauses.append(f"{col} {_WINDOW_OPS[op]} ?")
+                params.append(f.get("value"))
+            elif op in ("contains", "starts_with"):
+                clauses.append(f"{op}(lower(CAST({col} AS VARCHAR)), lower(?))")
+                params.append(str(f.get("value", "")))
+            elif op == "is_null":
+                clauses.append(f"{col} IS NULL")
+            elif op == "not_null":
+                clauses.append(f"{col} IS NOT NULL")
+            else:
+                raise ValueError(f"Desteklenmeyen filtre operatörü: {op}")
+        return " AND ".join(clauses), params
+
+    def fetch_window(handle, offset=0, limit=200, sort=None, filter=None):
+        '''
+        Saklanan bir sonucun offset'ten başlayan `limit` satırlık penceresini UI'a gönderir.
+        sort: [{"column": "a", "desc": true}], filter: [{"column": "a", "op": ">=", "value": 10}]
+        '''
+        if handle not in _RESULTS:
+            raise KeyError(f"Sonuç bulunamadı: {handle}")
+        where, params = _window_filter(filter)
+        base = f"FROM {_qi(handle)}" + (f" WHERE {where}" if where else "")
+        order = ", ".join(f"{_qi(s['column'])} {'DESC' if s.get('desc') else 'ASC'}" for s in sort or [])
+        total = con.execute(f"SELECT count(*) {base}", params).fetchone()[0] if where else _RESULTS[handle].num_rows
+        sql = f"SELECT * {base}" + (f" ORDER BY {order}" if order else "") + f" LIMIT {int(limit)} OFFSET {int(offset)}"
+        table = _arrow_table(con.execute(sql, params))
+        _ds_publish({"kind": "window", "handle": handle, "offset": int(offset), "rows": table.num_rows, "total_rows": total}, table)
+
+    def export_result(handle, path, format=None):
+        '''
+        Saklanan sonucun tamamını DuckDB COPY ile dosyaya yazar; tembel sonuçta sorgu bu sırada çalışır.
+        format: parquet, csv veya json (verilmezse dosya uzantısından)
+        '''
+        if handle not in _RESULTS:
+            raise KeyError(f"Sonuç bulunamadı: {handle}")
+        fmt = (format or os.path.splitext(path)[1].lstrip('.') or "parquet").lower()
+        if fmt not in ("parquet", "csv", "json"):
+            raise ValueError(f"Desteklenmeyen dışa aktarma biçimi: {fmt}")
+        start = time.time()
+        target = "'" + str(path).replace("'", "''") + "'"
+        rows = con.execute(f"COPY (SELECT * FROM {_qi(handle)}) TO {target} (FORMAT {fmt})").fetchone()[0]
+        duration = time.time() - start
+        print(f"\x1b[32m✔ Dışa aktarıldı:\x1b[0m {path} ({rows} satır, {duration:.3f} sn)", flush=True)
+        _ds_stats("export", status="ok", rows=rows, seconds=round(duration, 6))
+        return rows
+
+    # Sütun Profili: boş sayısı, min/max, yaklaşık farklı değer (SUMMARIZE) ve histogram / en sık değerler.
+    # Sonuç PROFILE_SAMPLE_ROWS satırdan büyükse profil rezervuar örneklemi üzerinden çıkarılır;
+    # sonuç bir kez taranır, ağır istatistikler (çeyrekler, histogram) yalnızca örneklemde hesaplanır.
+    PROFILE_SAMPLE_ROWS = 100_000
+    PROFILE_HISTOGRAM_BINS = 10
+    PROFILE_TOP_VALUES = 10
+
+    def _json_value(value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    def _profile_column(sample, field, summary):
+        col = _qi(field.name)
+        column = {
+            "name": field.name,
+            "type": summary["column_type"],
+            "min": summary["min"],
+            "max": summary["max"],
+            "approx_distinct": summary["approx_unique"],
+        }
+        if summary["avg"] is not None:
+            column["mean"] = summary["avg"]
+            column["std"] = summary["std"]
+            column["quantiles"] = [summary["q25"], summary["q50"], summary["q75"]]
+        t = field.type
+        if pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_decimal(t) or pa.types.is_temporal(t):
+            rows = con.execute(f"SELECT bin, count FROM histogram_values({_qi(sample)}, {col}, "
+                               f"bin_count := {int(PROFILE_HISTOGRAM_BINS)})").fetchall()
+            column["histogram"] = [{"upper": _json_value(b), "count": c} for b, c in rows]
+        elif pa.types.is_string(t) or pa.types.is_large_string(t) or pa.types.is_boolean(t) or pa.types.is_dictionary(t):
+            rows = con.execute(f"SELECT {col}, count(*) AS n FROM {_qi(sample)} WHERE {col} IS NOT NULL "
+                               f"GROUP BY 1 ORDER BY n DESC, 1 LIMIT {int(PROFILE_TOP_VALUES)}").fetchall()
+            column["top"] = [{"value": _json_value(v), "count": c} for v, c in rows]
+        return column
+
+    def profile_result(handle, sample_rows=None):
+        '''
+        Saklanan sonucun sütun profilini UI'a gönderir (kind "profile") ve sözlük olarak döner.
+        sample_rows: profilin çıkarılacağı en fazla satır (varsayılan PROFILE_SAMPLE_ROWS)
+        '''
+        if handle not in _RESULTS:
+            raise KeyError(f"Sonuç bulunamadı: {handle}")
+        sample_rows = PROFILE_SAMPLE_ROWS if sample_rows is None else int(sample_rows)
+        entry = _RESULTS[handle]
+        sample = "_ds_profile_sample"
+        start = time.time()
+        try:
+            con.execute(f"CREATE OR REPLACE TEMP TABLE {_qi(sample)} AS SELECT * FROM {_qi(handle)} "
+                        f"USING SAMPLE reservoir({sample_rows} ROWS) REPEATABLE (42)")
+            fields = list(_arrow_table(con.sql(f"SELECT * FROM {_qi(sample)} LIMIT 0")).schema)
+            counts = con.execute(f"SELECT count(*)" + "".join(
+                f", count(*) - count({_qi(f.name)})" for f in fields) + f" FROM {_qi(sample)}").fetchone()
+            sampled = counts[0]
+            if isinstance(entry, _LazyResult) and entry.known_rows is None and sampled < sample_rows:
+                entry.known_rows = sampled  # örneklem sonucun tamamı; ayrıca sayılmaz
+            total = entry.num_rows
+            summarize = con.sql(f"SUMMARIZE {_qi(sample)}")
+            names = summarize.columns
+            summaries = {row[0]: dict(zip(names, row)) for row in summarize.fetchall()}
+            columns = []
+            for field, nulls in zip(fields, counts[1:]):
+                column = _profile_column(sample, field, summaries[field.name])
+                column["nulls"] = nulls
+                column["null_fraction"] = round(nulls / sampled, 6) if sampled else None
+                columns.append(column)
+        except Exception:
+            _ds_stats("profile", status="error", rows=None, seconds=round(time.time() - start, 6))
+            raise
+        finally:
+            try: con.execute(f"DROP TABLE IF EXISTS {_qi(sample)}")
+            except Exception: pass
+        duration = time.time() - start
+        profile = {
+            "kind": "profile",
+            "handle": handle,
+            "total_rows": total,
+            "sample_rows": sampled,
+            "sampled": sampled < total,
+            "seconds": round(duration, 6),
+            "columns": columns,
+        }
+        _ds_publish(profile)
+        _ds_stats("profile", status="ok", rows=sampled, seconds=round(duration, 6))
+        return profile
+
+    # Yerel Arrow okuyucusu: sürücü veriyi zaten sütunsal veriyorsa satır satır dönüştürme yapılmaz
+    def _arrow_batches(obj, batch_size):
+        if isinstance(obj, pa.RecordBatchReader):
+            return obj
+        if hasattr(obj, 'to_arrow_reader'):        # DuckDB relation / bağlantı (yeni sürümler)
+            return obj.to_arrow_reader(batch_size)
+        if hasattr(obj, 'record_batch_reader'):    # DuckDB relation (eski sürümler)
+            return obj.record_batch_reader(batch_size=batch_size)
+        if hasattr(obj, 'fetch_record_batch'):     # ADBC cursor, eski DuckDB
+            try:
+                return obj.fetch_record_batch(batch_size)
+            except TypeError:
+                return obj.fetch_record_batch()
+        if hasattr(obj, 'fetcharrowbatches'):      # turbodbc
+            return (b for t in obj.fetcharrowbatches() for b in (t.to_batches() if isinstance(t, pa.Table) else [t]))
+        if isinstance(getattr(obj, 'schema', None), pa.Schema) and hasattr(obj, '__iter__') \
+                and not isinstance(obj, (pa.Table, pa.RecordBatch)):
+            return iter(obj)                       # arrow-odbc BatchReader vb.
+        return None
+
+    # DB-API cursor -> Arrow: şema cursor.description tip kodlarından bir kez çıkarılır
+    # (pyodbc / mssql_python Python tiplerini verir), her batch aynı şemayla üretilir.
+    import decimal as _decimal
+    import datetime as _dt
+    import uuid as _uuid
+
+    _PY_ARROW_TYPES = {
+        bool: pa.bool_(),
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bytes: pa.binary(),
+        bytearray: pa.binary(),
+        _dt.datetime: pa.timestamp('us'),
+        _dt.date: pa.date32(),
+        _dt.time: pa.time64('us'),
+        _uuid.UUID: pa.string(),
+    }
+
+    def _description_type(col):
+        type_code = col[1] if len(col) > 1 else None
+        if type_code is _decimal.Decimal:
+            precision, scale = (col[4], col[5]) if len(col) > 5 else (None, None)
+            if isinstance(precision, int) and 0 < precision <= 38 and isinstance(scale, int) and 0 <= scale <= precision:
+                return pa.decimal128(precision, scale)
+            return pa.decimal128(38, scale if isinstance(scale, int) and 0 <= scale <= 38 else 10)
+        if isinstance(type_code, type):
+            return _PY_ARROW_TYPES.get(type_code)
+        return None  # sqlite3, psycopg2 OID vb.: ilk batch'ten çıkarılır
+
+    class CursorArrowConverter:
+        '''
+        DB-API satırlarını sabit şemalı Arrow RecordBatch'lerine çevirir.
+        Tip kodu bilinmeyen sütunların tipi ilk NULL olmayan değerden belirlenir; o ana kadarki batch'ler bekletilir
+        (en fazla HOLD_ROWS satır) ve şema sabitlenince o tiple yayınlanır. Sınıra kadar hep NULL kalan sütun null
+        tipinde sabitlenir; sonradan değer gelirse metne çevrilmez, hata verilir.
+        '''
+        HOLD_ROWS = 1_000_000
+
+        def __init__(self, description):
+            self.names = [col[0] for col in description]
+            self.types = [_description_type(col) for col in description]
+            self.converters = [str if len(col) > 1 and col[1] is _uuid.UUID else None for col in description]
+            self.schema = None
+            self.held = []
+            self.held_rows = 0
+            self.nbytes = 0  # son convert() çağrısındaki satırların Arrow boyutu (batch boyutlayıcı için)
+
+        def convert(self, rows):
+            '''
+            Satırları çevirir ve yayınlanmaya hazır batch'leri döner; tipi bekleyen sütun varsa liste boştur.
+            '''
+            columns = list(zip(*rows)) if rows else [()] * len(self.names)
+            arrays = [self._column(i, values) for i, values in enumerate(columns)]
+            if self.schema is not None:
+                batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+                self.nbytes = batch.nbytes
+                return [batch]
+            batch = pa.RecordBatch.from_arrays(arrays, names=self.names)
+            self.nbytes = batch.nbytes
+            self.held.append(batch)
+            self.held_rows += batch.num_rows
+            if None in self.types and self.held_rows < self.HOLD_ROWS:
+                return []
+            return self.flush()
+
+        def flush(self):
+            '''
+            Şemayı sabitler ve bekletilen batch'leri döner (akış sonunda çağrılır).
+            '''
+            if self.schema is None:
+                self.types = [pa.null() if t is None else t for t in self.types]
+                self.schema = pa.schema([pa.field(n, t) for n, t in zip(self.names, self.types)])
+            held, self.held, self.held_rows = self.held, [], 0
+            # NULL dizileri her tipe cast edilebilir
+            return [pa.RecordBatch.from_arrays([c if c.type == t else c.cast(t) for c, t in zip(b.columns, self.types)],
+                                               schema=self.schema) for b in held]
+
+        def _column(self, i, values):
+            if self.converters[i] is not None:
+                values = [None if v is None else self.converters[i](v) for v in values]
+            arrow_type = self.types[i]
+            if arrow_type is None:
+                arr = pa.array(values)
+                if not pa.types.is_null(arr.type):
+                    self.types[i] = arr.type
+                return arr
+            if pa.types.is_null(arrow_type):
+                if any(v is not None for v in values):
+                    raise TypeError(f"'{self.names[i]}' sütununun ilk {self.HOLD_ROWS:,} satırı NULL olduğu için tipi "
+                                    f"belirlenemedi, sonradan değer geldi. Sorguda sütunu CAST ile tipleyin.")
+                return pa.nulls(len(values))
+            try:
+                return pa.array(values, type=arrow_type)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+                # Sürücü tip kodu ile gelen değer uyuşmuyor; güvenli cast dene, metinse str'e çevir
+                if pa.types.is_string(arrow_type):
+                    return pa.array([None if v is None else str(v) for v in values], type=arrow_type)
+                return pa.array(values).cast(arrow_type)
+
+    # Tabloya Kayıt: stream(name=...) batch'leri Python listesinde biriktirmek yerine her batch'i
+    # DuckDB tablosuna ekler; Python tarafında yalnızca o anki batch tutulur, gerisi DuckDB'nin
+    # buffer yöneticisindedir (memory_limit aşılırsa DUCKDB_TEMP_DIR'e taşar).
+    # "table": DuckDB tablosu (varsayılan), "view": eski davranış, Arrow tablosu bellekte tutulup con.register edilir.
+    # View yolu veri RAM'e sığdığı sürece tepe bellekte biraz daha düşüktür (ara tablo + INSERT kopyası yok), ancak
+    # taşamaz; RAM'i aşan sonuçlar OOM olur. Tablo en geç DuckDB sınırında (varsayılan RAM'in %80'i) DUCKDB_TEMP_DIR'e
+    # taşar. View yalnızca storage="view" ile ya da STREAM_STORAGE atanarak seçilir.
+    STREAM_STORAGE = "table"
+
+    class _TableSink:
+        '''
+        Batch'leri önce bir ara tabloya yazar, akış bitince (veya kesilince) `name` olarak yerine koyar.
+        Hata olursa ara tablo silinir ve aynı adlı eski tablo korunur. Yazma ayrı bir cursor'dan yapılır;
+        böylece kaynak `con` üzerindeki bir okuyucu olsa bile sonucu kapanmaz.
+        '''
+        # DuckDB satır grubundan (122880 satır) küçük INSERT'ler satır başına ~4 kat pahalı;
+        # batch'ler bir satır grubu (veya FLUSH_BYTES) dolana kadar biriktirilip tek seferde yazılır
+        FLUSH_ROWS = 122880
+        FLUSH_BYTES = 64 * 1024 * 1024
+
+        def __init__(self, name):
+            self.name = name
+            self.stage = f"_ds_stage_{name}"
+            self.cursor = None
+            self.rows = 0
+            self.pending = []
+            self.pending_rows = 0
+            self.pending_bytes = 0
+
+        def append(self, batch):
+            self.pending.append(batch)
+            self.pending_rows += batch.num_rows
+            self.pending_bytes += batch.nbytes
+            self.rows += batch.num_rows
+            if self.pending_rows >= self.FLUSH_ROWS or self.pending_bytes >= self.FLUSH_BYTES:
+                self.flush()
+
+        def flush(self):
+            if not self.pending:
+                return
+            if self.cursor is None:
+                self.cursor = con.cursor()
+                sql = f"CREATE OR REPLACE TABLE {_qi(self.stage)} AS SELECT * FROM _ds_batch"
+            else:
+                sql = f"INSERT INTO {_qi(self.stage)} SELECT * FROM _ds_batch"
+            self.cursor.register("_ds_batch", pa.Table.from_batches(self.pending))
+            try:
+                self.cursor.execute(sql)
+            finally:
+                self.cursor.unregister("_ds_batch")
+            self.pending, self.pending_rows, self.pending_bytes = [], 0, 0
+
+        def create_from(self, relation):
+            # DuckDB relation doğrudan CREATE TABLE AS ile yazılır (Arrow'a hiç çıkmaz).
+            # Relation başka bir bağlantıya aitse False döner, çağıran batch batch yazar.
+            _ds_source = relation
+            try:
+                con.execute(f"CREATE OR REPLACE TABLE {_qi(self.stage)} AS SELECT * FROM _ds_source")
+            except duckdb.InvalidInputException:
+                return False
+            # Okuyucu yok: sayım ve finish()'teki yeniden adlandırma da aynı bağlantıda (con) yapılır.
+            # Ayrı cursor'da DROP/RENAME, con.unregister sonrası tabloyu con'dan görünmez bırakıyordu.
+            self.cursor = con
+            self.rows = con.execute(f"SELECT count(*) FROM {_qi(self.stage)}").fetchone()[0]
+            return True
+
+        def finish(self):
+            self.flush()
+            if self.cursor is None:
+                return False
+            # Aynı adlı kayıtlı görünüm (con.register) tabloyu gölgelemesin
+            try: con.unregister(self.name)
+            except Exception: pass
+            for kind in ("VIEW", "TABLE"):
+                try: self.cursor.execute(f"DROP {kind} IF EXISTS {_qi(self.name)}")
+                except duckdb.CatalogException: pass
+            self.cursor.execute(f"ALTER TABLE {_qi(self.stage)} RENAME TO {_qi(self.name)}")
+            if self.cursor is not con:
+                self.cursor.close()
+            self.cursor = None
+            return True
+
+        def discard(self):
+            self.pending = []
+            if self.cursor is None:
+                return
+            try:
+                self.cursor.execute(f"DROP TABLE IF EXISTS {_qi(self.stage)}")
+                if self.cursor is not con:
+                    self.cursor.close()
+            except Exception:
+                pass
+            self.cursor = None
+
+    # Önden Çekme (prefetch): sürücü ağda beklerken ana thread önceki batch'i dönüştürüp yayınlar.
+    # Arka plan thread'i yalnızca fetch yapar; dönüştürme ve display/comm hep ana thread'de kalır.
+    # 0: sıralı (varsayılan). Bazı sürücüler cursor'ın başka thread'den kullanılmasına izin vermez (sqlite3).
+    STREAM_PREFETCH = 0
+
+    class _Prefetcher:
+        '''
+        fetch() çağrılarını arka planda yürütür, sonuçları en fazla `depth` elemanlık kuyrukta tutar.
+        fetch() None döndüğünde akış biter; sürücü hatası ana thread'de yeniden fırlatılır.
+        '''
+        JOIN_TIMEOUT = 5.0
+
+        def __init__(self, fetch, depth, cancel=None):
+            self.fetch = fetch
+            self.cancel = cancel
+            self.queue = queue.Queue(maxsize=max(1, int(depth)))
+            self.stop = threading.Event()
+            self.wait = 0.0  # ana thread'in veri beklediği süre: yüksekse darboğaz sürücüdür
+            self.thread = threading.Thread(target=self._run, name="datastudio-prefetch", daemon=True)
+            self.thread.start()
+
+        def _put(self, item):
+            # Kuyruk doluyken de stop'u görebilmek için kısa zaman aşımıyla beklenir
+            while not self.stop.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def _run(self):
+            try:
+                while not self.stop.is_set():
+                    chunk = self.fetch()
+                    if chunk is None:
+                        break
+                    if not self._put(("data", chunk)):
+                        return
+                self._put(("end", None))
+            except BaseException as e:
+                self._put(("error", e))
+
+        def __iter__(self):
+            while True:
+                waited = time.perf_counter()
+                while True:
+                    # Zaman aşımlı get: kesme (KeyboardInterrupt) ana thread'e hemen ulaşır
+                    try:
+                        kind, value = self.queue.get(timeout=0.1)
+                        break
+                    except queue.Empty:
+                        if not self.thread.is_alive() and self.queue.empty():
+                            return
+                self.wait += time.perf_counter() - waited
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise value
+                yield value
+
+        def close(self, interrupted=False):
+            '''
+            Fetcher'ı durdurur ve bitmesini bekler; dönüşte cursor başka thread'de kullanılmıyordur.
+            Kuyrukta kalan (henüz gösterilmemiş) chunk'lar atılır. Cursor'ı kapatmak çağıranın işidir.
+            '''
+            self.stop.set()
+            try:
+                while True:
+                    self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if interrupted and self.thread.is_alive() and self.cancel is not None:
+                # Sürücü çağrısında bloklanan fetch'i iptal et (pyodbc cursor.cancel, DuckDB interrupt)
+                try: self.cancel()
+                except Exception: pass
+            self.thread.join(self.JOIN_TIMEOUT)
+            if self.thread.is_alive():
+                print("\n\x1b[33m[UYARI]\x1b[0m Arka plandaki fetch hâlâ sürücüde bekliyor; "
+                      "bitene kadar cursor'ı kullanmayın veya kapatmayın.", flush=True)
+                return False
+            return True
+
+    # Uyarlanabilir Batch Boyutu: sabit 5000 satır geniş tablolarda onlarca MB'lık mesaj, dar tablolarda
+    # binlerce küçük mesaj demek. Boyut, ölçülen satır başı bayt ve fetch süresine göre hedeflere doğru ayarlanır.
+    STREAM_TARGET_BYTES = 4 * 1024 * 1024  # UI'a giden batch başına hedef Arrow boyutu
+    STREAM_TARGET_SECONDS = 0.5            # bir batch'in sürücüden gelmesi için hedef süre (ilerleme/ilk satırlar)
+
+    class _BatchSizer:
+        '''
+        stream() batch satır sayısı. batch_size verilmişse sabittir; verilmemişse her batch'ten sonra
+        satır başı bayt ve fetch süresi (üstel ortalama) ölçülür, iki hedeften küçüğünü veren boyuta
+        adım başına en fazla 2 kat değişerek gidilir.
+        '''
+        MIN_ROWS = 256
+        MAX_ROWS = 1_000_000
+
+        def __init__(self, batch_size=None, columns=0):
+            self.fixed = batch_size is not None
+            if self.fixed:
+                self.size = max(1, int(batch_size))
+            else:
+                # İlk tahmin sütun başına ~32 bayt, en fazla eski varsayılan olan 5000 satır
+                self.size = self._clamp(min(5000, STREAM_TARGET_BYTES // max(1, columns * 32)))
+            self.row_bytes = None
+            self.row_seconds = None
+            self.first = self.low = self.high = self.size
+
+        def _clamp(self, rows):
+            rows = int(min(self.MAX_ROWS, max(self.MIN_ROWS, rows)))
+            return rows - rows % self.MIN_ROWS
+
+        def observe(self, rows, nbytes, seconds):
+            if self.fixed or rows <= 0:
+                return
+            row_bytes, row_seconds = nbytes / rows, max(seconds, 0.0) / rows
+            if self.row_bytes is None:
+                self.row_bytes, self.row_seconds = row_bytes, row_seconds
+            else:
+                self.row_bytes = (self.row_bytes + row_bytes) / 2
+                self.row_seconds = (self.row_seconds + row_seconds) / 2
+            target = STREAM_TARGET_BYTES / max(self.row_bytes, 1e-9)
+            if self.row_seconds > 0:
+                target = min(target, STREAM_TARGET_SECONDS / self.row_seconds)
+            self.size = self._clamp(min(self.size * 2, max(self.size // 2, target)))
+            self.low, self.high = min(self.low, self.size), max(self.high, self.size)
+
+        def summary(self):
+            return {"mode": "fixed" if self.fixed else "auto", "first": self.first, "last": self.size,
+                    "min": self.low, "max": self.high}
+
+    def _column_count(obj):
+        if _frame_kind(obj) == "polars_lazy":
+            return len(obj.collect_schema())  # .schema LazyFrame'de planı çözer ve uyarı verir
+        for attr in ('schema', 'description', 'columns'):
+            try:
+                value = getattr(obj, attr, None)
+                if value:
+                    return len(value)
+            except Exception:
+                pass
+        return 0
+
+    def _concat_batches(batches):
+        if len(batches) == 1:
+            return batches[0]
+        if hasattr(pa, 'concat_batches'):
+            return pa.concat_batches(batches)
+        return pa.Table.from_batches(batches).combine_chunks().to_batches()[0]
+
+    def _rechunk(timed_batches, sizer):
+        '''
+        Yerel okuyucu batch'lerinin boyutu okuyucu açılınca sabitlenir; çıktı sizer.size'a yakın tutulur.
+        Büyük batch eşit parçalara bölünür (slice, kopyasız), küçükler boyut dolana kadar birleştirilir.
+        Artan satır bir sonraki batch'e taşınmaz; her batch için bir kopya yerine hiç ya da bir kopya olur.
+        '''
+        pending, pending_rows = [], 0
+        for batch, seconds in timed_batches:
+            sizer.observe(batch.num_rows, batch.nbytes, seconds)
+            if sizer.fixed:
+                yield batch
+                continue
+            if batch.num_rows == 0:
+                continue
+            if batch.num_rows >= sizer.size:
+                if pending:
+                    yield _concat_batches(pending)
+                    pending, pending_rows = [], 0
+                parts = max(1, round(batch.num_rows / sizer.size))
+                step = -(-batch.num_rows // parts)
+                for offset in range(0, batch.num_rows, step):
+                    yield batch.slice(offset, step)
+                continue
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= sizer.size:
+                yield _concat_batches(pending)
+                pending, pending_rows = [], 0
+        if pending:
+            yield _concat_batches(pending)
+
+    # Veri Çerçeveleri: pandas / polars DataFrame, Arrow tablo ve dataset'ler tek dev IPC mesajı yerine
+    # sizer boyutunda dilimler (slice, kopyasız) halinde akar. Kayıtta DuckDB nesneyi doğrudan tarar;
+    # tabloya kopyalanmaz (pandas NumPy/Arrow sütunları, polars ve Arrow bellekte olduğu gibi okunur).
+    def _frame_kind(obj):
+        module, cls = type(obj).__module__.split(".")[0], type(obj).__name__
+        if isinstance(obj, (pa.Table, pa.RecordBatch)):
+            return "arrow"
+        if module == "pandas" and cls == "DataFrame":
+            return "pandas"
+        if module == "polars" and cls in ("DataFrame", "LazyFrame"):
+            return "polars" if cls == "DataFrame" else "polars_lazy"
+        ds = sys.modules.get("pyarrow.dataset")
+        if ds is not None and isinstance(obj, ds.Dataset):
+            return "dataset"
+        if ds is not None and isinstance(obj, ds.Scanner):
+            return "scanner"  # tek kullanımlık: yalnızca akıtılır
+        return None
+
+    def _frame_view(obj):
+        '''DuckDB'nin kopyalamadan tarayabildiği çerçeve (görünüm olarak kaydedilir) ya da None.'''
+        kind = _frame_kind(obj)
+        if kind == "arrow" and isinstance(obj, pa.RecordBatch):
+            return pa.Table.from_batches([obj])
+        if kind in ("arrow", "pandas", "polars", "dataset"):
+            return obj
+        return None
+
+    def _register_view(name, obj):
+        # Aynı adlı eski tablo görünümün arkasında gizli kalmasın
+        try: con.execute(f"DROP TABLE IF EXISTS {_qi(name)}")
+        except duckdb.CatalogException: pass
+        con.register(name, obj)
+
+    def _slice_batches(table, sizer):
+        offset = 0
+        while offset < table.num_rows:
+            size = sizer.size  # her dilimde güncel boyut; _rechunk ölçtükçe büyür/küçülür
+            yield from table.slice(offset, size).to_batches()
+            offset += size
+
+    def _pandas_batches(df, sizer):
+        if type(df.index).__name__ != "RangeIndex":
+            df = df.reset_index()  # anlamlı index (set_index) sütun olarak gider
+        # NumPy sayısal ve Arrow destekli sütunlar kopyasız sarılır; yalnızca object sütunlar (Python str/Decimal)
+        # kopyalanarak çevrilir. Dilim dilim çevirmek şemayı ayrıca çıkarmayı gerektirdiği için toplamda daha yavaş.
+        yield from _slice_batches(pa.Table.from_pandas(df, preserve_index=False), sizer)
+
+    def _frame_batches(obj, sizer):
+        '''Çerçeveyi Arrow batch'leri olarak üretir; çerçeve değilse None.'''
+        kind = _frame_kind(obj)
+        if kind == "arrow":
+            return _slice_batches(_frame_view(obj), sizer)
+        if kind == "pandas":
+            return _pandas_batches(obj, sizer)
+        if kind == "polars":
+            return _slice_batches(obj.to_arrow(), sizer)
+        if kind == "polars_lazy":
+            if hasattr(obj, "collect_batches"):
+                return (b for df in obj.collect_batches() for b in _slice_batches(df.to_arrow(), sizer))
+            return _slice_batches(obj.collect().to_arrow(), sizer)
+        if kind == "dataset":
+            return iter(obj.to_batches(batch_size=sizer.size if sizer.fixed else max(2048, sizer.size)))
+        if kind == "scanner":
+            return iter(obj.to_reader())
+        return None
+
     # Global Streaming ve Kayıt Yardımcısı
-    def stream(obj, name=None, batch_size=5000, silent=False):
+    def stream(obj, name=None, batch_size=None, silent=False, prefetch=None, storage=None):
         '''
         Veriyi UI'a (DataGrid) akıtır veya DuckDB'ye tablo olarak kaydeder.
+        batch_size: sabit satır sayısı; None ise STREAM_TARGET_BYTES / STREAM_TARGET_SECONDS hedeflerine göre ayarlanır.
+        prefetch: arka planda önden çekilecek en fazla chunk sayısı (None: STREAM_PREFETCH, 0: sıralı).
+        storage: "table" (batch'ler DuckDB tablosuna eklenir) veya "view" (bellekte Arrow tablosu); None: STREAM_STORAGE.
+        pandas/polars DataFrame ve Arrow tablo/dataset dilim dilim akar; `name` ile kopyasız görünüm olarak kaydedilir
+        (storage kullanılmaz).
         '''
+        return _stream(obj, name, batch_size, silent, prefetch, storage)["message"]
+
+    # summary=False: başlık ve bitiş özeti basılmaz (execute_sql_query kendi adım satırını yazar).
+    # describe: sonuç tanımına eklenecek alanlar (ör. SQL ifade sırası).
+    # Dönüş: {"message", "rows", "interrupted", "handle", "result_id"}; handle yalnızca pencere modunda oluşur.
+    def _stream(obj, name=None, batch_size=None, silent=False, prefetch=None, storage=None, summary=True,
+                describe=None):
+        prefetch = STREAM_PREFETCH if prefetch is None else int(prefetch)
+        storage = STREAM_STORAGE if storage is None else storage
+        prefetcher = None
+        sizer = _BatchSizer(batch_size, _column_count(obj))
         batches = []
         total_rows = 0
+        kept = None
         start_time = time.time()
+        flow = FlowControl()
+        # Pencere modu: UI'a yalnızca ilk `window` satır gönderilir, sonuç handle olarak saklanır
+        window = None if silent else _ds_options().get("window")
+        shown_rows = 0
+        stats = {"batches": 0, "bytes": 0}
+        # Sürekli akış: UI'a giden batch'ler tek IPC akışının parçalarıdır (şema bir kez)
+        out = _ArrowResultStream() if not silent and _continuous_arrow() else None
+        # Veri çerçeveleri DuckDB'ye kopyasız görünüm olarak kaydedilir; batch'leri biriktirilmez
+        frame_view = _frame_view(obj)
+        # Kaydedilecek/saklanacak batch'ler tabloya yazılır; pencere modunda adsız sonuç için handle adı üretilir
+        sink = _TableSink(name or _next_result_name()) \
+            if storage == "table" and (name or window is not None) and frame_view is None else None
+
+        def frame_rows():
+            return frame_view.count_rows() if _frame_kind(frame_view) == "dataset" else len(frame_view)
+
+        def collect(batch):
+            if frame_view is not None:
+                return
+            if sink is not None:
+                sink.append(batch)
+            elif name or window is not None:
+                batches.append(batch)
+
+        def report(status):
+            extra = {"prefetch": prefetch, "fetch_wait": round(prefetcher.wait, 6)} if prefetcher else {}
+            _ds_stats("stream", name=name, source=type(obj).__name__, status=status, rows=total_rows,
+                      batches=stats["batches"], bytes=stats["bytes"], seconds=round(time.time() - start_time, 6),
+                      batch_rows=sizer.summary(), **extra)
+
+        def chunks(fetch, cancel=None):
+            # fetch() None dönene kadar chunk üretir; prefetch > 0 ise fetch arka plan thread'inde çalışır
+            nonlocal prefetcher
+            if prefetch > 0:
+                prefetcher = _Prefetcher(fetch, prefetch, cancel)
+                yield from prefetcher
+                return
+            while True:
+                chunk = fetch()
+                if chunk is None:
+                    return
+                yield chunk
+
+        def show(batch):
+            nonlocal shown_rows
+            if window is not None:
+                if shown_rows >= window:
+                    return
+                batch = batch.slice(0, window - shown_rows)
+            shown_rows += batch.num_rows
+            flow.acquire(batch.nbytes)
+            if out is not None:
+                out.write(batch)
+            else:
+                display(ArrowWrapper(batch))
+
+        def keep():
+            nonlocal kept
+            if window is None:
+                return
+            if frame_view is not None:
+                handle = name or _next_result_name()
+                _register_view(handle, frame_view)
+                _RESULTS[handle] = _LazyResult(handle, frame_rows())
+            elif sink is not None and sink.finish():
+                handle = sink.name
+                _RESULTS[handle] = _StoredTable(handle)
+            else:
+                table = pa.Table.from_batches(batches) if batches else ArrowWrapper(obj).table
+                handle = keep_result(table, name)
+            kept = handle
+            descriptor = dict(_result_descriptor(handle, shown_rows), **(describe or {}))
+            if out is not None:
+                out.close()
+                descriptor["result_id"] = out.result_id
+            _ds_publish(descriptor)
+
+        def result(message=None, interrupted=False):
+            return {"message": message, "rows": total_rows, "interrupted": interrupted, "handle": kept,
+                    "result_id": out.result_id if out is not None else None}
+
+        def register():
+            # Akış sonunda (veya kesilince) `name` tablosunu/görünümünü oluşturur
+            if frame_view is not None and name:
+                _register_view(name, frame_view)
+                return True
+            if sink is not None:
+                return sink.finish()
+            if name and batches:
+                con.register(name, pa.Table.from_batches(batches))
+                return True
+            return False
         
         try:
             from rich.panel import Panel
@@ -90,143 +1199,902 @@ try:
                 C_BOLD = "\033[1m"
                 C_END = "\033[0m"
                 
-                print(f"\n{C_BOLD}{C_CYAN}➜{C_END} {C_BOLD}Akış Başlatıldı:{C_END} {name if name else 'Adsız Veri'}", flush=True)
+                if summary:
+                    print(f"\n{C_BOLD}{C_CYAN}➜{C_END} {C_BOLD}Akış Başlatıldı:{C_END} {name if name else 'Adsız Veri'}", flush=True)
 
-            # 1. DuckDB Relation Tespiti
-            if hasattr(obj, 'record_batch_reader'):
-                if silent and name:
-                    con.register(name, obj.record_batch_reader().read_all())
-                    return f"-- Registered {name} from Relation"
+            # 0. Sessiz kayıt: DuckDB relation tek bir CREATE TABLE AS ile yazılır
+            if silent and name and sink is not None and isinstance(obj, duckdb.DuckDBPyRelation) and sink.create_from(obj):
+                total_rows = sink.rows
+                sink.finish()
+                report("ok")
+                return result(f"-- Registered {name} from Relation")
+
+            # 0b. Sessiz kayıt: veri çerçevesi görünüm olarak kaydedilir, Arrow'a hiç çevrilmez
+            if silent and name and frame_view is not None:
+                _register_view(name, frame_view)
+                total_rows = frame_rows()
+                report("ok")
+                return result(f"-- Registered {name} from {type(obj).__name__}")
+
+            # 1. Veri çerçeveleri (pandas, polars, Arrow tablo/dataset) ve yerel Arrow okuyucuları
+            # (DuckDB relation/cursor, ADBC, turbodbc, arrow-odbc).
+            # Uyarlanabilir modda okuyucu en az bir DuckDB vektörü (2048 satır) ile açılır; çıktı _rechunk ile ayarlanır
+            reader = _frame_batches(obj, sizer)
+            if reader is None:
+                reader = _arrow_batches(obj, sizer.size if sizer.fixed else max(2048, sizer.size))
+            if reader is not None:
+                if silent and name and sink is None:
+                    schema = obj.schema if isinstance(getattr(obj, 'schema', None), pa.Schema) else None
+                    con.register(name, reader.read_all() if hasattr(reader, 'read_all') else pa.Table.from_batches(list(reader), schema=schema))
+                    return result(f"-- Registered {name} from Relation")
                 
-                reader = obj.record_batch_reader(batch_size=batch_size)
-                for batch in reader:
-                    if not silent: display(ArrowWrapper(batch))
-                    if name: batches.append(batch)
+                batch_iter = iter(reader)
+
+                def fetch():
+                    fetch_start = time.perf_counter()
+                    batch = next(batch_iter, None)
+                    return None if batch is None else (batch, time.perf_counter() - fetch_start)
+
+                for batch in _rechunk(chunks(fetch, getattr(obj, 'interrupt', None)), sizer):
+                    if frame_view is not None and (silent or (window is not None and shown_rows >= window)):
+                        break  # çerçeve zaten bellekte; pencere dolunca geri kalanı dilimlemeye gerek yok
+                    if not silent: show(batch)
+                    collect(batch)
                     total_rows += len(batch)
+                    stats["batches"] += 1
+                    stats["bytes"] += batch.nbytes
                     
-                    if not silent and (total_rows % batch_size == 0):
+                    if not silent:
                         elapsed = time.time() - start_time
                         rate = total_rows / elapsed if elapsed > 0 else 0
                         # \r kullanarak aynı satırda güncelleme yap
                         print(f"\r   {C_DIM}..{C_END} {C_CYAN}{total_rows:,}{C_END} satır aktarıldı {C_DIM}({rate:,.0f} rows/sec){C_END}", end="", flush=True)
                 
-                if name and batches:
-                    con.register(name, pa.Table.from_batches(batches))
+                if window is None:
+                    register()
                 
             # 2. Standart Cursor (mssql_python, sqlite3 vb.)
             elif hasattr(obj, 'fetchmany') and hasattr(obj, 'description'):
                 cursor = obj
-                col_names = [col[0] for col in cursor.description]
+                converter = CursorArrowConverter(cursor.description)
+                cancel = getattr(cursor, 'cancel', None) or getattr(cursor, 'interrupt', None)
                 
-                while True:
-                    rows = cursor.fetchmany(batch_size)
-                    if not rows: break
-                    
-                    batch = pa.RecordBatch.from_arrays(
-                        [pa.array(c) for c in zip(*rows)], 
-                        names=col_names
-                    )
-                    total_rows += len(rows)
+                def fetch():
+                    fetch_start = time.perf_counter()
+                    rows = cursor.fetchmany(sizer.size)
+                    return (rows, time.perf_counter() - fetch_start) if rows else None
+
+                def emit(batch):
+                    nonlocal total_rows
+                    total_rows += batch.num_rows
+                    stats["batches"] += 1
+                    stats["bytes"] += batch.nbytes
                     
-                    if not silent: display(ArrowWrapper(batch))
-                    if name: batches.append(batch)
+                    if not silent: show(batch)
+                    collect(batch)
                     
                     if not silent:
                         elapsed = time.time() - start_time
                         rate = total_rows / elapsed if elapsed > 0 else 0
                         # \r kullanarak aynı satırda güncelleme yap
                         print(f"\r   {C_GREEN}➜{C_END} {C_BOLD}{total_rows:,}{C_END} satır işlendi {C_DIM}({rate:,.0f} rows/sec){C_END}", end="", flush=True)
+
+                # Tipi henüz belli olmayan (baştan NULL) sütun varsa converter batch'leri bekletir
+                for rows, fetch_seconds in chunks(fetch, cancel):
+                    ready = converter.convert(rows)
+                    sizer.observe(len(rows), converter.nbytes, fetch_seconds)
+                    for batch in ready:
+                        emit(batch)
+                for batch in converter.flush():
+                    emit(batch)
                 
-                if name and batches:
-                    con.register(name, pa.Table.from_batches(batches))
+                if window is None:
+                    register()
             
             # 3. Genel Obje (Arrow Table, RecordBatch vb.)
             else:
-                if not silent: display(ArrowWrapper(obj))
+                if not silent: show(ArrowWrapper(obj).table)
                 if name:
                     wrapped = ArrowWrapper(obj)
                     con.register(name, wrapped.table)
                 total_rows = len(obj) if hasattr(obj, '__len__') else 1
+                stats["batches"], stats["bytes"] = 1, getattr(obj, 'nbytes', 0)
+
+            keep()
+            report("ok")
 
             # Bitiş Özeti
-            if not silent:
+            if not silent and summary:
                 elapsed = time.time() - start_time
                 print() # Önceki \r satırını bitirmek için yeni satıra geç
                 print(f"\n{C_GREEN}✔ AKIŞ TAMAMLANDI{C_END}", flush=True)
                 print(f"  {C_DIM}•{C_END} Toplam Satır: {total_rows:,}", flush=True)
                 print(f"  {C_DIM}•{C_END} Toplam Süre : {elapsed:.2f} sn", flush=True)
+                if stats["batches"]:
+                    b = sizer.summary()
+                    sizes = f"{b['first']:,} → {b['last']:,} satır (min {b['min']:,} / max {b['max']:,})" if b["mode"] == "auto" else f"{b['last']:,} satır (sabit)"
+                    print(f"  {C_DIM}•{C_END} Batch Boyutu: {sizes}, {stats['batches']:,} batch, ort. {stats['bytes'] / stats['batches'] / 1048576:.1f} MB", flush=True)
+                if prefetcher: print(f"  {C_DIM}•{C_END} Önden Çekme: {prefetch} chunk, veri bekleme {prefetcher.wait:.2f} sn", flush=True)
                 if name: print(f"  {C_DIM}•{C_END} Tablo: {name}", flush=True)
                 # print(f"{C_DIM}{'─' * 40}{C_END}\n", flush=True)
+            return result()
 
                 
         except KeyboardInterrupt:
-            print(f"\n\x1b[33m[!] Akış kullanıcı tarafından kesildi.\x1b[0m", flush=True)
-            if name and batches:
-                con.register(name, pa.Table.from_batches(batches))
-                print(f"\x1b[32m✔ '{name}' tablosu buraya kadar olan ({total_rows} satır) veriyle kaydedildi.\x1b[0m", flush=True)
-            return  # Traceback'i engellemek için sessizce çık
+            if summary:
+                print(f"\n\x1b[33m[!] Akış kullanıcı tarafından kesildi.\x1b[0m", flush=True)
+            if prefetcher is not None:
+                prefetcher.close(interrupted=True)
+            if window is not None and (frame_view is not None or batches or (sink is not None and sink.rows)):
+                keep()
+            elif register():
+                if frame_view is not None:
+                    print(f"\x1b[32m✔ '{name}' görünümü kaydedildi (akış {total_rows} satırda kesildi).\x1b[0m", flush=True)
+                else:
+                    print(f"\x1b[32m✔ '{name}' tablosu buraya kadar olan ({total_rows} satır) veriyle kaydedildi.\x1b[0m", flush=True)
+            report("interrupted")
+            return result(interrupted=True)  # Traceback'i engellemek için sessizce çık
+        except Exception:
+            report("error")
+            raise
+        finally:
+            if prefetcher is not None:
+                prefetcher.close()
+            if sink is not None:
+                sink.discard()
+            if out is not None:
+                out.close()
 
-    # SQL Çalıştırma Yardımcısı
-    def execute_sql_query(query):
-        raw_statements = [s.strip() for s in query.split(';') if s.strip()]
-        
-        def is_real_code(s):
-            lines = s.split('\n')
-            for l in lines:
-                l = l.strip()
-                if l and not l.startswith('--') and not l.startswith('#') and not (l.startswith('/*') and l.endswith('*/')):
+    # Bağlantı Havuzu: pyodbc.connect / mssql_python.connect her hücrede TLS + login el sıkışması (yüzlerce ms) demek.
+    # pooled_connect() bağlantıları (sürücü, bağlantı dizesi, argümanlar) anahtarıyla çekirdekte sıcak tutar;
+    # close() bağlantıyı kapatmaz, havuza geri verir. Uzun süre boşta kalanlar kapatılır, çekirdek kapanırken hepsi kapanır.
+    POOL_MAX_SIZE = 4           # anahtar başına en fazla açık (kullanımda + boşta) bağlantı
+    POOL_IDLE_SECONDS = 300     # bu kadar kullanılmayan boştaki bağlantı kapatılır
+    POOL_CHECK_SECONDS = 30     # daha uzun süre boşta kalmış bağlantı verilmeden önce "SELECT 1" ile denetlenir
+    POOL_WAIT_SECONDS = 30      # havuz doluyken boş bağlantı için en fazla bekleme
+
+    _POOLS = {}
+    _POOLS_LOCK = threading.Lock()
+    _POOL_JANITOR = [None]
+
+    def _close_quietly(obj):
+        try:
+            obj.close()
+        except Exception:
+            pass
+
+    def _mask_secrets(conn_str):
+        return re.sub(r"(?i)\b(pwd|password)\s*=\s*(\{[^}]*\}|[^;]*)", r"\1=***", conn_str)
+
+    class _ConnectionPool:
+        '''
+        Tek bir anahtarın bağlantıları. Boştakiler LIFO verilir (en sıcak bağlantı önce);
+        ağ gerektiren işler (bağlanma, sağlık denetimi, kapatma) kilit dışında yapılır.
+        '''
+        def __init__(self, label, factory, max_size):
+            self.label = label
+            self.factory = factory
+            self.max_size = max_size
+            self.idle = []          # [(bağlantı, son kullanım zamanı)]
+            self.in_use = 0
+            self.closed = False
+            self.cond = threading.Condition()
+            self.stats = {"created": 0, "reused": 0, "evicted": 0, "failed_checks": 0}
+
+        def _healthy(self, conn):
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+                return True
+            except Exception:
+                return False
+
+        def _free_slot(self):
+            with self.cond:
+                self.in_use -= 1
+                self.cond.notify()
+
+        def acquire(self):
+            '''(bağlantı, yeniden_kullanıldı_mı) döner; havuz doluysa POOL_WAIT_SECONDS kadar bekler.'''
+            deadline = time.monotonic() + POOL_WAIT_SECONDS
+            while True:
+                with self.cond:
+                    while not self.idle and self.in_use >= self.max_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"Bağlantı havuzu dolu ({self.max_size}): {self.label}")
+                        self.cond.wait(remaining)
+                    conn, last_used = self.idle.pop() if self.idle else (None, None)
+                    self.in_use += 1
+                if conn is None:
+                    try:
+                        conn = self.factory()
+                    except BaseException:
+                        self._free_slot()
+                        raise
+                    self.stats["created"] += 1
+                    return conn, False
+                if time.monotonic() - last_used < POOL_CHECK_SECONDS or self._healthy(conn):
+                    self.stats["reused"] += 1
+                    return conn, True
+                # Sunucu bağlantıyı düşürmüş (timeout, failover): at ve yenisini dene
+                self.stats["failed_checks"] += 1
+                _close_quietly(conn)
+                self._free_slot()
+
+        def release(self, conn):
+            # Tamamlanmamış işlem bir sonraki kullanıcıya geçmesin; geri alınamıyorsa bağlantı bozuktur
+            try:
+                conn.rollback()
+                keep = not getattr(conn, "closed", False)
+            except Exception:
+                keep = False
+            with self.cond:
+                self.in_use -= 1
+                if keep and not self.closed:
+                    self.idle.append((conn, time.monotonic()))
+                    conn = None
+                self.cond.notify()
+            if conn is not None:
+                _close_quietly(conn)
+
+        def evict(self, idle_seconds):
+            now = time.monotonic()
+            with self.cond:
+                expired = [c for c, t in self.idle if now - t >= idle_seconds]
+                self.idle = [(c, t) for c, t in self.idle if now - t < idle_seconds]
+            for conn in expired:
+                _close_quietly(conn)
+            self.stats["evicted"] += len(expired)
+
+        def close(self):
+            with self.cond:
+                self.closed = True
+                idle, self.idle = self.idle, []
+                self.cond.notify_all()
+            for conn, _ in idle:
+                _close_quietly(conn)
+
+    class _PooledCursor:
+        '''Sürücü cursor'ı; sahibi olan PooledConnection'ı canlı tutar (connect(...).cursor() zincirinde bağlantı geri verilmez).'''
+        def __init__(self, owner, cursor):
+            self._owner = owner
+            self._cursor = cursor
+
+        def execute(self, *args, **kwargs):
+            result = self._cursor.execute(*args, **kwargs)
+            return self if result is self._cursor else result
+
+        def __iter__(self):
+            return iter(self._cursor)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            # Sürücünün kendi davranışı (pyodbc: commit) korunur; context manager'ı yoksa cursor kapatılır
+            exit_ = getattr(self._cursor, "__exit__", None)
+            if exit_ is not None:
+                return exit_(*exc)
+            _close_quietly(self._cursor)
+
+        def __getattr__(self, name):
+            return getattr(self.__dict__["_cursor"], name)
+
+    class PooledConnection:
+        '''
+        Havuzdan alınmış bağlantı; sürücü bağlantısının tüm metotları kullanılabilir.
+        close(), with bloğunun sonu ya da nesnenin çöpe gitmesi bağlantıyı havuza geri verir:
+        bu bağlantıdan açılan cursor'lar kapatılır, tamamlanmamış işlem geri alınır.
+        '''
+        def __init__(self, pool, conn):
+            self._pool = pool
+            self._conn = conn
+            self._cursors = weakref.WeakSet()
+
+        def cursor(self, *args, **kwargs):
+            cursor = _PooledCursor(self, self._raw().cursor(*args, **kwargs))
+            self._cursors.add(cursor)
+            return cursor
+
+        def execute(self, *args, **kwargs):
+            return self.cursor().execute(*args, **kwargs)
+
+        @property
+        def closed(self):
+            return self._conn is None
+
+        def _raw(self):
+            if self._conn is None:
+                raise RuntimeError("Bağlantı havuza geri verildi; pooled_connect() ile yenisini alın")
+            return self._conn
+
+        def close(self):
+            conn, self._conn = self.__dict__.get("_conn"), None
+            if conn is None:
+                return
+            for cursor in list(self._cursors):
+                _close_quietly(cursor._cursor)
+            self._pool.release(conn)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            # pyodbc ile aynı: hata yoksa commit; ardından bağlantı havuza döner (hata varsa release geri alır)
+            if exc_type is None and self._conn is not None:
+                self._conn.commit()
+            self.close()
+
+        def __del__(self):
+            try:
+                self.close()
+            except Exception:
+                pass
+
+        def __getattr__(self, name):
+            conn = self.__dict__.get("_conn")
+            if conn is None:
+                raise AttributeError(name)
+            return getattr(conn, name)
+
+    def _pool_janitor():
+        while True:
+            time.sleep(max(1.0, POOL_IDLE_SECONDS / 4))
+            with _POOLS_LOCK:
+                pools = list(_POOLS.values())
+            for pool in pools:
+                pool.evict(POOL_IDLE_SECONDS)
+
+    def pooled_connect(conn_str, driver=None, max_size=None, **kwargs):
+        '''
+        Havuzlanmış DB-API bağlantısı döner; aynı bağlantı dizesiyle sonraki çağrılar sıcak bağlantıyı alır.
+        driver: "pyodbc", "mssql_python" veya bağlantı fonksiyonu (varsayılan: kuruluysa pyodbc).
+        max_size: bu anahtarın havuz boyutu (varsayılan POOL_MAX_SIZE; yalnızca büyütülür). kwargs sürücüye gider.
+        '''
+        if driver is None:
+            driver = "pyodbc" if importlib.util.find_spec("pyodbc") else "mssql_python"
+        if callable(driver):
+            connect_fn, driver_name = driver, getattr(driver, "__name__", None) or repr(driver)
+        else:
+            connect_fn, driver_name = importlib.import_module(driver).connect, driver
+        key = (driver, conn_str, repr(sorted(kwargs.items())))
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None or pool.closed:
+                pool = _POOLS[key] = _ConnectionPool(f"{driver_name}: {_mask_secrets(conn_str)}",
+                                                     lambda: connect_fn(conn_str, **kwargs), max_size or POOL_MAX_SIZE)
+            elif max_size and max_size > pool.max_size:
+                pool.max_size = max_size
+            if _POOL_JANITOR[0] is None:
+                _POOL_JANITOR[0] = threading.Thread(target=_pool_janitor, name="datastudio-pool-janitor", daemon=True)
+                _POOL_JANITOR[0].start()
+        start = time.perf_counter()
+        try:
+            conn, reused = pool.acquire()
+        except Exception:
+            _ds_stats("connect", status="error", seconds=round(time.perf_counter() - start, 6))
+            raise
+        _ds_stats("connect", status="reused" if reused else "new", seconds=round(time.perf_counter() - start, 6))
+        return PooledConnection(pool, conn)
+
+    def pool_status():
+        '''Havuzların durumunu (parolalar maskelenmiş) liste olarak döner.'''
+        with _POOLS_LOCK:
+            pools = list(_POOLS.values())
+        return [{"pool": p.label, "idle": len(p.idle), "in_use": p.in_use, "max_size": p.max_size, **p.stats}
+                for p in pools]
+
+    def close_pools():
+        '''Tüm havuzlardaki boştaki bağlantıları kapatır; kullanımdakiler geri verilince kapanır.'''
+        with _POOLS_LOCK:
+            pools = list(_POOLS.values())
+            _POOLS.clear()
+        for pool in pools:
+            pool.close()
+
+    atexit.register(close_pools)
+
+    # Paralel Bölümlü Çekme: tek bağlantının hızı sürücü/ağ gecikmesiyle sınırlıysa sorgu bir anahtar sütunda
+    # N aralığa bölünür, her aralık kendi bağlantısında ayrı thread'de çekilir. Bölümlerin batch'leri geldikleri
+    # sırayla tek bir kaynak olarak stream()'e akar (tabloya kayıt, pencere, UI akışı aynen çalışır).
+    STREAM_PARTITIONS = 4
+
+    def _partition_predicates(column, lo, hi, partitions):
+        '''
+        [lo, hi] aralığını eşit adımlı WHERE koşullarına böler. Sınırlar yalnızca adımı belirler:
+        ilk bölüm lo'dan küçükleri ve NULL'ları, son bölüm hi'den büyükleri de alır; hiçbir satır kaybolmaz.
+        '''
+        if lo is None or hi is None:
+            return [None]  # sonuç boş (veya anahtar hep NULL): tek sorgu
+        for bound in (lo, hi):
+            if isinstance(bound, bool) or not isinstance(bound, (int, float, _decimal.Decimal)):
+                raise TypeError(f"Bölüm sınırları sayısal olmalı ({bound!r}); diğer tipler için predicates= verin")
+        integral = all(isinstance(b, int) or (isinstance(b, _decimal.Decimal) and b == int(b)) for b in (lo, hi))
+        if integral:
+            lo, hi = int(lo), int(hi)
+            partitions = max(1, min(int(partitions), hi - lo + 1))
+            step = -(-(hi - lo + 1) // partitions)
+        else:
+            lo, hi = float(lo), float(hi)
+            partitions = max(1, int(partitions)) if hi > lo else 1
+            step = (hi - lo) / partitions
+        edges = [lo + step * i for i in range(1, partitions)]
+        if not edges:
+            return [None]
+        predicates = [f"{column} < {edges[0]!r} OR {column} IS NULL"]
+        predicates += [f"{column} >= {a!r} AND {column} < {b!r}" for a, b in zip(edges, edges[1:])]
+        predicates.append(f"{column} >= {edges[-1]!r}")
+        return predicates
+
+    class _PartitionedReader:
+        '''
+        Her bölüm sorgusunu kendi bağlantısında (connect() ile açılır) ayrı thread'de çalıştırır ve
+        Arrow batch'lerini sınırlı bir kuyrukta birleştirir. stream() bunu Arrow okuyucusu gibi okur
+        (schema + iterasyon). Bölümler arasında satır sırası korunmaz.
+        Tip kodu vermeyen sürücülerde (sqlite3) bölümlerin çıkarılan tipleri farklıysa ilk batch'in şemasına cast edilir.
+        '''
+        JOIN_TIMEOUT = 5.0
+
+        def __init__(self, connect, queries, batch_size=None):
+            self.connect = connect
+            self.queries = queries
+            self.batch_size = batch_size
+            self.queue = queue.Queue(maxsize=2 * len(queries))
+            self.stop = threading.Event()
+            self.cursors = [None] * len(queries)
+            self.rows = [0] * len(queries)
+            self.seconds = [0.0] * len(queries)
+            self.finished = 0
+            self.schema = None
+            self.first = None
+            self.threads = [threading.Thread(target=self._run, args=(i, q), name=f"datastudio-partition-{i}", daemon=True)
+                            for i, q in enumerate(queries)]
+            for thread in self.threads:
+                thread.start()
+
+        def _put(self, item):
+            while not self.stop.is_set():
+                try:
+                    self.queue.put(item, timeout=0.1)
                     return True
+                except queue.Full:
+                    pass
             return False
 
-        statements = [s for s in raw_statements if is_real_code(s)]
+        def _run(self, index, sql):
+            conn = cursor = None
+            start = time.perf_counter()
+            try:
+                conn = self.connect()
+                cursor = conn.cursor()
+                self.cursors[index] = cursor
+                cursor.execute(sql)
+                sizer = _BatchSizer(self.batch_size, len(cursor.description or []))
+                reader = _arrow_batches(cursor, sizer.size if sizer.fixed else max(2048, sizer.size))
+                if reader is not None:
+                    batches = iter(reader)
+                    converter = None
+                else:
+                    converter = CursorArrowConverter(cursor.description)
+                sent = False
+
+                def put(ready):
+                    nonlocal sent
+                    for batch in ready:
+                        self.rows[index] += batch.num_rows
+                        if not self._put(("data", batch)):
+                            return False
+                        sent = True
+                    return True
+
+                while not self.stop.is_set():
+                    fetch_start = time.perf_counter()
+                    if converter is None:
+                        batch = next(batches, None)
+                        if batch is None:
+                            break
+                        ready = [batch]
+                    else:
+                        rows = cursor.fetchmany(sizer.size)
+                        if not rows:
+                            break
+                        # Baştan NULL sütunların tipi belli olana kadar converter batch'leri bekletir
+                        ready = converter.convert(rows)
+                        sizer.observe(len(rows), converter.nbytes, time.perf_counter() - fetch_start)
+                    if not put(ready):
+                        return
+                if converter is not None and not self.stop.is_set() and not put(converter.flush()):
+                    return
+                if not sent and not self.stop.is_set():
+                    # Boş bölüm de şemasını bildirir; tüm bölümler boşsa stream() boş sonucu bu şemayla gösterir
+                    schema = converter.schema if converter is not None else reader.schema
+                    empty = pa.RecordBatch.from_pylist([], schema=schema)
+                    self._put(("data", empty))
+                self._put(("done", index))
+            except BaseException as e:
+                self._put(("error", e))
+            finally:
+                self.seconds[index] = time.perf_counter() - start
+                self.cursors[index] = None
+                for obj in (cursor, conn):
+                    try:
+                        if obj is not None: obj.close()
+                    except Exception:
+                        pass
+
+        def _next(self):
+            # Zaman aşımlı get: kesme (KeyboardInterrupt) ana thread'e hemen ulaşır
+            while True:
+                try:
+                    return self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(t.is_alive() for t in self.threads) and self.queue.empty():
+                        return ("end", None)
+
+        def open(self):
+            '''
+            İlk dolu batch'i bekler ve şemayı ondan sabitler (stream() sütun sayısını baştan ister).
+            Boş bölümlerin çıkarılan tipleri güvenilmez; tüm bölümler boşsa ilk boş batch'in şeması kullanılır.
+            '''
+            for batch in self._batches():
+                if self.first is None or batch.num_rows:
+                    self.schema, self.first = batch.schema, batch
+                if batch.num_rows:
+                    break
+            if self.first is None:
+                raise RuntimeError("Bölüm sorguları sonuç döndürmedi")
+            return self
+
+        def _batches(self):
+            while self.finished < len(self.threads):
+                kind, value = self._next()
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise value
+                if kind == "done":
+                    self.finished += 1
+                    continue
+                yield value
+
+        def __iter__(self):
+            if self.first is not None:
+                first, self.first = self.first, None
+                yield first
+            for batch in self._batches():
+                if batch.num_rows == 0:
+                    continue
+                if batch.schema != self.schema:
+                    batch = pa.Table.from_batches([batch]).cast(self.schema).to_batches()[0]
+                yield batch
+
+        def interrupt(self):
+            # Sürücüde bloklanan sorguları iptal et (pyodbc cursor.cancel, DuckDB interrupt)
+            for cursor in list(self.cursors):
+                cancel = getattr(cursor, 'cancel', None) or getattr(cursor, 'interrupt', None)
+                if cancel is not None:
+                    try: cancel()
+                    except Exception: pass
+
+        def close(self):
+            '''
+            Thread'leri durdurur; akış yarıda kaldıysa (kesme, hata) sürücüde bekleyen sorgular iptal edilir.
+            '''
+            self.stop.set()
+            try:
+                while True:
+                    self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            if any(t.is_alive() for t in self.threads):
+                self.interrupt()
+            deadline = time.perf_counter() + self.JOIN_TIMEOUT
+            for thread in self.threads:
+                thread.join(max(0.0, deadline - time.perf_counter()))
+            if any(t.is_alive() for t in self.threads):
+                print("\n\x1b[33m[UYARI]\x1b[0m Bazı bölüm sorguları hâlâ sürücüde bekliyor; "
+                      "bağlantıları bitince kapanacak.", flush=True)
+
+    def stream_partitioned(connect, query, column=None, partitions=None, bounds=None, predicates=None,
+                           name=None, batch_size=None, silent=False, storage=None):
+        '''
+        Sorguyu `column` üzerinde `partitions` aralığa bölüp paralel bağlantılarla çeker ve stream()'e verir.
+        connect: yeni bir DB-API bağlantısı döndüren fonksiyon (örn. lambda: pyodbc.connect(cs)); bölüm başına çağrılır.
+        Bağlantı dizesi verilirse bağlantılar pooled_connect() havuzundan alınır (havuz bölüm sayısına büyütülür).
+        bounds: (alt, üst) sınırları; verilmezse MIN/MAX ile bulunur. predicates: hazır WHERE koşulları listesi
+        (tarih/metin anahtarlar için); verilirse column/bounds kullanılmaz. Satır sırası korunmaz.
+        '''
+        partitions = STREAM_PARTITIONS if partitions is None else int(partitions)
+        if isinstance(connect, str):
+            conn_str, size = connect, len(predicates) if predicates is not None else partitions
+            connect = lambda: pooled_connect(conn_str, max_size=size)
+        if predicates is None:
+            if column is None:
+                raise ValueError("column veya predicates verilmeli")
+            if bounds is None:
+                conn = connect()
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM ({query}) _ds_part")
+                    bounds = cursor.fetchone()
+                    cursor.close()
+                finally:
+                    conn.close()
+            predicates = _partition_predicates(column, bounds[0], bounds[1], partitions)
+        queries = [query if p is None else f"SELECT * FROM ({query}) _ds_part WHERE {p}" for p in predicates]
+        if not silent:
+            print(f"\x1b[96m⇉\x1b[0m \x1b[1mBölümlü Çekme:\x1b[0m {len(queries)} bağlantı" +
+                  (f", {column} ∈ [{bounds[0]}, {bounds[1]}]" if column is not None and bounds and bounds[0] is not None else ""), flush=True)
+        reader = _PartitionedReader(connect, queries, batch_size)
+        try:
+            try:
+                reader.open()
+            except KeyboardInterrupt:
+                print(f"\n\x1b[33m[!] Akış kullanıcı tarafından kesildi.\x1b[0m", flush=True)
+                return
+            return stream(reader, name=name, batch_size=batch_size, silent=silent, storage=storage)
+        finally:
+            reader.close()
+            # Satırlar "stream" ölçümünde sayılır; burada yalnızca bölüm dağılımı gider
+            _ds_stats("partitions", name=name, partitions=len(queries),
+                      seconds=round(max(reader.seconds), 6), partition_rows=reader.rows,
+                      partition_seconds=[round(s, 6) for s in reader.seconds])
+            if not silent:
+                print("  \x1b[90m•\x1b[0m Bölümler   : " + ", ".join(
+                    f"{r:,} satır/{s:.2f} sn" for r, s in zip(reader.rows, reader.seconds)), flush=True)
+
+    # SQL Çalıştırma Yardımcısı
+    # Script DuckDB'nin kendi ayrıştırıcısıyla ifadelere bölünür (extract_statements): metin ve yorum içindeki
+    # ';' doğru işlenir, her ifade ayrıştırılmış haliyle çalıştırılır (ikinci kez ayrıştırılmaz).
+    # Önizleme modu (preview=N): her sonucun yalnızca ilk N satırı okunur, tamamı tembel görünüm handle'ı olarak
+    # kalır (sayfalama, profile_result, export_result). profile=True: son sonuç profillenir.
+    # Son sonuç (yalnızca sorgu sonucu döndüren son ifade) tabloya çevrilmeden kayıt batch okuyucusuyla akar
+    # (stream() ile aynı ilerleme, akış kontrolü ve pencere). Aradaki SELECT'ler yalnızca bağlanır (bind, hata
+    # denetimi) ve okunmadan tembel handle olarak verilir; intermediate=True ile her biri kendi adımında ayrı
+    # sonuç olarak akar. Böylece büyük tablolardaki çok adımlı script'ler sınırlı bellekle çalışır.
+    # Her sonuç kümesinin bir handle'ı olur (geçici görünüm; pencere modunda akışın sakladığı tablo). Script'te
+    # sonradan veriyi değiştirebilen bir ifade (DDL/DML) çalışmadan önce bekleyen görünümler o anki içerikleriyle
+    # geçici tabloya alınır; handle her zaman kendi adımının sonucunu gösterir. SET, PRAGMA, CALL, COPY ... TO gibi
+    # ifadeler görünümleri materyalize etmez. Önceki çalıştırmanın handle'ları bırakılır.
+    SQL_PREVIEW_ROWS = 1000
+    _SQL_HANDLES = []
+
+    def _sql_statement_kind(statement):
+        # "query": yalnızca sorgu sonucu döndürür (SELECT, PRAGMA, CALL, EXPLAIN), "select": bunun SELECT olanı
+        # (yan etkisiz, tembel bırakılabilir), "other": DDL/DML (RETURNING ile satır döndürebilir)
+        if [t.name for t in statement.expected_result_type] != ["QUERY_RESULT"]:
+            return "other"
+        return "select" if statement.type.name == "SELECT" else "query"
+
+    _SQL_WRITE_TYPES = {"INSERT", "UPDATE", "DELETE", "DROP", "ALTER", "MERGE_INTO", "ATTACH", "DETACH"}
+
+    def _sql_writes(statement):
+        # Tembel sonuçların okuduğu veriyi değiştirebilir mi: DML, DROP/ALTER, CREATE OR REPLACE, COPY ... FROM,
+        # ROLLBACK. Yeni ad oluşturan CREATE, COPY ... TO, SET, PRAGMA ve CALL değiştirmez.
+        kind = statement.type.name
+        if kind in _SQL_WRITE_TYPES:
+            return True
+        text = " ".join(re.sub(r"/\*.*?\*/|--[^\n]*", " ", statement.query, flags=re.S).split()).upper()
+        if kind == "CREATE":
+            return text.startswith("CREATE OR REPLACE ")
+        if kind == "COPY":
+            return re.match(r"COPY [^(\s]\S*( \([^)]*\))? FROM ", text) is not None
+        if kind == "TRANSACTION":
+            return text.startswith(("ROLLBACK", "ABORT"))
+        return False
+
+    def _sql_summary(text):
+        # Adım satırı için yorumsuz, tek satırlık kısa metin
+        text = " ".join(re.sub(r"/\*.*?\*/|--[^\n]*", " ", text, flags=re.S).split()).rstrip(";").strip()
+        return text if len(text) <= 60 else text[:57] + "..."
+
+    def _sql_error(e, query=None):
+        # errors_as_json açıkken DuckDB hatası "<Tür> Error: {json}" biçimindedir; (mesaj, konum) döner.
+        # extract_statements ile ayrılan ifadelerde konum tüm script içindedir. Ayrıştırıcı hatalarında karakter,
+        # diğerlerinde (bağlama, katalog, dönüşüm) UTF-8 bayt sırasıdır; query verilirse karakter sırasına çevrilir
+        # (Türkçe yorumlu scriptlerde her ı/ğ/ş 2 bayttır).
+        # Çalışma sırasındaki (okuyucudan gelen) hatalarda önek yoktur, yalnızca JSON gelir.
+        text = str(e)
+        prefix, sep, body = text.partition("{")
+        if not sep or prefix not in ("", prefix.rstrip(": ") + ": "):
+            return text, None
+        try:
+            info = json.loads("{" + body)
+        except ValueError:
+            return text, None
+        prefix = prefix or f"{info.get('exception_type', 'Unknown')} Error: "
+        position = info.get("position")
+        position = int(position) if position not in (None, "") else None
+        if position is not None and query is not None and info.get("exception_type") != "Parser":
+            position = len(query.encode("utf-8")[:position].decode("utf-8", "ignore"))
+        return prefix + info.get("exception_message", ""), position
+
+    def _sql_location(query, offset):
+        # Script içi karakter konumu -> (satır, sütun, satır metni); satır ve sütun 1'den başlar
+        line_start = query.rfind("\n", 0, offset) + 1
+        line_end = query.find("\n", offset)
+        text = query[line_start:line_end if line_end >= 0 else len(query)]
+        return query.count("\n", 0, offset) + 1, offset - line_start + 1, text
+
+    def _print_sql_error(message, query, offset):
+        print("  " + message.replace("\n", "\n  "), flush=True)
+        if offset is None:
+            return {}
+        line, column, text = _sql_location(query, offset)
+        # Uzun (üretilmiş) satırlarda yalnızca hatanın çevresi gösterilir
+        left = max(0, column - 1 - 60)
+        snippet = ("..." if left else "") + text[left:left + 120] + ("..." if left + 120 < len(text) else "")
+        caret = column - 1 - left + (3 if left else 0)
+        print(f"\x1b[90m  satır {line}, sütun {column}:\x1b[0m", flush=True)
+        print(f"    {snippet}\n    {' ' * caret}\x1b[31m^\x1b[0m", flush=True)
+        return {"line": line, "column": column, "position": offset}
+
+    def _count_batches(rel):
+        # Sonucu bellekte tutmadan okur; yalnızca satır sayısı döner
+        return sum(batch.num_rows for batch in _arrow_batches(rel, 65536))
+
+    def execute_sql_query(query, preview=None, profile=None, intermediate=None):
+        options = _ds_options()
+        if preview is None:
+            preview = options.get("preview")
+        if preview is True:
+            preview = SQL_PREVIEW_ROWS
+        if profile is None:
+            profile = bool(options.get("profile"))
+        if intermediate is None:
+            intermediate = bool(options.get("intermediate"))
+
+        # Hata konumları (position) yalnızca JSON hata biçiminde gelir; script boyunca açılır, sonra geri alınır
+        errors_as_json = con.execute("SELECT current_setting('errors_as_json')").fetchone()[0]
+        con.execute("SET errors_as_json = true")
+        try:
+            try:
+                statements = con.extract_statements(query)
+            except duckdb.Error as e:
+                message, offset = _sql_error(e, query)
+                print(f"\x1b[31m✘ SQL AYRIŞTIRILAMADI\x1b[0m (hiçbir ifade çalıştırılmadı)", flush=True)
+                location = _print_sql_error(message, query, offset)
+                _ds_stats("sql", statement=None, status="error", rows=None, seconds=0, **location)
+                return
+            while _SQL_HANDLES:
+                release_result(_SQL_HANDLES.pop())
+            _execute_statements(query, statements, options, preview, profile, intermediate)
+        finally:
+            con.execute(f"SET errors_as_json = {'true' if errors_as_json else 'false'}")
+
+    def _execute_statements(query, statements, options, preview, profile, intermediate):
         if not statements:
             print("\x1b[33m[UYARI]\x1b[0m Çalıştırılacak SQL ifadesi bulunamadı.", flush=True)
             return
 
         total = len(statements)
-        last_result_df = None
+        kinds = [_sql_statement_kind(s) for s in statements]
+        # Son sonuç: yalnızca sorgu sonucu döndüren son ifade
+        final = max((i for i, k in enumerate(kinds) if k != "other"), default=None)
+        window = options.get("window")
         start_time_all = time.time()
+        lazy = []  # bu çalıştırmada henüz görünüm olan handle'lar
+
+        def keep(rel, known_rows=None):
+            handle = keep_lazy(rel, known_rows=known_rows)
+            _SQL_HANDLES.append(handle)
+            if isinstance(_RESULTS[handle], _LazyResult):
+                lazy.append(handle)
+            return handle
+
+        def show_preview(rel, head, complete, idx):
+            shown = head if window is None else head.slice(0, window)
+            if _continuous_arrow():
+                out, flow = _ArrowResultStream(), FlowControl()
+                for batch in shown.to_batches() or [pa.RecordBatch.from_pylist([], schema=shown.schema)]:
+                    flow.acquire(batch.nbytes)
+                    out.write(batch)
+                out.close()
+            else:
+                out = None
+                FlowControl().acquire(shown.nbytes)
+                display(ArrowWrapper(shown))
+            handle = keep(rel, known_rows=head.num_rows if complete else None)
+            descriptor = dict(_result_descriptor(handle, shown.num_rows), statement=idx)
+            if out is not None:
+                descriptor["result_id"] = out.result_id
+            _ds_publish(descriptor)
+            return handle
         
         print(f"\n\x1b[35;1m▶ SQL Script İşleme Başlatıldı ({total} Adım)\x1b[0m", flush=True)
         print("\x1b[90m" + "─" * 50 + "\x1b[0m", flush=True)
 
-        for i, stmt in enumerate(statements):
+        for i, statement in enumerate(statements):
             idx = i + 1
             now = datetime.now().strftime("%H:%M:%S")
-            short_stmt = stmt.replace('\n', ' ').strip()
-            if len(short_stmt) > 60: short_stmt = short_stmt[:57] + "..."
-            
-            print(f"\x1b[34m[{now}] [{idx}/{total}]\x1b[0m \x1b[1mÇALIŞTIRILIYOR:\x1b[0m {short_stmt}", flush=True)
+            print(f"\x1b[34m[{now}] [{idx}/{total}]\x1b[0m \x1b[1mÇALIŞTIRILIYOR:\x1b[0m {_sql_summary(statement.query)}", flush=True)
             
             step_start = time.time()
             try:
-                rel = con.sql(stmt)
+                if lazy and _sql_writes(statement):
+                    # Bu ifade tabloları değiştirebilir: önceki sonuçlar şimdiki halleriyle sabitlenir
+                    for handle in lazy:
+                        snapshot_result(handle)
+                    print(f"\x1b[90m  ↧ {len(lazy)} tembel sonuç sabitlendi ({time.time() - step_start:.3f} sn)\x1b[0m", flush=True)
+                    lazy.clear()
+                # SELECT için relation tembeldir: burada yalnızca bağlanır, okuma aşağıda yapılır
+                try:
+                    rel = con.sql(statement)
+                except duckdb.Error as e:
+                    if kinds[i] == "select" and _sql_error(e)[1] is None:
+                        # Relation yolu bağlama hatasında konum vermez; bağlama yine başarısız olacağından
+                        # ifade çalışmaz, yalnızca aynı hata konumuyla yeniden üretilir
+                        con.execute(statement)
+                    raise
                 duration = time.time() - step_start
-                
-                if rel is not None and rel.description is not None and len(rel.description) > 0:
-                    res_arrow = rel.fetch_arrow_table()
-                    print(f"\x1b[32m  ✔ SONUÇ:\x1b[0m {len(res_arrow)} satır ({duration:.3f} sn)", flush=True)
-                    last_result_df = res_arrow
+                has_rows = rel is not None and rel.description is not None and len(rel.description) > 0
+                is_result = has_rows and (i == final or kinds[i] != "other")
+
+                if is_result and kinds[i] == "select" and i != final and not intermediate:
+                    handle = keep(rel)
+                    _ds_publish(dict(_result_descriptor(handle, 0), statement=idx))
+                    print(f"\x1b[90m  ↷ TEMBEL:\x1b[0m ara sonuç okunmadı, handle {handle} ({duration:.3f} sn)", flush=True)
+                    _ds_stats("sql", statement=idx, status="lazy", rows=None, seconds=round(duration, 6), handle=handle)
+                elif is_result and preview:
+                    # Bir fazla satır okunur: devamı olup olmadığı sayım yapılmadan anlaşılır
+                    head = _arrow_table(rel.limit(int(preview) + 1))
+                    duration = time.time() - step_start
+                    complete = head.num_rows <= int(preview)
+                    head = head.slice(0, int(preview))
+                    more = "" if complete else "+ (devamı tembel)"
+                    print(f"\x1b[32m  ✔ ÖNİZLEME:\x1b[0m {len(head)} satır{more} ({duration:.3f} sn)", flush=True)
+                    _ds_stats("sql", statement=idx, status="ok", rows=len(head), seconds=round(duration, 6), preview=True)
+                    handle = show_preview(rel, head, complete, idx)
+                    if profile and i == final:
+                        profile_result(handle)
+                elif is_result:
+                    # Sonuç batch batch UI'a akar; pencere modunda handle akışın sakladığı sonuçtur,
+                    # değilse handle geçici görünümdür (satırlar Python'da tutulmaz)
+                    streamed = _stream(rel, summary=False, describe={"statement": idx})
+                    if streamed["interrupted"]:
+                        raise KeyboardInterrupt
+                    duration = time.time() - step_start
+                    print(f"\r\x1b[2K\x1b[32m  ✔ SONUÇ:\x1b[0m {streamed['rows']} satır ({duration:.3f} sn)", flush=True)
+                    _ds_stats("sql", statement=idx, status="ok", rows=streamed["rows"], seconds=round(duration, 6))
+                    handle = streamed["handle"]
+                    if handle is None:
+                        handle = keep(rel, known_rows=streamed["rows"])
+                        descriptor = dict(_result_descriptor(handle, streamed["rows"]), statement=idx)
+                        if streamed["result_id"] is not None:
+                            descriptor["result_id"] = streamed["result_id"]
+                        _ds_publish(descriptor)
+                    else:
+                        _SQL_HANDLES.append(handle)
+                    if profile and i == final:
+                        profile_result(handle)
+                elif has_rows:
+                    rows = _count_batches(rel)
+                    duration = time.time() - step_start
+                    print(f"\x1b[32m  ✔ SONUÇ:\x1b[0m {rows} satır ({duration:.3f} sn)", flush=True)
+                    _ds_stats("sql", statement=idx, status="ok", rows=rows, seconds=round(duration, 6))
                 else:
                     print(f"\x1b[32m  ✔ BAŞARILI\x1b[0m ({duration:.3f} sn)", flush=True)
-                
-                time.sleep(0.1)
+                    _ds_stats("sql", statement=idx, status="ok", rows=None, seconds=round(duration, 6))
                 
             except KeyboardInterrupt:
                 duration = time.time() - step_start
                 print(f"\x1b[33m  ⚠ DURDURULDU\x1b[0m ({duration:.3f} sn)", flush=True)
+                _ds_stats("sql", statement=idx, status="interrupted", rows=None, seconds=round(duration, 6))
                 break
             except Exception as e:
                 duration = time.time() - step_start
-                print(f"\x1b[31m  ✘ HATA\x1b[0m ({duration:.3f} sn): {str(e)}", flush=True)
+                message, position = _sql_error(e, query)
+                print(f"\x1b[31m  ✘ HATA\x1b[0m ({duration:.3f} sn)", flush=True)
+                location = _print_sql_error(message, query, position)
+                _ds_stats("sql", statement=idx, status="error", rows=None, seconds=round(duration, 6), **location)
                 break
             
             if idx < total:
                 print("\x1b[90m" + "  " + "·" * 20 + "\x1b[0m", flush=True)
 
-        if last_result_df is not None:
-            display(ArrowWrapper(last_result_df))
-
         total_duration = time.time() - start_time_all
         print("\x1b[90m" + "─" * 50 + "\x1b[0m", flush=True)
         print(f"\x1b[35;1m■ Tamamlandı.\x1b[0m Toplam Süre: {total_duration:.3f} sn\n", flush=True)
@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+from config import (
+    JUPYTER_URL, JUPYTER_TOKEN, WORKSPACES_DIR, get_bootstrap_code,
+    KERNEL_POOL_MIN, KERNEL_POOL_MAX, KERNEL_POOL_IDLE_TTL, KERNEL_POOL_PREWARM,
+    KERNEL_BOOTSTRAP_TIMEOUT,
+)
+from jupyter_channels import create_jupyter_message, open_kernel_channel
+from jupyter_http import jupyter_http
+from metrics import KERNEL_START_SECONDS, KERNEL_BOOTSTRAP_SECONDS, KERNEL_ACQUIRE_TOTAL
+
+DEFAULT_WS_REQS = ["duckdb", "pandas", "pyarrow", "rich"]
+
+
+class KernelStartError(Exception):
+    pass
+
+
+def kernel_spec_for(workspace):
+    return f"ws_{workspace}" if workspace else "python3"
+
+
+def load_workspace_requirements(workspace):
+    ws_reqs = list(DEFAULT_WS_REQS)
+    if workspace:
+        ws_req_path = os.path.join(WORKSPACES_DIR, workspace, "requirements.txt")
+        if os.path.exists(ws_req_path):
+            try:
+                with open(ws_req_path, "r") as f:
+                    ws_reqs = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            except: pass
+    return ws_reqs
+
+
+class PooledKernel:
+    """A started Jupyter kernel with an open channel socket and the bootstrap already executed."""
+
+    def __init__(self, workspace, kernel_id, j_ws, session_id, requirements):
+        self.workspace = workspace
+        self.spec = kernel_spec_for(workspace)
+        self.kernel_id = kernel_id
+        self.j_ws = j_ws
+        self.session_id = session_id
+        self.requirements = requirements
+        # Bootstrap stdout/stderr (incl. __SYS_INFO__), replayed to the client on hand-out
+        self.bootstrap_output = []
+        self.idle_since = time.monotonic()
+
+    @property
+    def alive(self):
+        return bool(self.j_ws and self.j_ws.connected)
+
+
+async def _start_kernel(workspace):
+    spec = kernel_spec_for(workspace)
+    print(f"Starting Jupyter kernel: {spec}")
+    started = time.perf_counter()
+    try:
+        resp = await jupyter_http.post("/api/kernels", json={"name": spec}, timeout=5)
+    except Exception as e:
+        raise KernelStartError(f"Failed to connect to Jupyter: {str(e)}")
+    if resp.status_code != 201:
+        raise KernelStartError(f"Jupyter Error: {resp.status_code} - {resp.text}")
+
+    kernel_id = resp.json()["id"]
+    j_ws = None
+    try:
+        j_ws = await open_kernel_channel(kernel_id)
+        KERNEL_START_SECONDS.labels(spec).observe(time.perf_counter() - started)
+
+        requirements = load_workspace_requirements(workspace)
+        kernel = PooledKernel(workspace, kernel_id, j_ws, uuid.uuid4().hex, requirements)
+        started = time.perf_counter()
+        await asyncio.wait_for(_bootstrap(kernel), KERNEL_BOOTSTRAP_TIMEOUT)
+        KERNEL_BOOTSTRAP_SECONDS.labels(spec).observe(time.perf_counter() - started)
+        return kernel
+    except Exception as e:
+        await _delete_kernel(kernel_id, j_ws)
+        if isinstance(e, KernelStartError):
+            raise
+        raise KernelStartError(f"Kernel bootstrap failed: {e!r}")
+
+
+async def _bootstrap(kernel):
+    session_link = f"{JUPYTER_URL}/lab?token={JUPYTER_TOKEN}"
+    injected_bootstrap = get_bootstrap_code().replace("{{KERNEL_ID}}", kernel.kernel_id)\
+                                      .replace("{{SESSION_ID}}", kernel.session_id)\
+                                      .replace("{{JUPYTER_URL}}", JUPYTER_URL)\
+                                      .replace("{{SESSION_LINK}}", session_link)\
+                                      .replace("{{REQUIRED_PACKAGES}}", json.dumps(kernel.requirements))
+
+    init_msg = create_jupyter_message(kernel.session_id, "execute_request", {
+        "code": injected_bootstrap,
+        "silent": False,
+        "store_history": False,
+        "user_expressions": {},
+        "allow_stdin": False
+    })
+    await kernel.j_ws.send_json(init_msg)
+    init_id = init_msg["header"]["msg_id"]
+
+    # Wait until the kernel goes idle for the bootstrap request, keeping its output
+    while True:
+        msg, _ = await kernel.j_ws.recv_message()
+        if msg.get("parent_header", {}).get("msg_id") != init_id:
+            continue
+        msg_type = msg.get("msg_type")
+        content = msg.get("content", {})
+        if msg_type == "stream":
+            out_type = "error" if content.get("name") == "stderr" else "stdout"
+            kernel.bootstrap_output.append({"type": out_type, "text": content["text"]})
+        elif msg_type == "error":
+            kernel.bootstrap_output.append({"type": "error", "text": "\n".join(content.get("traceback", []))})
+        elif msg_type == "status" and content.get("execution_state") == "idle":
+            return
+
+
+async def _delete_kernel(kernel_id, j_ws=None):
+    try: await jupyter_http.delete(f"/api/kernels/{kernel_id}", timeout=2)
+    except: pass
+    if j_ws:
+        await j_ws.close()
+
+
+class KernelPool:
+    """
+    Keeps pre-started, bootstrapped kernels per kernelspec so that /ws/execute
+    can hand one out immediately instead of paying kernel start + bootstrap.
+
+    - min_size: warm kernels kept per kernelspec while it is in use
+    - max_size: upper bound of warm + starting kernels per kernelspec
+    - idle_ttl: warm kernels unused for this long are shut down; a kernelspec
+      that was not requested within idle_ttl is drained completely
+    """
+
+    def __init__(self, min_size=KERNEL_POOL_MIN, max_size=KERNEL_POOL_MAX, idle_ttl=KERNEL_POOL_IDLE_TTL):
+        self.min_size = max(0, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.idle_ttl = idle_ttl
+        self._idle = {}         # spec -> [PooledKernel]
+        self._starting = {}     # spec -> number of kernels being started
+        self._target = {}       # spec -> warm kernels to keep (grows on misses, up to max_size)
+        self._last_demand = {}  # spec -> monotonic time of last acquire
+        self._workspaces = {}   # spec -> workspace name
+        self._tasks = set()
+        self._reaper = None
+
+    async def start(self, prewarm=KERNEL_POOL_PREWARM):
+        if self.min_size > 0 and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop())
+        for workspace in prewarm:
+            self._last_demand[kernel_spec_for(workspace)] = time.monotonic()
+            self._refill(workspace)
+
+    async def acquire(self, workspace):
+        spec = kernel_spec_for(workspace)
+        self._last_demand[spec] = time.monotonic()
+
+        kernel = None
+        idle = self._idle.get(spec, [])
+        requirements = load_workspace_requirements(workspace)
+        while idle:
+            candidate = idle.pop(0)
+            if candidate.alive and candidate.requirements == requirements:
+                kernel = candidate
+                break
+            # Dead socket or requirements.txt changed since warm-up
+            self._spawn(_delete_kernel(candidate.kernel_id, candidate.j_ws))
+
+        if kernel is None and spec in self._target:
+            # Pool was drained by concurrent connects, keep one more warm next time
+            self._target[spec] = min(self.max_size, self._target.get(spec, self.min_size) + 1)
+        self._refill(workspace)
+
+        KERNEL_ACQUIRE_TOTAL.labels(spec, "cold" if kernel is None else "warm").inc()
+        if kernel is None:
+            kernel = await _start_kernel(workspace)
+        return kernel
+
+    async def release(self, kernel):
+        # Kernels carry user state, so they are never returned to the pool
+        await _delete_kernel(kernel.kernel_id, kernel.j_ws)
+
+    async def shutdown(self):
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        for task in list(self._tasks):
+            task.cancel()
+        kernels = [k for idle in self._idle.values() for k in idle]
+        self._idle.clear()
+        await asyncio.gather(
+            *(_delete_kernel(k.kernel_id, k.j_ws) for k in kernels),
+            return_exceptions=True
+        )
+
+    def stats(self):
+        return {
+            spec: {"idle": len(self._idle.get(spec, [])), "starting": self._starting.get(spec, 0),
+                   "target": self._target.get(spec, self.min_size)}
+            for spec in set(self._idle) | set(self._starting)
+        }
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _refill(self, workspace):
+        if self.min_size <= 0:
+            return
+        spec = kernel_spec_for(workspace)
+        self._workspaces[spec] = workspace
+        target = self._target.setdefault(spec, self.min_size)
+        while len(self._idle.get(spec, [])) + self._starting.get(spec, 0) < target:
+            self._starting[spec] = self._starting.get(spec, 0) + 1
+            self._spawn(self._fill_one(workspace))
+
+    async def _fill_one(self, workspace):
+        spec = kernel_spec_for(workspace)
+        try:
+            kernel = await _start_kernel(workspace)
+            kernel.idle_since = time.monotonic()
+            self._idle.setdefault(spec, []).append(kernel)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Kernel pool refill failed for {spec}: {e}")
+        finally:
+            self._starting[spec] = max(0, self._starting.get(spec, 0) - 1)
+
+    async def _reap_loop(self):
+        interval = max(1.0, min(30.0, self.idle_ttl / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self._reap()
+            except Exception as e:
+                print(f"Kernel pool reaper error: {e}")
+
+    def _reap(self):
+        now = time.monotonic()
+        for spec, idle in list(self._idle.items()):
+            active = now - self._last_demand.get(spec, 0) < self.idle_ttl
+            keep = self._target.get(spec, self.min_size) if active else 0
+            expired = [k for k in idle if now - k.idle_since > self.idle_ttl or not k.alive]
+            for k in expired:
+                if len(idle) <= keep and k.alive:
+                    break
+                idle.remove(k)
+                self._spawn(_delete_kernel(k.kernel_id, k.j_ws))
+            if not active:
+                self._target.pop(spec, None)
+                continue
+            if expired:
+                # Burst demand is over, shrink back towards min_size
+                self._target[spec] = max(self.min_size, self._target.get(spec, self.min_size) - 1)
+            self._refill(self._workspaces.get(spec))
+
+
+kernel_pool = KernelPool()
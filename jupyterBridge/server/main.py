@@ -7,7 +7,10 @@ from fastapi.middleware.cors import CORSMiddleware
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(BASE_DIR)
 
-from routes import workspaces, files, execute, terminal
+from routes import workspaces, files, execute, terminal, metrics
+from kernel_pool import kernel_pool
+from sessions import session_registry
+from jupyter_http import jupyter_http
 
 app = FastAPI(title="Data Studio Jupyter Bridge")
 
@@ -26,12 +29,22 @@ async def startup_event():
     print("Registered Routes:")
     for route in app.routes:
         print(f" - {route.path}")
+    await jupyter_http.start()
+    await kernel_pool.start()
+
+# Shutdown Event
+@app.on_event("shutdown")
+async def shutdown_event():
+    await session_registry.shutdown()
+    await kernel_pool.shutdown()
+    await jupyter_http.close()
 
 # Include Routers
 app.include_router(workspaces.router)
 app.include_router(files.router)
 app.include_router(execute.router)
 app.include_router(terminal.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn
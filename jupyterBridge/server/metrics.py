@@ -0,0 +1,102 @@
+from prometheus_client import CollectorRegistry, Counter, Histogram, ProcessCollector
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+
+# Dedicated registry: /metrics only exposes the bridge's own series (plus process stats)
+REGISTRY = CollectorRegistry()
+ProcessCollector(registry=REGISTRY)
+
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+KERNEL_START_SECONDS = Histogram(
+    "datastudio_kernel_start_seconds", "Jupyter kernel start (REST create + channel connect)",
+    ["spec"], buckets=_SLOW_BUCKETS, registry=REGISTRY,
+)
+KERNEL_BOOTSTRAP_SECONDS = Histogram(
+    "datastudio_kernel_bootstrap_seconds", "Bootstrap script execution incl. requirements check",
+    ["spec"], buckets=_SLOW_BUCKETS, registry=REGISTRY,
+)
+KERNEL_ACQUIRE_TOTAL = Counter(
+    "datastudio_kernel_acquire_total", "Kernels handed to sessions, by warm pool hit or cold start",
+    ["spec", "source"], registry=REGISTRY,
+)
+EXECUTE_QUEUE_WAIT_SECONDS = Histogram(
+    "datastudio_execute_queue_wait_seconds", "Time an execute request waited on the session queue",
+    registry=REGISTRY,
+)
+EXECUTE_SECONDS = Histogram(
+    "datastudio_execute_seconds", "Execute request duration from dispatch to done",
+    ["status"], buckets=_SLOW_BUCKETS, registry=REGISTRY,
+)
+ARROW_FRAMES_TOTAL = Counter(
+    "datastudio_arrow_frames_total", "Arrow IPC frames forwarded to clients", registry=REGISTRY,
+)
+ARROW_BYTES_TOTAL = Counter(
+    "datastudio_arrow_bytes_total", "Arrow IPC bytes forwarded to clients", registry=REGISTRY,
+)
+OUTPUT_FRAMES_TOTAL = Counter(
+    "datastudio_output_frames_total", "stdout/stderr frames sent to clients (after coalescing)",
+    registry=REGISTRY,
+)
+JUPYTER_HTTP_SECONDS = Histogram(
+    "datastudio_jupyter_http_request_seconds", "Jupyter REST call latency per attempt",
+    ["method", "status"], registry=REGISTRY,
+)
+
+# Reported by the kernel over the datastudio comm (kind "stats")
+KERNEL_OP_SECONDS = Histogram(
+    "datastudio_kernel_op_seconds", "stream() calls and SQL statements timed inside the kernel",
+    ["op", "status"], buckets=_SLOW_BUCKETS, registry=REGISTRY,
+)
+KERNEL_OP_ROWS_TOTAL = Counter(
+    "datastudio_kernel_op_rows_total", "Rows produced by stream() calls and SQL statements",
+    ["op"], registry=REGISTRY,
+)
+KERNEL_OP_BYTES_TOTAL = Counter(
+    "datastudio_kernel_op_bytes_total", "Arrow bytes produced by stream() calls", ["op"], registry=REGISTRY,
+)
+
+
+def observe_kernel_stats(stats):
+    op = str(stats.get("op", "unknown"))
+    if stats.get("seconds") is not None:
+        KERNEL_OP_SECONDS.labels(op, str(stats.get("status", "ok"))).observe(float(stats["seconds"]))
+    if stats.get("rows"):
+        KERNEL_OP_ROWS_TOTAL.labels(op).inc(int(stats["rows"]))
+    if stats.get("bytes"):
+        KERNEL_OP_BYTES_TOTAL.labels(op).inc(int(stats["bytes"]))
+
+
+class BridgeStateCollector:
+    """Point-in-time values read at scrape time: sessions, warm pool, template caches."""
+
+    def __init__(self, session_registry, kernel_pool, template_cache, workspace_env):
+        self.session_registry = session_registry
+        self.kernel_pool = kernel_pool
+        self.template_cache = template_cache
+        self.workspace_env = workspace_env
+
+    def collect(self):
+        sessions = GaugeMetricFamily(
+            "datastudio_active_sessions", "Kernel sessions per workspace", labels=["workspace", "state"])
+        counts = {}
+        for session in self.session_registry.sessions():
+            key = (session.workspace or "", "attached" if session.attached else "detached")
+            counts[key] = counts.get(key, 0) + 1
+        for (workspace, state), n in counts.items():
+            sessions.add_metric([workspace, state], n)
+        yield sessions
+
+        pool = GaugeMetricFamily("datastudio_kernel_pool_kernels", "Warm pool kernels", labels=["spec", "state"])
+        for spec, s in self.kernel_pool.stats().items():
+            pool.add_metric([spec, "idle"], s["idle"])
+            pool.add_metric([spec, "starting"], s["starting"])
+        yield pool
+
+        for cache_name, cache in (("template", self.template_cache), ("env", self.workspace_env)):
+            stats = cache.stats()
+            hits = CounterMetricFamily(f"datastudio_{cache_name}_cache_hits", f"{cache_name} cache hits")
+            hits.add_metric([], stats["hits"])
+            yield hits
+            misses = CounterMetricFamily(f"datastudio_{cache_name}_cache_misses", f"{cache_name} cache misses")
+            misses.add_metric([], stats["misses"])
+            yield misses
@@ -1,118 +1,71 @@
 import os
 import json
-import uuid
-import base64
-import asyncio
 import datetime
-import requests
-import jinja2
-from dotenv import dotenv_values
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from config import JUPYTER_URL, JUPYTER_TOKEN, HEADERS, WORKSPACES_DIR, BOOTSTRAP_CODE, get_bootstrap_code
+from kernel_pool import KernelStartError
+from sessions import session_registry, ExecuteRequest
+from jupyter_channels import create_jupyter_message
+from templating import template_cache, workspace_env
 
 router = APIRouter(tags=["execute"])
 
-def create_jupyter_message(session_id, msg_type, content):
-    return {
-        "header": {
-            "msg_id": uuid.uuid4().hex,
-            "username": "datastudio_bridge",
-            "session": session_id,
-            "msg_type": msg_type,
-            "version": "5.3",
-            "date": datetime.datetime.now().isoformat()
-        },
-        "parent_header": {},
-        "metadata": {},
-        "content": content
-    }
+# Arrow IPC body codecs the kernel can write (pyarrow names)
+ARROW_CODECS = ("zstd", "lz4")
+
+
+def arrow_options(value):
+    """Arrow IPC features the UI decoder supports: compression codecs in preference order, dictionaries,
+    one continuous IPC stream per result."""
+    if not isinstance(value, dict):
+        return None
+    options = {}
+    codecs = [c for c in value.get("compression") or [] if c in ARROW_CODECS]
+    if codecs:
+        options["compression"] = codecs
+    for feature in ("dictionary", "continuous"):
+        if value.get(feature):
+            options[feature] = True
+    return options or None
+
+
+def row_limit(req, key, allow_default=False):
+    """Row count option (window, preview) from a request: None when unset, a positive int otherwise.
+    With allow_default, true is passed through and the kernel uses its own default. Raises ValueError."""
+    value = req.get(key)
+    if value is None or value is False:
+        return None
+    if value is True:
+        if allow_default:
+            return True
+        raise ValueError(f"{key} must be a positive integer")
+    try:
+        rows = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a positive integer, got {value!r}") from None
+    if rows < 0 or (isinstance(value, float) and rows != value):
+        raise ValueError(f"{key} must be a positive integer, got {value!r}")
+    return rows or None
+
 
 @router.websocket("/ws/execute")
-async def execute_code(websocket: WebSocket, workspace: str = None):
+async def execute_code(websocket: WebSocket, workspace: str = None, session: str = None):
     await websocket.accept()
     
-    print(f"Connecting to Jupyter at {JUPYTER_URL}...")
     try:
-        kernel_spec_name = "python3"
-        if workspace:
-             kernel_spec_name = f"ws_{workspace}"
-             print(f"Requesting Workspace Kernel: {kernel_spec_name}")
-
-        payload = {"name": kernel_spec_name}
-        resp = requests.post(f"{JUPYTER_URL}/api/kernels", headers=HEADERS, json=payload, timeout=5)
-        
-        if resp.status_code != 201:
-            await websocket.send_json({"type": "error", "text": f"Jupyter Error: {resp.status_code} - {resp.text}"})
-            return
-    except Exception as e:
-        await websocket.send_json({"type": "error", "text": f"Failed to connect to Jupyter: {str(e)}"})
+        kernel_session, reattached = await session_registry.open(workspace, session)
+    except KernelStartError as e:
+        await websocket.send_json({"type": "error", "text": str(e)})
         return
 
-    kernel = resp.json()
-    kernel_id = kernel['id']
-    ws_url = f"ws://{JUPYTER_URL.split('//')[1]}/api/kernels/{kernel_id}/channels?token={JUPYTER_TOKEN}"
+    session_id = kernel_session.id
     
     try:
-        import websocket as j_ws_lib
-        j_ws = j_ws_lib.create_connection(ws_url, header={"Origin": JUPYTER_URL})
-        
-        session_id = uuid.uuid4().hex
-        
-        # Workspace specific requirements
-        ws_reqs = ["duckdb", "pandas", "pyarrow", "rich"]
-        if workspace:
-            ws_req_path = os.path.join(WORKSPACES_DIR, workspace, "requirements.txt")
-            if os.path.exists(ws_req_path):
-                try:
-                    with open(ws_req_path, "r") as f:
-                        ws_reqs = [line.strip() for line in f if line.strip() and not line.startswith("#")]
-                except: pass
-
-        session_link = f"{JUPYTER_URL}/lab?token={JUPYTER_TOKEN}"
-        injected_bootstrap = get_bootstrap_code().replace("{{KERNEL_ID}}", kernel_id)\
-                                          .replace("{{SESSION_ID}}", session_id)\
-                                          .replace("{{JUPYTER_URL}}", JUPYTER_URL)\
-                                          .replace("{{SESSION_LINK}}", session_link)\
-                                          .replace("{{REQUIRED_PACKAGES}}", json.dumps(ws_reqs))
-        
-        init_msg = create_jupyter_message(session_id, "execute_request", {
-            "code": injected_bootstrap, 
-            "silent": False,
-            "store_history": False,
-            "user_expressions": {},
-            "allow_stdin": False
-        })
-        j_ws.send(json.dumps(init_msg))
-
-        async def listen_jupyter():
-            while True:
-                try:
-                    raw = await asyncio.to_thread(j_ws.recv)
-                    msg = json.loads(raw)
-                    msg_type = msg.get("msg_type")
-                    content = msg.get("content")
-                    
-                    if msg_type == "stream":
-                        out_type = "stdout"
-                        if content.get("name") == "stderr":
-                            out_type = "error"
-                        await websocket.send_json({"type": out_type, "text": content['text']})
-                    elif msg_type == "error":
-                        await websocket.send_json({"type": "error", "text": "\\n".join(content.get('traceback', []))})
-                    elif msg_type in ["display_data", "execute_result"]:
-                        bundle = content.get("data", {})
-                        if "application/vnd.apache.arrow.stream" in bundle:
-                            raw_arrow = bundle["application/vnd.apache.arrow.stream"]
-                            binary_data = base64.b64decode(raw_arrow) if isinstance(raw_arrow, str) else raw_arrow
-                            await websocket.send_bytes(binary_data)
-                    
-                    if msg_type == "status" and content.get("execution_state") == "idle":
-                        await websocket.send_json({"type": "done"})
-                except Exception as e:
-                    break
-
-        asyncio.create_task(listen_jupyter())
+        # The client reconnects with ?session=<session_id> to reattach to this kernel
+        await websocket.send_json({"type": "session", "session_id": session_id, "reattached": reattached})
         await websocket.send_json({"type": "status", "execution_state": "ready"})
+        await kernel_session.attach(websocket)
+        # Negotiated per connection: a reattaching UI may have a different decoder
+        arrow = None
 
         while True:
             data = await websocket.receive_text()
@@ -123,17 +76,8 @@ async def execute_code(websocket: WebSocket, workspace: str = None):
 
             # Jinja Processing
             try:
-                # Start with system env vars
-                env_vars = dict(os.environ)
-                
-                # If workspace is defined, load its .env file
-                if workspace:
-                    ws_env_path = os.path.join(WORKSPACES_DIR, workspace, ".env")
-                    if os.path.exists(ws_env_path):
-                        ws_vars = dotenv_values(ws_env_path)
-                        if ws_vars:
-                            # Filter None values just in case
-                            env_vars.update({k: v for k, v in ws_vars.items() if v is not None})
+                # System env vars + workspace .env, re-read only when the .env file changes
+                env_vars = workspace_env.get(workspace)
 
                 template_context = {
                     "user_id": os.getenv("USER_ID", os.getenv("USER", "system")),
@@ -141,13 +85,13 @@ async def execute_code(websocket: WebSocket, workspace: str = None):
                     "date": datetime.datetime.now().strftime("%Y-%m-%d"),
                     "env": env_vars
                 }
-                template = jinja2.Template(raw_code)
-                final_code = template.render(template_context)
+                final_code = template_cache.render(raw_code, template_context)
             except Exception:
                 final_code = raw_code
 
             if mode == "sql" and final_code:
-                final_code = f"execute_sql_query(\"\"\"{final_code}\"\"\")"
+                # repr() keeps quotes, backslashes and triple quotes inside the script intact
+                final_code = f"execute_sql_query({final_code!r})"
             elif mode == "system" and filename == "requirements.txt" and final_code:
                 final_code = f"""
 import sys
@@ -200,27 +144,88 @@ else:
     print("Değişken bulunamadı.")
 """
 
-            if req.get("action") == "execute" and final_code:
+            if req.get("action") == "close":
+                # Explicit end of session: shut the kernel down without a grace period
+                await session_registry.close(kernel_session)
+                break
+            elif req.get("action") == "execute" and final_code:
+                try:
+                    window = row_limit(req, "window")
+                    preview = row_limit(req, "preview", allow_default=True)
+                except ValueError as e:
+                    # A bad option fails this request only, not the session connection
+                    rid = req.get("request_id")
+                    await websocket.send_json({"type": "error", "text": str(e), "request_id": rid})
+                    await websocket.send_json({"type": "done", "status": "error", "request_id": rid})
+                    continue
+                # Initial credits enable flow control: the kernel pauses streaming when they run out
+                credits = req.get("credits") if req.get("request_id") is not None else None
                 exec_msg = create_jupyter_message(session_id, "execute_request", {
                     "code": final_code, 
                     "silent": False,
                     "store_history": True,
                     "user_expressions": {},
-                    "allow_stdin": False
+                    "allow_stdin": credits is not None
                 })
-                try:
-                    await asyncio.to_thread(j_ws.send, json.dumps(exec_msg))
-                except Exception:
-                    await websocket.send_json({"type": "error", "text": "Lost connection to Jupyter Kernel."})
-                    break
+                options = {}
+                if credits is not None:
+                    options["flow_control"] = True
+                if window:
+                    # Only the first `window` rows are sent; the result stays in the kernel as a handle
+                    options["window"] = window
+                if preview:
+                    # Only the first `preview` rows are read (true: the kernel's default); the full result stays
+                    # a lazy view in the kernel
+                    options["preview"] = preview
+                if req.get("profile"):
+                    options["profile"] = True
+                if req.get("intermediate"):
+                    # Intermediate SELECTs are only bound unless the client asks to run them
+                    options["intermediate"] = True
+                request_arrow = arrow_options(req["arrow"]) if "arrow" in req else arrow
+                if request_arrow:
+                    options["arrow"] = request_arrow
+                if options:
+                    exec_msg["metadata"]["datastudio"] = options
+                # request_id is optional; with it outputs/done are tagged and cells can be pipelined
+                await kernel_session.submit(ExecuteRequest(
+                    req.get("request_id"), exec_msg, stop_on_error=req.get("stop_on_error", True), credits=credits
+                ))
+            elif req.get("action") == "execute" and req.get("request_id") is not None:
+                await websocket.send_json({"type": "done", "status": "ok", "request_id": req["request_id"]})
+            elif req.get("action") == "cancel":
+                await kernel_session.cancel(req.get("request_id"))
             elif req.get("action") == "interrupt":
-                try:
-                    requests.post(f"{JUPYTER_URL}/api/kernels/{kernel_id}/interrupt", headers=HEADERS, timeout=2)
-                except: pass
+                await kernel_session.interrupt()
+            elif req.get("action") in ("fetch", "release", "profile") and req.get("handle"):
+                # Grid paging runs as a silent cell on the same queue, so it sees finished results only
+                if req["action"] == "fetch":
+                    args = {k: req[k] for k in ("handle", "offset", "limit", "sort", "filter") if req.get(k) is not None}
+                    code = f"fetch_window(**{args!r})"
+                elif req["action"] == "profile":
+                    args = {k: req[k] for k in ("handle", "sample_rows") if req.get(k) is not None}
+                    code = f"profile_result(**{args!r})"
+                else:
+                    code = f"release_result({req['handle']!r})"
+                exec_msg = create_jupyter_message(session_id, "execute_request", {
+                    "code": code,
+                    "silent": True,
+                    "store_history": False,
+                    "user_expressions": {},
+                    "allow_stdin": False
+                })
+                if arrow:
+                    exec_msg["metadata"]["datastudio"] = {"arrow": arrow}
+                await kernel_session.submit(ExecuteRequest(req.get("request_id"), exec_msg, stop_on_error=False))
+            elif req.get("action") == "configure":
+                # Arrow IPC compression / dictionary encoding the UI can decode; applies to later requests
+                arrow = arrow_options(req.get("arrow"))
+                await websocket.send_json({"type": "configured", "arrow": arrow or {}})
+            elif req.get("action") == "credit":
+                await kernel_session.grant(req.get("request_id"), req.get("batches"), req.get("bytes"))
+            elif req.get("action") == "input":
+                await kernel_session.input_reply(req.get("request_id"), req.get("value", ""))
 
     except WebSocketDisconnect: pass
     finally:
-        try: requests.delete(f"{JUPYTER_URL}/api/kernels/{kernel_id}", headers=HEADERS, timeout=2)
-        except: pass
-        try: j_ws.close()
-        except: pass
+        session_registry.detach(kernel_session, websocket)
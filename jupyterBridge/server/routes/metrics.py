@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from metrics import REGISTRY, BridgeStateCollector
+from sessions import session_registry
+from kernel_pool import kernel_pool
+from templating import template_cache, workspace_env
+
+router = APIRouter(tags=["metrics"])
+
+REGISTRY.register(BridgeStateCollector(session_registry, kernel_pool, template_cache, workspace_env))
+
+@router.get("/metrics")
+def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
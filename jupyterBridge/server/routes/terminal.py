@@ -1,8 +1,8 @@
 import json
 import asyncio
-import requests
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from config import JUPYTER_URL, JUPYTER_TOKEN, HEADERS
+from jupyter_channels import open_terminal_channel
+from jupyter_http import jupyter_http
 
 router = APIRouter(tags=["terminal"])
 
@@ -16,7 +16,7 @@ async def system_terminal(websocket: WebSocket):
 
     try:
         try:
-            resp = requests.post(f"{JUPYTER_URL}/api/terminals", headers=HEADERS, timeout=5)
+            resp = await jupyter_http.post("/api/terminals", timeout=5)
             if resp.status_code != 200:
                 await websocket.send_text(f"Error creating terminal: {resp.status_code} {resp.text}\r\n")
                 await websocket.close()
@@ -29,11 +29,8 @@ async def system_terminal(websocket: WebSocket):
             await websocket.close()
             return
 
-        ws_url = f"ws://{JUPYTER_URL.split('//')[1]}/terminals/websocket/{terminal_name}?token={JUPYTER_TOKEN}"
-        
-        import websocket as j_ws_lib
         try:
-            j_ws = j_ws_lib.create_connection(ws_url, header={"Origin": JUPYTER_URL})
+            j_ws = await open_terminal_channel(terminal_name)
         except Exception as e:
              await websocket.send_text(f"Error connecting to Jupyter terminal socket: {e}\r\n")
              await websocket.close()
@@ -42,7 +39,7 @@ async def system_terminal(websocket: WebSocket):
         async def listen_jupyter():
             while True:
                 try:
-                    data = await asyncio.to_thread(j_ws.recv)
+                    data = await j_ws.recv()
                     if isinstance(data, str):
                         try:
                             msg_list = json.loads(data)
@@ -70,17 +67,17 @@ async def system_terminal(websocket: WebSocket):
                         data = msg.get('data')
                         if data:
                             j_msg = json.dumps(['stdin', data])
-                            await asyncio.to_thread(j_ws.send, j_msg)
+                            await j_ws.send(j_msg)
                             
                     elif msg.get('type') == 'resize':
                         cols = msg.get('cols')
                         rows = msg.get('rows')
                         if cols and rows:
                             j_msg = json.dumps(['setup', {'rows': rows, 'cols': cols}])
-                            await asyncio.to_thread(j_ws.send, j_msg)
+                            await j_ws.send(j_msg)
                             try:
-                                requests.patch(f"{JUPYTER_URL}/api/terminals/{terminal_name}/size", 
-                                             headers=HEADERS, json={"rows": rows, "cols": cols}, timeout=1)
+                                await jupyter_http.patch(f"/api/terminals/{terminal_name}/size",
+                                                         json={"rows": rows, "cols": cols}, timeout=1)
                             except: pass
                 except json.JSONDecodeError: pass
             except WebSocketDisconnect: break
@@ -90,8 +87,7 @@ async def system_terminal(websocket: WebSocket):
         print(f"Terminal Proxy Error: {e}")
     finally:
         if terminal_name:
-            try: requests.delete(f"{JUPYTER_URL}/api/terminals/{terminal_name}", headers=HEADERS, timeout=2)
+            try: await jupyter_http.delete(f"/api/terminals/{terminal_name}", timeout=2)
             except: pass
         if j_ws:
-            try: j_ws.close()
-            except: pass
+            await j_ws.close()
@@ -0,0 +1,529 @@
+import json
+import time
+import base64
+import asyncio
+from collections import deque
+from config import SESSION_GRACE_SECONDS, SESSION_BUFFER_MAX_BYTES, OUTPUT_COALESCE_MS, OUTPUT_COALESCE_BYTES
+from kernel_pool import kernel_pool
+from jupyter_http import jupyter_http
+from jupyter_channels import create_jupyter_message
+from metrics import (
+    EXECUTE_QUEUE_WAIT_SECONDS, EXECUTE_SECONDS, ARROW_FRAMES_TOTAL, ARROW_BYTES_TOTAL,
+    OUTPUT_FRAMES_TOTAL, observe_kernel_stats,
+)
+
+# input_request prompt the kernel's FlowControl uses to ask for more credits
+CREDIT_PROMPT = "__DS_CREDIT__"
+# Structured messages the kernel sends over the datastudio comm
+STRUCTURED_KINDS = {"result", "window", "stats", "arrow_stream", "profile"}
+
+
+class ExecuteRequest:
+    """One execute_request on the bridge queue, correlated with the client's request id by msg_id."""
+
+    def __init__(self, request_id, msg, stop_on_error=True, credits=None):
+        self.request_id = request_id
+        self.msg = msg
+        self.msg_id = msg["header"]["msg_id"]
+        self.stop_on_error = stop_on_error
+        self.queued_at = time.monotonic()
+        self.started_at = None
+        self.status = None
+        self.replied = False
+        self.idle = False
+        # Flow control: credits granted by the client but not yet handed to the kernel.
+        # Each budget stays None until the client grants it; the kernel does not limit a budget it was never
+        # given, so a client can grant only batches or only bytes.
+        self.credit_batches = None
+        self.credit_bytes = None
+        self.credit_request = None  # header of the kernel's pending credit input_request
+        self.input_request = None   # header of a pending user input() prompt
+        if credits:
+            self.add_credits(credits.get("batches"), credits.get("bytes"))
+
+    def add_credits(self, batches=None, nbytes=None):
+        if batches is not None:
+            self.credit_batches = (self.credit_batches or 0) + int(batches)
+        if nbytes is not None:
+            self.credit_bytes = (self.credit_bytes or 0) + int(nbytes)
+
+    @property
+    def has_credits(self):
+        return bool(self.credit_batches and self.credit_batches > 0) or bool(self.credit_bytes and self.credit_bytes > 0)
+
+    def take_credits(self):
+        grant = {"batches": self.credit_batches, "bytes": self.credit_bytes}
+        if self.credit_batches is not None:
+            self.credit_batches = 0
+        if self.credit_bytes is not None:
+            self.credit_bytes = 0
+        return grant
+
+    @property
+    def tagged(self):
+        # Untagged requests keep the original protocol (plain stdout/error/done messages)
+        return self.request_id is not None
+
+    def tag(self, payload):
+        if self.tagged:
+            payload["request_id"] = self.request_id
+        return payload
+
+
+class OutputCoalescer:
+    """
+    Pending stdout/stderr text of one request and stream name. Chunks are
+    merged until the time window ends, the size limit is hit, or an error,
+    input prompt or request completion forces a flush. Carriage-return
+    progress updates superseded within the window are dropped. Arrow frames
+    are not held back, so they may overtake progress text by up to one window.
+    """
+
+    def __init__(self, window=OUTPUT_COALESCE_MS / 1000, max_bytes=OUTPUT_COALESCE_BYTES):
+        self.window = window
+        self.max_bytes = max_bytes
+        self.request = None
+        self.out_type = None
+        self.text = ""
+        self.deadline = None
+
+    @property
+    def enabled(self):
+        return self.window > 0 and self.max_bytes > 0
+
+    def accepts(self, request, out_type):
+        return not self.text or (self.request is request and self.out_type == out_type)
+
+    def add(self, request, out_type, text):
+        if not self.text:
+            self.request, self.out_type = request, out_type
+            self.deadline = time.monotonic() + self.window
+        self.text = _collapse_progress(self.text + text)
+
+    @property
+    def full(self):
+        return len(self.text) >= self.max_bytes
+
+    def timeout(self):
+        return max(0.0, self.deadline - time.monotonic()) if self.text else None
+
+    def take(self):
+        pending = (self.request, self.out_type, self.text)
+        self.request, self.out_type, self.text, self.deadline = None, None, "", None
+        return pending
+
+
+def _collapse_progress(text):
+    # Keep only the last "\r" rewrite of the unfinished line ("\r" right before "\n" is a line ending)
+    start = text.rfind("\n") + 1
+    cr = text.rfind("\r", start, len(text) - 1)
+    if cr > start:
+        return text[:start] + text[cr:]
+    return text
+
+
+class KernelSession:
+    """
+    A kernel bound to a UI session. The kernel -> client forwarding lives here
+    rather than in the websocket handler, so the session survives browser
+    reconnects: while no websocket is attached, outputs are buffered and
+    replayed on the next attach.
+    """
+
+    def __init__(self, registry, kernel):
+        self.registry = registry
+        self.kernel = kernel
+        self.id = kernel.session_id
+        self.workspace = kernel.workspace
+        self.websocket = None
+        self._attaching = None
+        self.closed = False
+        self._buffer = deque()
+        self._buffer_bytes = 0
+        self._dropped = 0
+        self._expiry = None
+        self._queue = deque()
+        self._running = None
+        self._output = OutputCoalescer()
+        self._listener = asyncio.create_task(self._listen())
+
+    @property
+    def attached(self):
+        return self.websocket is not None
+
+    async def attach(self, websocket):
+        # The new connection owns the session from here on: while the old one is closed and the buffer is
+        # replayed, the old handler's detach() must not schedule an expiry
+        self._attaching = websocket
+        if self._expiry:
+            self._expiry.cancel()
+            self._expiry = None
+        try:
+            if self.websocket is not None and self.websocket is not websocket:
+                # Another tab/connection takes over the session
+                old, self.websocket = self.websocket, None
+                try: await old.close(code=4001)
+                except: pass
+
+            for out in self.kernel.bootstrap_output:
+                await websocket.send_json(out)
+            if self._dropped:
+                await websocket.send_json({"type": "error", "text": f"{self._dropped} output messages were dropped while disconnected."})
+                self._dropped = 0
+            # Outputs produced during the replay are appended to the buffer, so drain until empty
+            while self._buffer:
+                frame = self._buffer.popleft()
+                self._buffer_bytes -= _frame_size(frame)
+                try:
+                    await _send_frame(websocket, frame)
+                except Exception:
+                    self._buffer.appendleft(frame)
+                    self._buffer_bytes += _frame_size(frame)
+                    raise
+            self.websocket = websocket
+        finally:
+            if self._attaching is websocket:
+                self._attaching = None
+        if self._expiry:
+            self._expiry.cancel()
+            self._expiry = None
+
+    def detach(self, websocket):
+        if self.closed:
+            return
+        if self.websocket is websocket:
+            self.websocket = None
+        elif self.websocket is not None or self._attaching not in (None, websocket):
+            return  # a newer connection owns (or is taking over) the session
+        if self._expiry is None:
+            loop = asyncio.get_running_loop()
+            self._expiry = loop.call_later(self.registry.grace, lambda: asyncio.create_task(self.registry.close(self)))
+
+    async def send_json(self, payload):
+        await self._send(("json", payload))
+
+    async def send_bytes(self, data):
+        await self._send(("bytes", data))
+
+    async def _send(self, frame):
+        websocket = self.websocket
+        if websocket is not None:
+            try:
+                await _send_frame(websocket, frame)
+                return
+            except Exception:
+                self.detach(websocket)
+        self._buffer_frame(frame)
+
+    def _buffer_frame(self, frame):
+        if frame[0] == "bytes":
+            frame = ("bytes", bytes(frame[1]))  # release the Jupyter frame the slice points into
+        self._buffer.append(frame)
+        self._buffer_bytes += _frame_size(frame)
+        while self._buffer_bytes > self.registry.buffer_max and len(self._buffer) > 1:
+            self._buffer_bytes -= _frame_size(self._buffer.popleft())
+            self._dropped += 1
+
+    async def submit(self, request):
+        """Queue an execute request; the kernel gets the next one only after the previous finished."""
+        if self._running is None:
+            await self._dispatch(request)
+        else:
+            self._queue.append(request)
+            if request.tagged:
+                await self.send_json(request.tag({"type": "queued", "position": len(self._queue)}))
+
+    async def cancel(self, request_id):
+        """Drop a queued request, or interrupt the kernel if it is the one running."""
+        for request in self._queue:
+            if request.request_id == request_id:
+                self._queue.remove(request)
+                await self.send_json(request.tag({"type": "done", "status": "cancelled"}))
+                return
+        if self._running is not None and self._running.request_id == request_id:
+            await self.interrupt()
+
+    async def grant(self, request_id, batches=None, nbytes=None):
+        """Add flow-control credits to a request; a kernel waiting for credits is released at once."""
+        request = self._find(request_id)
+        if request is None:
+            return
+        request.add_credits(batches, nbytes)
+        await self._send_credits(request)
+
+    async def input_reply(self, request_id, value):
+        """Answer an input() prompt of the running request."""
+        request = self._find(request_id)
+        if request is None or request.input_request is None:
+            return
+        header, request.input_request = request.input_request, None
+        await self._send_input_reply(header, value)
+
+    def _find(self, request_id):
+        if self._running is not None and self._running.request_id == request_id:
+            return self._running
+        for request in self._queue:
+            if request.request_id == request_id:
+                return request
+        return None
+
+    async def _send_credits(self, request):
+        if request.credit_request is None or not request.has_credits:
+            return
+        header, request.credit_request = request.credit_request, None
+        await self._send_input_reply(header, json.dumps(request.take_credits()))
+
+    async def _send_input_reply(self, parent_header, value):
+        reply = create_jupyter_message(self.id, "input_reply", {"value": value})
+        reply["parent_header"] = parent_header
+        reply["channel"] = "stdin"
+        try:
+            await self.kernel.j_ws.send_json(reply)
+        except Exception as e:
+            print(f"Session {self.id}: failed to send input_reply: {e}")
+
+    async def interrupt(self):
+        try:
+            await jupyter_http.post(f"/api/kernels/{self.kernel.kernel_id}/interrupt", timeout=2)
+        except: pass
+
+    async def _dispatch(self, request):
+        self._running = request
+        request.started_at = time.monotonic()
+        EXECUTE_QUEUE_WAIT_SECONDS.observe(request.started_at - request.queued_at)
+        try:
+            await self.kernel.j_ws.send_json(request.msg)
+        except Exception:
+            self._running = None
+            await self.send_json(request.tag({"type": "error", "text": "Lost connection to Jupyter Kernel."}))
+            await self.send_json(request.tag({"type": "done", "status": "error"}))
+
+    async def _finish(self, request):
+        self._running = None
+        EXECUTE_SECONDS.labels(request.status or "ok").observe(time.monotonic() - request.started_at)
+        await self._flush_output()
+        await self.send_json(request.tag({"type": "done", "status": request.status or "ok"}))
+        if request.status == "error" and request.stop_on_error:
+            # Same as Jupyter's stop_on_error: later cells of a failed pipeline are not run
+            while self._queue and self._queue[0].stop_on_error:
+                aborted = self._queue.popleft()
+                await self.send_json(aborted.tag({"type": "done", "status": "aborted"}))
+        if self._queue:
+            await self._dispatch(self._queue.popleft())
+
+    async def _fail_pending(self, text):
+        """Fail the running request and everything queued behind it; their execute_reply will never come."""
+        pending = list(self._queue)
+        self._queue.clear()
+        if self._running is not None:
+            request, self._running = self._running, None
+            request.status = "error"
+            EXECUTE_SECONDS.labels("error").observe(time.monotonic() - request.started_at)
+            pending.insert(0, request)
+        await self._flush_output()
+        for request in pending:
+            await self.send_json(request.tag({"type": "error", "text": text}))
+            await self.send_json(request.tag({"type": "done", "status": "error"}))
+
+    async def _write_output(self, request, out_type, text):
+        if not self._output.enabled:
+            OUTPUT_FRAMES_TOTAL.inc()
+            await self.send_json(request.tag({"type": out_type, "text": text}))
+            return
+        if not self._output.accepts(request, out_type):
+            await self._flush_output()
+        self._output.add(request, out_type, text)
+        if self._output.full:
+            await self._flush_output()
+
+    async def _flush_output(self):
+        if self._output.text:
+            request, out_type, text = self._output.take()
+            OUTPUT_FRAMES_TOTAL.inc()
+            await self.send_json(request.tag({"type": out_type, "text": text}))
+
+    async def _forward(self, request, msg_type, content, buffers):
+        if msg_type == "stream":
+            out_type = "stdout"
+            if content.get("name") == "stderr":
+                out_type = "error"
+            await self._write_output(request, out_type, content['text'])
+        elif msg_type == "error":
+            # Tracebacks go out right after the output that preceded them
+            await self._flush_output()
+            await self.send_json(request.tag({"type": "error", "text": "\\n".join(content.get('traceback', []))}))
+        elif msg_type in ["display_data", "execute_result"]:
+            bundle = content.get("data", {})
+            binary_data = None
+            if "application/vnd.apache.arrow.stream" in bundle:
+                raw_arrow = bundle["application/vnd.apache.arrow.stream"]
+                binary_data = base64.b64decode(raw_arrow) if isinstance(raw_arrow, str) else raw_arrow
+            if "application/vnd.datastudio+json" in bundle:
+                await self._send_structured(request, bundle["application/vnd.datastudio+json"], binary_data)
+            elif binary_data is not None:
+                await self._send_arrow(request, binary_data)
+        elif msg_type == "comm_msg":
+            # Arrow IPC from the datastudio comm arrives as a raw binary buffer
+            data = content.get("data", {})
+            if data.get("kind") == "arrow" and buffers:
+                await self._send_arrow(request, buffers[0])
+            elif data.get("kind") in STRUCTURED_KINDS:
+                await self._send_structured(request, data, buffers[0] if buffers else None)
+
+    async def _send_arrow(self, request, data):
+        if request.tagged:
+            # Binary frames cannot carry the request id, so a descriptor precedes each one
+            await self.send_json(request.tag({"type": "arrow", "bytes": len(data)}))
+        ARROW_FRAMES_TOTAL.inc()
+        ARROW_BYTES_TOTAL.inc(len(data))
+        await self.send_bytes(data)
+
+    async def _send_structured(self, request, data, payload=None):
+        # Kernel side-channel messages (result handles, windows) become {"type": kind, ...};
+        # an attached Arrow payload follows as a binary frame, announced by "bytes"
+        if data.get("kind") not in STRUCTURED_KINDS:
+            return
+        if data["kind"] == "stats":
+            observe_kernel_stats(data)
+        message = {"type": data["kind"], **{k: v for k, v in data.items() if k != "kind"}}
+        if payload is not None:
+            message["bytes"] = len(payload)
+        await self.send_json(request.tag(message))
+        if payload is not None:
+            ARROW_FRAMES_TOTAL.inc()
+            ARROW_BYTES_TOTAL.inc(len(payload))
+            await self.send_bytes(payload)
+
+    async def _listen(self):
+        j_ws = self.kernel.j_ws
+        receiving = None
+        try:
+            while True:
+                # Pending output is flushed from this task when its window ends, so frames keep their order
+                if receiving is None:
+                    receiving = asyncio.ensure_future(j_ws.recv_message())
+                done, _ = await asyncio.wait({receiving}, timeout=self._output.timeout())
+                if not done:
+                    await self._flush_output()
+                    continue
+                try:
+                    msg, buffers = receiving.result()
+                except Exception:
+                    break
+                finally:
+                    receiving = None
+                await self._handle(msg, buffers)
+        finally:
+            if receiving is not None:
+                receiving.cancel()
+
+        await self._flush_output()
+        if not self.closed:
+            await self._fail_pending("Lost connection to Jupyter Kernel.")
+            await self.send_json({"type": "error", "text": "Lost connection to Jupyter Kernel."})
+            await self.registry.close(self)
+
+    async def _handle(self, msg, buffers):
+        msg_type = msg.get("msg_type")
+        content = msg.get("content") or {}
+        parent_id = (msg.get("parent_header") or {}).get("msg_id")
+        request = self._running if self._running and self._running.msg_id == parent_id else None
+
+        if msg_type == "input_request" and request is not None:
+            if content.get("prompt") == CREDIT_PROMPT:
+                # The kernel stopped fetching; it resumes when the client grants credits
+                request.credit_request = msg["header"]
+                await self._send_credits(request)
+            else:
+                await self._flush_output()
+                request.input_request = msg["header"]
+                await self.send_json(request.tag({"type": "input_request", "prompt": content.get("prompt", ""),
+                                                  "password": content.get("password", False)}))
+            return
+
+        try:
+            await self._forward(request or _UNTAGGED, msg_type, content, buffers)
+        except Exception as e:
+            print(f"Session {self.id}: failed to forward {msg_type}: {e}")
+
+        if msg_type == "status" and content.get("execution_state") in ("restarting", "dead"):
+            # A restarted or dead kernel (e.g. OOM in the middle of a cell) never replies to the running
+            # request; without this the queue would wait for it forever
+            await self._fail_pending(f"Kernel {content['execution_state']}; the request did not complete.")
+            return
+        if request is None:
+            return
+        # Outputs may arrive on iopub after the shell reply, so the request is
+        # finished once both the execute_reply and the idle status were seen
+        if msg_type == "execute_reply":
+            request.replied = True
+            request.status = content.get("status", "ok")
+        elif msg_type == "status" and content.get("execution_state") == "idle":
+            request.idle = True
+        if request.replied and request.idle:
+            await self._finish(request)
+
+
+class _Untagged:
+    tagged = False
+
+    def tag(self, payload):
+        return payload
+
+
+_UNTAGGED = _Untagged()
+
+
+def _frame_size(frame):
+    kind, payload = frame
+    return len(payload) if kind == "bytes" else 256 + len(payload.get("text", ""))
+
+
+async def _send_frame(websocket, frame):
+    kind, payload = frame
+    if kind == "bytes":
+        await websocket.send_bytes(payload)
+    else:
+        await websocket.send_json(payload)
+
+
+class SessionRegistry:
+    """Kernel sessions by session id; detached sessions are kept for a grace period."""
+
+    def __init__(self, grace=SESSION_GRACE_SECONDS, buffer_max=SESSION_BUFFER_MAX_BYTES):
+        self.grace = grace
+        self.buffer_max = buffer_max
+        self._sessions = {}
+
+    async def open(self, workspace, session_id=None):
+        """Return (session, reattached) for an existing session id, or a new session on a pooled kernel."""
+        session = self._sessions.get(session_id) if session_id else None
+        if session is not None and not session.closed and session.workspace == workspace:
+            return session, True
+        kernel = await kernel_pool.acquire(workspace)
+        session = KernelSession(self, kernel)
+        self._sessions[session.id] = session
+        return session, False
+
+    def detach(self, session, websocket):
+        session.detach(websocket)
+
+    def sessions(self):
+        return list(self._sessions.values())
+
+    async def close(self, session):
+        if session.closed:
+            return
+        session.closed = True
+        self._sessions.pop(session.id, None)
+        if session._expiry:
+            session._expiry.cancel()
+        if session._listener is not asyncio.current_task():
+            session._listener.cancel()
+        await kernel_pool.release(session.kernel)
+
+    async def shutdown(self):
+        await asyncio.gather(*(self.close(s) for s in list(self._sessions.values())), return_exceptions=True)
+
+
+session_registry = SessionRegistry()
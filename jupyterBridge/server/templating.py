@@ -0,0 +1,91 @@
+import os
+import hashlib
+from collections import OrderedDict
+import jinja2
+from dotenv import dotenv_values
+from config import WORKSPACES_DIR, JINJA_CACHE_SIZE
+
+
+class TemplateCache:
+    """
+    Compiled Jinja templates keyed by a hash of their source.
+
+    Re-running the same cell or SQL file only pays for render(), not for
+    parsing and compiling the template again. Least recently used templates
+    are evicted beyond max_size.
+    """
+
+    def __init__(self, max_size=JINJA_CACHE_SIZE):
+        # Same defaults as jinja2.Template(source), which the bridge used before
+        self.env = jinja2.Environment()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._templates = OrderedDict()
+
+    def get(self, source):
+        key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return template
+        self.misses += 1
+        template = self.env.from_string(source)
+        if self.max_size > 0:
+            self._templates[key] = template
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+        return template
+
+    def render(self, source, context):
+        return self.get(source).render(context)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._templates)}
+
+
+class WorkspaceEnv:
+    """
+    Template `env` per workspace: the bridge environment overlaid with the
+    workspace .env file. The merged dict is rebuilt only when the .env file's
+    mtime/size changes (or it appears/disappears).
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._snapshots = {}  # workspace -> (stamp, env)
+
+    def _stamp(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def get(self, workspace):
+        ws_env_path = os.path.join(WORKSPACES_DIR, workspace, ".env") if workspace else None
+        stamp = self._stamp(ws_env_path) if ws_env_path else None
+        cached = self._snapshots.get(workspace)
+        if cached is not None and cached[0] == stamp:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        # Start with system env vars
+        env_vars = dict(os.environ)
+        if stamp is not None:
+            ws_vars = dotenv_values(ws_env_path)
+            if ws_vars:
+                # Filter None values just in case
+                env_vars.update({k: v for k, v in ws_vars.items() if v is not None})
+        self._snapshots[workspace] = (stamp, env_vars)
+        return env_vars
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._snapshots)}
+
+
+template_cache = TemplateCache()
+workspace_env = WorkspaceEnv()
@@ -0,0 +1,50 @@
+import sqlite3
+
+import pyarrow as pa
+import pytest
+from kernel_namespace import load_kernel_namespace
+
+
+@pytest.fixture(scope="module")
+def ns():
+    return load_kernel_namespace()
+
+
+def sqlite_cursor(values):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER, qty INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", list(enumerate(values)))
+    return conn.execute("SELECT id, qty FROM t ORDER BY id")
+
+
+def test_null_first_batch_waits_for_type(ns):
+    cursor = sqlite_cursor([None, None, 3, None])
+    converter = ns["CursorArrowConverter"](cursor.description)
+    assert converter.convert(cursor.fetchmany(2)) == []
+    ready = converter.convert(cursor.fetchmany(2))
+    assert [b.num_rows for b in ready] == [2, 2]
+    assert all(b.schema.field("qty").type == pa.int64() for b in ready)
+    assert converter.flush() == []
+
+
+def test_stream_keeps_integer_type_after_null_batch(ns):
+    ns["stream"](sqlite_cursor([None] * 5 + list(range(5))), name="qty_after_nulls", batch_size=2, silent=True)
+    types = dict(ns["con"].execute("SELECT column_name, data_type FROM duckdb_columns() "
+                                   "WHERE table_name = 'qty_after_nulls'").fetchall())
+    assert types["qty"] == "BIGINT"
+    assert ns["con"].execute("SELECT sum(qty) FROM qty_after_nulls").fetchone()[0] == 10
+
+
+def test_all_null_column_is_null_typed(ns):
+    converter = ns["CursorArrowConverter"](sqlite_cursor([None, None]).description)
+    assert converter.convert([(0, None), (1, None)]) == []
+    (batch,) = converter.flush()
+    assert pa.types.is_null(batch.schema.field("qty").type)
+
+
+def test_value_after_hold_limit_raises(ns):
+    converter = ns["CursorArrowConverter"](sqlite_cursor([]).description)
+    converter.HOLD_ROWS = 2
+    assert len(converter.convert([(0, None), (1, None)])) == 1
+    with pytest.raises(TypeError, match="qty"):
+        converter.convert([(2, 5)])
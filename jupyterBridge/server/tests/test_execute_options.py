@@ -0,0 +1,17 @@
+import pytest
+from routes.execute import row_limit
+
+
+def test_preview_true_keeps_kernel_default():
+    assert row_limit({"preview": True}, "preview", allow_default=True) is True
+
+
+@pytest.mark.parametrize("value, rows", [(None, None), (False, None), (0, None), (200, 200), ("200", 200)])
+def test_row_limit_values(value, rows):
+    assert row_limit({"window": value}, "window") == rows
+
+
+@pytest.mark.parametrize("value", ["abc", -5, 1.5, [1], True])
+def test_row_limit_rejects_bad_values(value):
+    with pytest.raises(ValueError, match="window"):
+        row_limit({"window": value}, "window")
@@ -0,0 +1,45 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from kernel_namespace import load_kernel_namespace
+
+
+@pytest.fixture
+def flow():
+    ns = load_kernel_namespace()
+    prompts = []
+
+    def credit(grants):
+        def raw_input(prompt):
+            prompts.append(prompt)
+            if not grants:
+                raise AssertionError("stream blocked waiting for credit")
+            return json.dumps(grants.pop(0))
+        ns["get_ipython"] = lambda: SimpleNamespace(kernel=SimpleNamespace(raw_input=raw_input))
+        ns["_ds_options"] = lambda: {"flow_control": True}
+        return ns["FlowControl"]()
+
+    credit.prompts = prompts
+    return credit
+
+
+def test_bytes_only_credit_does_not_limit_batches(flow):
+    fc = flow([{"bytes": 1000}])
+    for _ in range(10):
+        fc.acquire(100)
+    assert len(flow.prompts) == 1
+
+
+def test_bytes_only_credit_waits_when_bytes_run_out(flow):
+    fc = flow([{"bytes": 250}, {"bytes": 250}])
+    for _ in range(5):
+        fc.acquire(100)
+    assert len(flow.prompts) == 2
+
+
+def test_batch_credit(flow):
+    fc = flow([{"batches": 2}, {"batches": 1}])
+    for _ in range(3):
+        fc.acquire(10_000)
+    assert len(flow.prompts) == 2
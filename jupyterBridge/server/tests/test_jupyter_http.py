@@ -0,0 +1,8 @@
+from jupyter_http import JupyterHTTP, POOL_LIMITS
+
+
+def test_pool_uses_configured_limits():
+    pool = JupyterHTTP(base_url="http://jupyter.invalid").client._transport._pool
+    assert pool._max_connections == POOL_LIMITS.max_connections
+    assert pool._max_keepalive_connections == POOL_LIMITS.max_keepalive_connections
+    assert pool._keepalive_expiry == POOL_LIMITS.keepalive_expiry
@@ -0,0 +1,47 @@
+import io
+import contextlib
+
+import pytest
+from kernel_namespace import load_kernel_namespace
+
+
+@pytest.fixture(scope="module")
+def ns():
+    ns = load_kernel_namespace()
+    ns["_ds_options"] = lambda: {}
+    ns["display"] = lambda *args, **kwargs: None
+    return ns
+
+
+def run(ns, query):
+    stats = []
+    ns["_ds_publish"] = lambda data, table=None, payload=None: stats.append(data) if data.get("kind") == "stats" else None
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ns["execute_sql_query"](query)
+    return out.getvalue(), [s for s in stats if s.get("op") == "sql" and s.get("status") == "error"][-1]
+
+
+def test_error_location_after_non_ascii_comment(ns):
+    query = "--kullanıcı listesi\nSELECT id, first_name FROM range(1) t(id);"
+    text, error = run(ns, query)
+    assert (error["line"], error["column"]) == (2, 12)
+    assert query[error["position"]:].startswith("first_name")
+    snippet, caret = text.split("satır 2, sütun 12:")[1].splitlines()[1:3]
+    assert snippet.index("first_name") == caret.index("\x1b")
+
+
+def test_parse_error_location_after_non_ascii_comment(ns):
+    # Parser positions are already character offsets
+    _, error = run(ns, "-- ığüşöç\nSELEC 1")
+    assert (error["line"], error["column"], error["statement"]) == (2, 1, None)
+
+
+@pytest.mark.parametrize("query, target", [
+    ("SELECT 'ığüşöç' AS a, zz FROM range(1)", "zz"),
+    ("SELECT 'ğğ', CAST('x' AS INT)", "CAST"),
+    ("SELECT 'ğğ';\n-- şöç\nSELECT 1 FROM range(1) WHERE missing", "missing"),
+])
+def test_error_position_is_a_character_offset(ns, query, target):
+    _, error = run(ns, query)
+    assert query[error["position"]:].startswith(target)
@@ -0,0 +1,52 @@
+import io
+import contextlib
+
+import pytest
+from kernel_namespace import load_kernel_namespace
+
+
+@pytest.fixture
+def ns():
+    ns = load_kernel_namespace()
+    ns["_ds_options"] = lambda: {}
+    ns["display"] = lambda *args, **kwargs: None
+    return ns
+
+
+def run(ns, query):
+    results = []
+    ns["_ds_publish"] = lambda data, table=None, payload=None: results.append(data) if data.get("kind") == "result" else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        ns["execute_sql_query"](query)
+    handles = {}
+    for result in results:
+        handles.setdefault(result["statement"], result["handle"])
+    return handles
+
+
+def stored(ns, handle):
+    return type(ns["_RESULTS"][handle]).__name__
+
+
+def test_snapshot_before_a_later_write(ns):
+    con = ns["con"]
+    con.execute("CREATE TABLE t AS SELECT range AS id FROM range(10)")
+    handles = run(ns, "SELECT * FROM t; DELETE FROM t WHERE id < 5; SELECT count(*) AS n FROM t")
+    assert stored(ns, handles[1]) == "_StoredTable"
+    assert con.execute(f'SELECT count(*) FROM "{handles[1]}"').fetchone()[0] == 10
+    assert con.execute(f'SELECT n FROM "{handles[3]}"').fetchone()[0] == 5
+
+
+def test_settings_do_not_materialize_lazy_results(ns):
+    handles = run(ns, "SELECT * FROM range(1000000); SET threads = 2; PRAGMA version; COPY (SELECT 1) TO '/dev/null'; SELECT 1")
+    assert stored(ns, handles[1]) == "_LazyResult"
+
+
+def test_previous_run_handles_are_released(ns):
+    con = ns["con"]
+    first = run(ns, "SELECT 1 AS a; SELECT 2 AS b")
+    second = run(ns, "SELECT 3 AS c")
+    assert not set(first.values()) & set(ns["_RESULTS"])
+    names = {r[0] for r in con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal").fetchall()}
+    assert names == set(second.values())
+    assert con.execute("SELECT count(*) FROM duckdb_views() WHERE NOT internal AND NOT temporary").fetchone()[0] == 0
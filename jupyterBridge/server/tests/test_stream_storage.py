@@ -0,0 +1,25 @@
+import sqlite3
+
+from kernel_namespace import load_kernel_namespace
+
+
+def tables(con):
+    return {r[0] for r in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+
+
+def test_named_streams_default_to_duckdb_tables():
+    ns = load_kernel_namespace()
+    con = ns["con"]
+    ns["stream"](con.sql("SELECT * FROM range(1000)"), name="from_relation", silent=True)
+    cursor = sqlite3.connect(":memory:").execute("SELECT 1 AS a UNION ALL SELECT 2")
+    ns["stream"](cursor, name="from_cursor", silent=True)
+    assert {"from_relation", "from_cursor"} <= tables(con)
+    assert con.execute("SELECT count(*) FROM from_relation").fetchone()[0] == 1000
+
+
+def test_view_storage_is_opt_in():
+    ns = load_kernel_namespace()
+    con = ns["con"]
+    ns["stream"](con.sql("SELECT * FROM range(10)"), name="as_view", silent=True, storage="view")
+    assert "as_view" not in tables(con)
+    assert con.execute("SELECT count(*) FROM as_view").fetchone()[0] == 10
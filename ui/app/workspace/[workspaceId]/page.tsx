@@ -47,6 +47,8 @@ function WorkspaceContent() {
     const [editingValue, setEditingValue] = useState('');
 
     const socketRef = useRef<WebSocket | null>(null);
+    // Bridge session id: reconnects pass it back (?session=) to reattach to the same kernel
+    const sessionIdRef = useRef<string | null>(null);
     const contentCacheRef = useRef<Record<string, string>>({});
     const editorRef = useRef<EditorHandle>(null);
     const startTimeRef = useRef<number>(0);
@@ -318,8 +320,15 @@ function WorkspaceContent() {
 
             setWsStatus('connecting');
             let wsUrl = process.env.NEXT_PUBLIC_WEBSOCKET_URL || "ws://localhost:8000/ws/execute";
+            const params = new URLSearchParams();
             if (currentWorkspace) {
-                wsUrl += `?workspace=${currentWorkspace}`;
+                params.set("workspace", currentWorkspace);
+            }
+            if (sessionIdRef.current) {
+                params.set("session", sessionIdRef.current);
+            }
+            if (params.toString()) {
+                wsUrl += `?${params.toString()}`;
             }
             const ws = new WebSocket(wsUrl);
             ws.binaryType = "blob";
@@ -400,6 +409,12 @@ function WorkspaceContent() {
                         const data = JSON.parse(event.data);
                         const text = String(data.text || "");
 
+                        // Session id for reattaching after a dropped connection
+                        if (data.type === 'session') {
+                            sessionIdRef.current = data.session_id;
+                            return;
+                        }
+
                         // Handle Ready Signal
                         if (data.type === 'status' && data.execution_state === 'ready') {
                             setWsStatus('connected');
@@ -434,9 +449,11 @@ function WorkspaceContent() {
                     }
                 }
             };
-            ws.onclose = () => {
+            ws.onclose = (event: CloseEvent) => {
                 if (!isMounted) return;
                 setWsStatus('disconnected');
+                // 4001: another tab took over this session; reconnecting would take it back
+                if (event.code === 4001) return;
                 // Auto-reconnect removed if we want manual control? 
                 // Or keep it but allow manual disconnect to stop it.
                 // Let's keep auto-reconnect for now, but manual disconnect will stop it.
@@ -447,8 +464,17 @@ function WorkspaceContent() {
             socketRef.current = ws;
         };
 
+        // Ends the bridge session so its kernel is released now instead of after the grace period
+        const closeSession = () => {
+            if (socketRef.current?.readyState === WebSocket.OPEN) {
+                socketRef.current.send(JSON.stringify({ action: "close" }));
+            }
+            sessionIdRef.current = null;
+        };
+
         const disconnectWS = () => {
             if (socketRef.current) {
+                closeSession();
                 // Prevent auto-reconnect temporarily?
                 // Clearing timeout is not enough if onclose creates a new one.
                 // But onclose checks isMounted? No, isMounted is for component unmount.
@@ -468,6 +494,7 @@ function WorkspaceContent() {
             isMounted = false;
             clearTimeout(reconnectTimeout);
             if (socketRef.current) {
+                closeSession();
                 socketRef.current.onclose = null;
                 socketRef.current.close();
             }